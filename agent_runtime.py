@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from supply_agents import InventoryAgent, ProcurementAgent, RouteOptimizationAgent
+
+logger = logging.getLogger(__name__)
+
+
+# --- Messages ---
+# `created` is time.perf_counter() when the originating reading entered the runtime,
+# carried along so the ledger can measure end-to-end latency.
+class StockReading(NamedTuple):
+    warehouse: str
+    sku: int
+    on_hand: float
+    demand: float
+    destinations: tuple  # delivery stops (dicts with lat, lon, demand) for this demand
+    created: float
+
+
+class LowStockEvent(NamedTuple):
+    warehouse: str
+    sku: int
+    shortfall: float
+    created: float
+
+
+class PurchaseOrder(NamedTuple):
+    warehouse: str
+    sku: int
+    quantity: float
+    cost: float
+    events: int  # low-stock events coalesced into this order
+    created: float
+
+
+class RouteRequest(NamedTuple):
+    warehouse: str
+    destinations: tuple
+    created: float
+
+
+class RoutePlan(NamedTuple):
+    warehouse: str
+    routes: list  # one list of destinations per truck
+    created: float
+    unassigned: tuple = ()  # destinations no truck could serve
+
+
+class Warehouse:
+    """One site with its own agents, reused from supply_agents."""
+
+    def __init__(self, name, depot, on_hand=100, supply_cost=50, truck_capacity=120, route_time_limit=0.05):
+        self.name = name
+        self.depot = depot
+        self.inventory = InventoryAgent(inventory=on_hand)
+        self.procurement = ProcurementAgent(supply_cost=supply_cost)
+        self.routing = RouteOptimizationAgent(delivery_time=5, depot=depot, truck_capacity=truck_capacity,
+                                              time_limit=route_time_limit)
+
+
+# --- Bus: one bounded queue per topic ---
+class MessageBus:
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self.queues = {}
+        self.blocked = 0  # publishes that had to wait for room
+        self.blocked_s = 0.0
+
+    def topic(self, name):
+        if name not in self.queues:
+            self.queues[name] = asyncio.Queue(self.maxsize)
+        return self.queues[name]
+
+    async def publish(self, topic, message):
+        queue = self.topic(topic)
+        if not queue.full():
+            queue.put_nowait(message)
+            return
+        # Backpressure: the producer waits until the consumer catches up
+        start = time.perf_counter()
+        await queue.put(message)
+        self.blocked += 1
+        self.blocked_s += time.perf_counter() - start
+
+
+class Agent:
+    """Consumes one topic with `workers` tasks, up to `batch_size` messages per handle() call.
+
+    Batches are whatever is already queued when a worker wakes up, so an idle
+    pipeline adds no latency and a backed-up one amortises work across messages.
+    A batch whose handle() raises is logged and kept in `dead_letters`; the
+    worker carries on with the next one.
+    """
+
+    topic = None
+
+    def __init__(self, bus, warehouses, workers=1, batch_size=64):
+        self.bus = bus
+        self.warehouses = warehouses
+        self.workers = workers
+        self.batch_size = batch_size
+        self.processed = 0
+        self.batches = 0
+        self.failed = 0
+        self.dead_letters = deque(maxlen=100)  # (exception, batch) of the latest failed batches
+
+    async def handle(self, batch):
+        raise NotImplementedError
+
+    async def run(self):
+        queue = self.bus.topic(self.topic)
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self.handle(batch)
+            except Exception as e:
+                logger.exception("%s: dropped a batch of %d messages", type(self).__name__, len(batch))
+                self.failed += len(batch)
+                self.dead_letters.append((e, batch))
+            finally:
+                self.processed += len(batch)
+                self.batches += 1
+                for _ in batch:
+                    queue.task_done()
+
+
+class InventoryMonitor(Agent):
+    topic = "inventory"
+
+    async def handle(self, batch):
+        for reading in batch:
+            agent = self.warehouses[reading.warehouse].inventory
+            agent.inventory = reading.on_hand
+            if agent.check_inventory(reading.demand):
+                await self.bus.publish("procurement", LowStockEvent(
+                    reading.warehouse, reading.sku, reading.demand - reading.on_hand, reading.created))
+            if reading.destinations:
+                await self.bus.publish("routing", RouteRequest(reading.warehouse, reading.destinations, reading.created))
+
+
+class Procurement(Agent):
+    """Coalesces low-stock events into purchase orders.
+
+    `submit`, if given, is an async callable that places an order with the
+    supplier (an API call); the orders of one batch are submitted concurrently.
+    """
+
+    topic = "procurement"
+
+    def __init__(self, bus, warehouses, workers=1, batch_size=64, submit=None):
+        super().__init__(bus, warehouses, workers, batch_size)
+        self.submit = submit
+
+    async def handle(self, batch):
+        # One purchase order per (warehouse, sku) for all its low-stock events in the batch
+        grouped = {}
+        for event in batch:
+            grouped.setdefault((event.warehouse, event.sku), []).append(event)
+        orders = []
+        for (warehouse, sku), events in grouped.items():
+            quantity = sum(e.shortfall for e in events)
+            cost = self.warehouses[warehouse].procurement.order_materials(quantity)
+            orders.append(PurchaseOrder(warehouse, sku, quantity, cost, len(events), min(e.created for e in events)))
+        if self.submit is not None:
+            await asyncio.gather(*(self.submit(order) for order in orders))
+        for order in orders:
+            await self.bus.publish("ledger", order)
+
+
+def _solve_routes(jobs):
+    """Module level and fed plain (RouteOptimizationAgent, destinations) pairs, so a process pool can pickle it."""
+    return [agent.plan_routes(list(destinations)) for agent, destinations in jobs]
+
+
+class Routing(Agent):
+    """Solves every route request of a batch in one executor call, off the event loop."""
+
+    topic = "routing"
+
+    def __init__(self, bus, warehouses, workers=1, batch_size=64, executor=None):
+        super().__init__(bus, warehouses, workers, batch_size)
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="routing")
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def handle(self, batch):
+        jobs = [(self.warehouses[r.warehouse].routing, r.destinations) for r in batch]
+        plans = await asyncio.get_running_loop().run_in_executor(self.executor, _solve_routes, jobs)
+        for request, (routes, unassigned) in zip(batch, plans):
+            await self.bus.publish("ledger", RoutePlan(request.warehouse, routes, request.created, tuple(unassigned)))
+
+
+class Ledger(Agent):
+    """Terminal agent: records spend, plans and end-to-end latency."""
+
+    topic = "ledger"
+    latency_window = 10_000  # latest messages kept for the latency percentiles, so memory stays flat
+
+    def __init__(self, bus, warehouses, workers=1, batch_size=256):
+        super().__init__(bus, warehouses, workers, batch_size)
+        self.orders = 0
+        self.plans = 0
+        self.unassigned = 0  # stops left off every truck, summed over plans
+        self.spend = 0.0
+        self.latencies = deque(maxlen=self.latency_window)
+
+    async def handle(self, batch):
+        now = time.perf_counter()
+        for message in batch:
+            if isinstance(message, PurchaseOrder):
+                self.orders += 1
+                self.spend += message.cost
+            else:
+                self.plans += 1
+                self.unassigned += len(message.unassigned)
+            self.latencies.append(now - message.created)
+
+
+# --- Runtime ---
+class AgentRuntime:
+    """Inventory -> procurement / routing -> ledger pipeline over bounded queues.
+
+    Usage (inside a running event loop):
+        runtime = AgentRuntime(warehouses)
+        await runtime.start()
+        await runtime.publish(StockReading(...))
+        await runtime.drain()
+        await runtime.stop()
+    """
+
+    def __init__(self, warehouses, inventory_workers=1, procurement_workers=1, routing_workers=4,
+                 queue_size=1000, batch_size=64, executor=None, submit_order=None):
+        self.warehouses = {w.name: w for w in warehouses}
+        self.bus = MessageBus(queue_size)
+        self.routing = Routing(self.bus, self.warehouses, routing_workers, batch_size, executor)
+        self.ledger = Ledger(self.bus, self.warehouses)
+        # Pipeline order: drain() waits for each stage before the next
+        self.agents = [
+            InventoryMonitor(self.bus, self.warehouses, inventory_workers, batch_size),
+            Procurement(self.bus, self.warehouses, procurement_workers, batch_size, submit_order),
+            self.routing,
+            self.ledger,
+        ]
+        self._tasks = []
+
+    async def start(self):
+        for agent in self.agents:
+            self.bus.topic(agent.topic)
+            self._tasks += [asyncio.create_task(agent.run()) for _ in range(agent.workers)]
+
+    async def publish(self, reading):
+        await self.bus.publish("inventory", reading)
+
+    async def drain(self):
+        """Wait until every message published so far has been handled by every stage."""
+        for agent in self.agents:
+            await self.bus.topic(agent.topic).join()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.routing.close()
+
+    def stats(self):
+        latencies = np.array(self.ledger.latencies) if self.ledger.latencies else np.zeros(1)
+        return {
+            "events": sum(agent.processed for agent in self.agents),
+            "orders": self.ledger.orders,
+            "route_plans": self.ledger.plans,
+            "unassigned_stops": self.ledger.unassigned,
+            "spend": self.ledger.spend,
+            "avg_batch": {agent.topic: agent.processed / max(agent.batches, 1) for agent in self.agents},
+            "failed": {agent.topic: agent.failed for agent in self.agents},
+            "backpressure_waits": self.bus.blocked,
+            "backpressure_s": self.bus.blocked_s,
+            "latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "latency_p95_ms": float(np.percentile(latencies, 95) * 1000),
+        }
+
+
+async def run_readings(warehouses, readings, **options):
+    """Push every reading through a fresh runtime and return its stats."""
+    runtime = AgentRuntime(warehouses, **options)
+    await runtime.start()
+    try:
+        for reading in readings:
+            await runtime.publish(reading._replace(created=time.perf_counter()))
+        await runtime.drain()
+    finally:
+        await runtime.stop()
+    return runtime.stats()
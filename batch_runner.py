@@ -0,0 +1,57 @@
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# --- Progress counters and the throughput line the batch CLIs print to stderr ---
+class Progress:
+    def __init__(self, unit, report_every=25):
+        self.unit = unit  # what is counted, e.g. "resumes"
+        self.report_every = report_every
+        self.processed = self.skipped = self.failed = 0
+        self.start = time.time()
+
+    def finished(self, failed):
+        self.processed += 1
+        self.failed += bool(failed)
+        if self.processed % self.report_every == 0:
+            self.report()
+
+    def report(self):
+        minutes = (time.time() - self.start) / 60
+        rate = self.processed / minutes if minutes else 0.0
+        print(f"processed={self.processed} skipped={self.skipped} failed={self.failed} "
+              f"throughput={rate:.1f} {self.unit}/min", file=sys.stderr)
+
+    def totals(self):
+        return self.processed, self.skipped, self.failed
+
+
+# --- Bounded-window fan-out ---
+def run_bounded(jobs, work, finish, workers, progress):
+    """Runs work(*job) for every job on `workers` threads and returns progress.totals().
+
+    finish(job, result) runs on the calling thread as each job completes, so it
+    can write to files or stores that aren't thread-safe; it returns True when
+    the job failed. `work` must not raise. Jobs are pulled from the iterable
+    only as the window frees up, so a huge input never sits in memory; count
+    skipped inputs on `progress` while producing them.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}  # future -> job
+
+        def drain(block_until_below):
+            while len(pending) >= block_until_below:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    progress.finished(finish(job, future.result()))
+
+        for job in jobs:
+            # Bounded window: never more than two batches of work queued ahead of the workers
+            drain(block_until_below=workers * 2)
+            pending[pool.submit(work, *job)] = job
+        drain(block_until_below=1)
+
+    progress.report()
+    return progress.totals()
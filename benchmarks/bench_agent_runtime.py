@@ -0,0 +1,102 @@
+"""Throughput of agent_runtime.AgentRuntime as warehouses and routing workers grow.
+
+    python benchmarks/bench_agent_runtime.py [--warehouses 1 10 100] [--workers 1 4 16] [--readings 2000]
+
+Every stock reading carries 3 delivery stops, and every purchase order is
+submitted to a simulated supplier API that takes --supplier-ms to answer.
+--workers sets both the procurement and the routing worker count.
+
+"events/s" counts every message handled by any agent (readings, low-stock
+events, route requests, purchase orders and route plans); "readings/s" is input
+throughput. "sequential" is the original SupplyChainCoordinator.coordinate()
+called once per reading, with one blocking supplier call per low-stock reading.
+--processes solves routes in a process pool instead of threads.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_runtime import StockReading, Warehouse, run_readings  # noqa: E402
+from supply_agents import SupplyChainCoordinator  # noqa: E402
+
+ORIGIN = (40.7128, -74.0060)
+
+
+def scenario(n_warehouses, n_readings, seed):
+    rng = np.random.default_rng(seed)
+    warehouses = [
+        Warehouse(f"W{i}", (ORIGIN[0] + rng.uniform(-3, 3), ORIGIN[1] + rng.uniform(-3, 3)))
+        for i in range(n_warehouses)
+    ]
+    readings = []
+    for _ in range(n_readings):
+        w = warehouses[rng.integers(n_warehouses)]
+        stops = tuple(
+            {"lat": w.depot[0] + rng.uniform(-1, 1), "lon": w.depot[1] + rng.uniform(-1, 1),
+             "demand": int(rng.integers(10, 60))}
+            for _ in range(3)
+        )
+        readings.append(StockReading(w.name, int(rng.integers(10)), float(rng.uniform(0, 150)),
+                                     float(rng.uniform(50, 200)), stops, 0.0))
+    return warehouses, readings
+
+
+def sequential(warehouses, readings, supplier_s):
+    by_name = {w.name: w for w in warehouses}
+    start = time.perf_counter()
+    for r in readings:
+        w = by_name[r.warehouse]
+        w.inventory.inventory = r.on_hand
+        if w.inventory.check_inventory(r.demand):
+            time.sleep(supplier_s)
+        SupplyChainCoordinator(w.inventory, w.procurement, w.routing).coordinate(r.demand, list(r.destinations))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--warehouses", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--readings", type=int, default=2000)
+    parser.add_argument("--supplier-ms", type=float, default=20.0)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--processes", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    supplier_s = args.supplier_ms / 1000
+
+    async def submit(order):
+        await asyncio.sleep(supplier_s)
+
+    print(f"{'warehouses':>10} {'variant':<10} {'workers':>7} {'readings/s':>11} {'events/s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'route batch':>11} {'orders':>7} {'bp waits':>9}")
+    for n in args.warehouses:
+        warehouses, readings = scenario(n, args.readings, args.seed)
+        # The sequential loop waits on the supplier per reading; time a slice and extrapolate
+        sample = readings[:max(len(readings) // 10, 1)]
+        elapsed = sequential(warehouses, sample, supplier_s)
+        print(f"{n:>10} {'sequential':<10} {1:>7} {len(sample) / elapsed:>11.0f} {'':>10} {'':>8} {'':>8} "
+              f"{1:>11.1f} {'':>7} {'':>9}")
+        for workers in args.workers:
+            executor = ProcessPoolExecutor(workers) if args.processes else None
+            start = time.perf_counter()
+            stats = asyncio.run(run_readings(warehouses, readings, procurement_workers=workers, routing_workers=workers,
+                                             queue_size=args.queue_size, executor=executor, submit_order=submit))
+            elapsed = time.perf_counter() - start
+            if executor:
+                executor.shutdown()
+            print(f"{n:>10} {'runtime':<10} {workers:>7} {len(readings) / elapsed:>11.0f} {stats['events'] / elapsed:>10.0f} "
+                  f"{stats['latency_p50_ms']:>8.1f} {stats['latency_p95_ms']:>8.1f} "
+                  f"{stats['avg_batch']['routing']:>11.1f} {stats['orders']:>7} {stats['backpressure_waits']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""End-to-end latency of every action in trip.py, resume.py and supply.py, against the mock backend.
+
+    python benchmarks/bench_apps.py [--iterations 12] [--sessions 4] [--only trip] [--update-baseline]
+
+Each app runs headless under streamlit.testing.AppTest with LLM_BACKEND=mock
+(mock_inference's in-process fake) with the response and semantic caches and
+the pre-generated trip store off, so every action pays the simulated model
+latency plus the app's own work. An action is one button click (or the first
+page load) on a freshly loaded app; its latency is the wall time of that rerun.
+--sessions worker processes drive the app side by side, as concurrent users
+would (AppTest itself cannot run in threads), and throughput is actions
+completed per second across them, including each session's page load before its
+click. Model behaviour comes from the LLM_MOCK_* variables and is seeded;
+anything set in the environment overrides the defaults below.
+
+Results are compared per action with benchmarks/apps_baseline.json (written
+with --update-baseline). The exit status is 1 when a p50 or p95 is more than
+--tolerance slower than the baseline.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+BASELINE = os.path.join(ROOT, "benchmarks", "apps_baseline.json")
+
+# Must be in place before the apps (and llm_gateway) are imported by AppTest
+ENVIRONMENT = {
+    "LLM_BACKEND": "mock",
+    "LLM_CACHE": "off",
+    "LLM_SEMANTIC_CACHE": "off",
+    "TRIP_STORE_PATH": "",
+    "LLM_CACHE_PATH": "",
+    "LLM_RATE_PER_MIN": "1000000",
+    "LLM_RATE_BURST": "1000",
+    "LLM_MOCK_SEED": "0",
+}
+for name, value in ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import llm_gateway  # noqa: E402
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Data scientist with 6 years of experience in forecasting and experimentation.
+
+Experience
+Senior Data Scientist, Acme Corp (2021 - present)
+- Built demand forecasts that cut stock-outs by 18%.
+- Led an A/B testing platform used by 40 teams.
+
+Education
+MSc Statistics, State University
+
+Skills
+Python, SQL, Spark, causal inference
+"""
+
+
+# --- Actions: (app, name, prepare(at, i) before the first run, act(at, i) before the timed run) ---
+# Inputs vary with the iteration i, so concurrent sessions are not coalesced into one model call
+def click(label):
+    def act(at, i):
+        buttons = [b for b in at.button if b.label == label]
+        if not buttons:
+            raise LookupError(f"no {label!r} button among {[b.label for b in at.button]}")
+        return buttons[0].click()
+    return act
+
+
+def ask(label, question):
+    def act(at, i):
+        at.text_input[0].input(f"{question} ({i})")
+        return click(label)(at, i)
+    return act
+
+
+def trip(act):
+    def with_details(at, i):
+        at.sidebar.text_input[0].input(f"Lisbon {i}")
+        at.sidebar.text_input[1].input("food, museums")
+        return act(at, i)
+    return with_details
+
+
+def with_resume(at, i):
+    # Stands in for the file upload, which AppTest cannot drive
+    at.session_state["uploaded_resume"] = RESUME.replace("Jane Doe", f"Jane Doe {i}")
+
+
+ACTIONS = [
+    ("trip", "plan_trip", None, trip(click("✨ Plan My Trip"))),
+    ("trip", "plan_everything", None, trip(click("🚀 Plan Everything"))),
+    ("trip", "hotels", None, trip(click("🏨 Get Hotel Recommendations"))),
+    ("trip", "chat", None, trip(ask("Ask", "What should I pack?"))),
+    ("resume", "fraud_check", with_resume, click("🚨 Check for Fraud / Fake Claims")),
+    ("resume", "improve", with_resume, click("✨ Improve My Resume")),
+    ("resume", "create", with_resume, click("🛠️ Create New Resume (AI)")),
+    ("resume", "chat", with_resume, ask("Ask Advisor", "How long should a resume be?")),
+    ("supply", "page_load", None, None),
+    ("supply", "dispatch", None, click("Dispatch nearest truck to Boston")),
+]
+
+
+def run_action(app, prepare, act, i=0):
+    """Seconds for one action on a freshly loaded app."""
+    at = AppTest.from_file(os.path.join(ROOT, f"{app}.py"), default_timeout=300)
+    if prepare is not None:
+        prepare(at, i)
+    if act is not None:
+        check(app, at.run())
+        act(at, i)
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    check(app, at)
+    return elapsed
+
+
+def check(app, at):
+    if at.exception:
+        raise RuntimeError(f"{app}: {at.exception[0].value}")
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def session(action, iterations):
+    """One worker process: warm up, then run the given iterations of ACTIONS[action] back to back."""
+    app, _, prepare, act = ACTIONS[action]
+    run_action(app, prepare, act, -1)  # imports, cached resources
+    calls = llm_gateway.get_client().behaviour.calls
+    start = time.time()  # wall clock, comparable across processes
+    samples = [run_action(app, prepare, act, i) for i in iterations]
+    return samples, llm_gateway.get_client().behaviour.calls - calls, start, time.time()
+
+
+def measure(action, iterations, sessions):
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=sessions, mp_context=spawn) as pool:
+        shares = [range(iterations)[s::sessions] for s in range(sessions)]
+        results = list(pool.map(session, [action] * sessions, shares))
+    samples = [sample for result in results for sample in result[0]]
+    total = max(r[3] for r in results) - min(r[2] for r in results)
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "mean_ms": round(statistics.mean(samples) * 1000, 1),
+        "actions_per_s": round(len(samples) / total, 3),
+        "llm_calls": round(sum(r[1] for r in results) / len(samples), 2),
+    }
+
+
+def settings(args):
+    return {**{name: os.environ[name] for name in ENVIRONMENT}, "sessions": args.sessions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=12, help="actions per app action")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent app sessions")
+    parser.add_argument("--only", choices=["trip", "resume", "supply"], help="benchmark one app")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write results to {os.path.relpath(BASELINE, ROOT)}")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != settings(args):
+            print("warning: baseline was recorded with different LLM_* settings or --sessions")
+
+    results = {}
+    regressions = []
+    print(f"{'action':<24} {'p50 ms':>8} {'p95 ms':>8} {'actions/s':>10} {'calls':>6} {'p50 vs base':>12} {'p95 vs base':>12}")
+    for action, (app, name, _, _) in enumerate(ACTIONS):
+        if args.only and app != args.only:
+            continue
+        key = f"{app}.{name}"
+        results[key] = result = measure(action, args.iterations, args.sessions)
+        before = baseline.get("actions", {}).get(key)
+        deltas = []
+        for metric in ("p50_ms", "p95_ms"):
+            if before is None:
+                deltas.append("-")
+                continue
+            change = result[metric] / before[metric] - 1
+            deltas.append(f"{change:+.0%}")
+            if change > args.tolerance:
+                regressions.append(f"{key} {metric}: {before[metric]:.0f} -> {result[metric]:.0f} ms")
+        print(f"{key:<24} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} {result['actions_per_s']:>10.2f} "
+              f"{result['llm_calls']:>6.1f} {deltas[0]:>12} {deltas[1]:>12}")
+
+    if args.update_baseline:
+        actions = {**baseline.get("actions", {}), **results}
+        with open(BASELINE, "w") as f:
+            json.dump({"environment": settings(args), "actions": actions}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {os.path.relpath(BASELINE, ROOT)}")
+    elif regressions:
+        print("\nslower than baseline:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Per-tick CPU time and browser payload of the supply dashboard.
+
+    python benchmarks/bench_dashboard_ticks.py [--ticks 10] [--before-rev HEAD~1]
+
+The app runs headless under streamlit.testing.AppTest. For every run the
+benchmark records the CPU time of the script thread (time.thread_time between
+the runner's start and stop events, so test-harness setup is excluded) and the
+serialized size of every ForwardMsg the run emits, i.e. the bytes the server
+would push over the websocket.
+
+A "tick" is whatever the 5-second refresh executes:
+- with st_autorefresh (the version at --before-rev) it is a full script rerun;
+- with fragments it is one fragment rerun of the run_every fragments that are
+  due (the supplier-health fragment only every sixth tick, i.e. every 30 s).
+Tick figures are means over --ticks; the first (cold) run is reported separately.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.runtime.scriptrunner import RerunData, ScriptRunnerEvent  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas  # noqa: E402
+
+TICK = 5  # seconds between refreshes
+# Fragments refreshing less often than every tick, with their period in ticks
+SLOW_FRAGMENTS = {"supplier_health_status": 30 // TICK}
+STOPPED = {
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+    ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN,
+    ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS,
+}
+
+
+class MeasuringScriptRunner(LocalScriptRunner):
+    """LocalScriptRunner that measures script CPU and payload bytes, and can run selected fragments only."""
+
+    fragment_ids = []  # set before AppTest.run() to request a fragment-scoped rerun
+    samples = []  # (cpu seconds, payload bytes) per run
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cpu = 0.0
+        self.payload = 0
+        self._started = None
+
+        def measure(sender, event, **data):
+            # Events fire on the script thread, so thread_time() excludes the test harness
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                self._started = time.thread_time()
+            elif event in STOPPED and self._started is not None:
+                self.cpu += time.thread_time() - self._started
+                self._started = None
+            elif event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG:
+                self.payload += data["forward_msg"].ByteSize()
+
+        self.on_event.connect(measure, weak=False)
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        if not self.fragment_ids:
+            tree = super().run(widget_state, query_params, timeout, page_hash)
+            self.samples.append((self.cpu, self.payload))
+            return tree
+
+        # Replace the full rerun queued by the constructor; merged with it, a fragment rerun becomes a full one
+        self._requests = ScriptRequests()
+        self.request_rerun(RerunData(widget_states=widget_state, fragment_id_queue=list(self.fragment_ids),
+                                     is_auto_rerun=True))
+        try:
+            self.start()
+            require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        self.samples.append((self.cpu, self.payload))
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def auto_fragments(at, script):
+    """Fragment id -> function name for the fragments registered by the last run."""
+    storage = at._fragment_storage
+    names = {}
+    for fragment_id in list(storage._fragments):
+        # The stored closure wraps the decorated function from the app script
+        cells = storage.lookup(fragment_id).__closure__ or ()
+        for cell in cells:
+            code = getattr(cell.cell_contents, "__code__", None)
+            if code is not None and os.path.samefile(code.co_filename, script):
+                names[fragment_id] = cell.cell_contents.__name__
+    return names
+
+
+def measure(script, ticks, trucks):
+    MeasuringScriptRunner.fragment_ids = []
+    MeasuringScriptRunner.samples = []
+    at = AppTest.from_file(script, default_timeout=120)
+    at.run()
+    cold = MeasuringScriptRunner.samples[-1]
+    if trucks != at.sidebar.number_input[0].value:
+        at.sidebar.number_input[0].set_value(trucks).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    fragments = auto_fragments(at, script)
+    per_tick = []
+    for tick in range(ticks):
+        # Pretend one refresh interval has passed, so the truck section always advances
+        at.session_state["truck_data_refresh_time"] = time.time() - TICK - 0.1
+        # Fragments that come due together are queued into a single fragment rerun
+        MeasuringScriptRunner.fragment_ids = [
+            fragment_id for fragment_id, name in fragments.items()
+            if name not in SLOW_FRAGMENTS or tick % SLOW_FRAGMENTS[name] == 0
+        ]
+        at.run()
+        per_tick.append(MeasuringScriptRunner.samples[-1])
+    MeasuringScriptRunner.fragment_ids = []
+    return cold, per_tick, len(fragments)
+
+
+def report(label, cold, per_tick, n_fragments):
+    cpu = statistics.mean(s[0] for s in per_tick) * 1000
+    payload = statistics.mean(s[1] for s in per_tick) / 1024
+    print(f"{label:<10} {n_fragments:>9} {cold[0] * 1000:>12.0f} {cold[1] / 1024:>11.1f} {cpu:>12.1f} {payload:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--trucks", type=int, default=5, help="fleet size set in the sidebar")
+    parser.add_argument("--before-rev", help="git revision of supply.py to compare against")
+    args = parser.parse_args()
+
+    app_test.LocalScriptRunner = MeasuringScriptRunner
+
+    print(f"{'version':<10} {'fragments':>9} {'cold cpu ms':>12} {'cold KB':>11} {'tick cpu ms':>12} {'tick KB':>11}")
+    if args.before_rev:
+        source = subprocess.run(["git", "show", f"{args.before_rev}:supply.py"], cwd=ROOT,
+                                capture_output=True, check=True).stdout
+        with tempfile.NamedTemporaryFile("wb", suffix=".py", dir=ROOT, prefix="_bench_supply_", delete=False) as f:
+            f.write(source)
+        try:
+            report(args.before_rev, *measure(f.name, args.ticks, args.trucks))
+        finally:
+            os.remove(f.name)
+    report("current", *measure(os.path.join(ROOT, "supply.py"), args.ticks, args.trucks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Update and render time of the truck-tracking simulation at 100, 10k and 100k trucks.
+
+    python benchmarks/bench_fleet.py [--sizes 100 10000 100000] [--repeat 5]
+
+"numpy + pydeck" bins fleets above 5k trucks into grid cells server-side;
+"legacy" is the original pandas iterrows()/.at[] loop with one folium.Marker per
+truck; it is skipped above --legacy-max trucks because it takes minutes.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet import Fleet, deck, marker_cluster  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def legacy_update(frame, step=0.2):
+    for idx, row in frame.iterrows():
+        frame.at[idx, "Latitude"] = row["Latitude"] + random.uniform(-step, step)
+        frame.at[idx, "Longitude"] = row["Longitude"] + random.uniform(-step, step)
+
+
+def legacy_render(frame):
+    import folium
+
+    truck_map = folium.Map(location=[40.7128, -74.0060], zoom_start=7)
+    for _, row in frame.iterrows():
+        folium.Marker(
+            location=[row["Latitude"], row["Longitude"]],
+            popup=f"🚛 {row['Truck ID']} - {row['Speed (km/h)']} km/h",
+            icon=folium.Icon(color="orange"),
+        ).add_to(truck_map)
+    return truck_map.get_root().render()
+
+
+def cluster_render(fleet):
+    import folium
+
+    return marker_cluster(fleet, folium.Map(location=[40.7128, -74.0060], zoom_start=7)).get_root().render()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'trucks':>8} {'variant':<16} {'update ms':>10} {'render ms':>10} {'payload KB':>11}")
+    for n in args.sizes:
+        fleet = Fleet.random(n, seed=0)
+        update_ms, _ = timed(lambda: fleet.advance(hours=5 / 60), args.repeat)
+
+        render_ms, payload = timed(lambda: deck(fleet).to_json(), args.repeat)
+        print(f"{n:>8} {'numpy + pydeck':<16} {update_ms:>10.2f} {render_ms:>10.1f} {len(payload) / 1024:>11.0f}")
+
+        try:
+            render_ms, payload = timed(lambda: cluster_render(fleet), args.repeat)
+            print(f"{n:>8} {'numpy + cluster':<16} {update_ms:>10.2f} {render_ms:>10.1f} {len(payload) / 1024:>11.0f}")
+        except ImportError:
+            print(f"{n:>8} {'numpy + cluster':<16} {'(folium not installed)':>33}")
+
+        if n <= args.legacy_max:
+            frame = fleet.to_frame()
+            update_ms, _ = timed(lambda: legacy_update(frame), 1)
+            try:
+                render_ms, payload = timed(lambda: legacy_render(frame), 1)
+                print(f"{n:>8} {'legacy':<16} {update_ms:>10.2f} {render_ms:>10.1f} {len(payload) / 1024:>11.0f}")
+            except ImportError:
+                print(f"{n:>8} {'legacy':<16} {update_ms:>10.2f} {'(folium not installed)':>22}")
+
+
+if __name__ == "__main__":
+    main()
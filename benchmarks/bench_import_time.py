@@ -0,0 +1,199 @@
+"""Import-time profile of the agent modules and cold first run of each app, from `python -X importtime`.
+
+    python benchmarks/bench_import_time.py [--repeat 5] [--top 5] [--no-apps] [--update-baseline]
+
+Every measurement runs in a fresh interpreter, so nothing is already in
+sys.modules. For each module in MODULES the cumulative import time of
+`import <module>` is taken (fastest of --repeat runs, as timeit does: noise
+only ever adds time), along with the heaviest packages it pulls in. Modules
+must not import anything in FORBIDDEN: the business logic stays importable
+without Streamlit, and heavy libraries load lazily in the sections that use
+them.
+
+For each app, the script is executed once under streamlit.testing.AppTest
+(LLM_BACKEND=mock, so no network), and the wall time of that first run is
+reported together with the packages it imported and their cost. A first run
+includes Streamlit's own start-up and swings widely between runs, so the median
+of --repeat runs is taken and its comparison with the baseline is advisory.
+
+Results are compared with benchmarks/import_time_baseline.json (written with
+--update-baseline). The exit status is 1 when a forbidden import appears, or
+when a module import is more than --tolerance slower than the baseline and by
+more than --floor-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "import_time_baseline.json")
+
+MODULES = [
+    "trip_core", "resume_core", "supply_core", "trip_warm", "semantic_cache", "llm_gateway", "telemetry", "chat_memory",
+    "llm_scheduler", "planner", "routing", "fleet", "spatial_index", "sim_engine", "supply_agents", "agent_runtime",
+    "mock_inference",
+]
+APPS = ["trip", "resume", "supply"]
+
+# Packages no module above may load at import time
+FORBIDDEN = [
+    "streamlit", "streamlit_folium", "folium", "matplotlib", "pandas", "pydeck", "scipy.optimize", "azure.ai.inference",
+]
+
+ENVIRONMENT = {"LLM_BACKEND": "mock", "LLM_TELEMETRY_PATH": "", "LLM_CACHE_PATH": "", "TRIP_STORE_PATH": ""}
+MARK = "--- app run starts ---"
+
+APP_RUN = f"""
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+sys.stderr.write({MARK!r} + "\\n"); sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+print(time.perf_counter() - start)
+if at.exception:
+    sys.exit(f"{{sys.argv[1]}}: {{at.exception[0].value}}")
+"""
+
+
+def parse(stderr, after=None):
+    """(package, level, cumulative_us) for every `-X importtime` line, optionally only those after a marker line."""
+    rows = []
+    lines = stderr.splitlines()
+    if after is not None:
+        lines = lines[lines.index(after) + 1:]
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), level, int(cumulative)))
+    return rows
+
+
+def run(args):
+    env = {**os.environ, **ENVIRONMENT, "PYTHONPATH": ROOT}
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return result
+
+
+def children(rows, module):
+    """Direct dependencies of a top-level import; importtime prints them just before it."""
+    found = []
+    for name, level, us in rows:
+        if level == 0:
+            if name == module:
+                return found
+            found = []
+        elif level == 1:
+            found.append((name, 0, us))
+    return []
+
+
+def heaviest(rows, top):
+    """The most expensive top-level imports, ms."""
+    return [(name, round(us / 1000, 1)) for name, level, us in sorted(rows, key=lambda r: -r[2]) if level == 0][:top]
+
+
+def measure_module(module, repeat, top):
+    totals, rows = [], []
+    for _ in range(repeat):
+        rows = parse(run(["-c", f"import {module}"]).stderr)
+        totals.append(next(us for name, level, us in rows if name == module and level == 0))
+    loaded = {name for name, _, _ in rows}
+    return {
+        "ms": round(min(totals) / 1000, 1),
+        "heaviest": heaviest(children(rows, module), top),
+        "forbidden": [name for name in FORBIDDEN if name in loaded],
+    }
+
+
+def measure_app(app, repeat, top):
+    times, imports = [], []
+    for _ in range(repeat):
+        result = run(["-c", APP_RUN, os.path.join(ROOT, f"{app}.py")])
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+        rows = [row for row in parse(result.stderr, after=MARK) if row[1] == 0]
+        imports.append(sum(us for _, _, us in rows))
+    return {
+        "ms": round(statistics.median(times) * 1000, 1),
+        "import_ms": round(statistics.median(imports) / 1000, 1),
+        "heaviest": heaviest(rows, top),
+    }
+
+
+def compare(key, result, baseline, args, regressions):
+    before = baseline.get(key)
+    if before is None:
+        return "-"
+    change = result["ms"] / before["ms"] - 1 if before["ms"] else 0.0
+    if change > args.tolerance and result["ms"] - before["ms"] > args.floor_ms:
+        regressions.append(f"{key}: {before['ms']:.0f} -> {result['ms']:.0f} ms")
+    return f"{change:+.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports listed per module")
+    parser.add_argument("--no-apps", action="store_true", help="skip the app first-run measurements")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown vs baseline, as a fraction")
+    parser.add_argument("--floor-ms", type=float, default=100, help="ignore slowdowns smaller than this (run-to-run noise)")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write results to {os.path.relpath(BASELINE, ROOT)}")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions, forbidden = [], []
+    print(f"{'import':<16} {'ms':>8} {'vs base':>8}  heaviest dependencies (ms)")
+    for module in MODULES:
+        results[module] = result = measure_module(module, args.repeat, args.top)
+        delta = compare(module, result, baseline.get("modules", {}), args, regressions)
+        deps = ", ".join(f"{name} {ms:.0f}" for name, ms in result["heaviest"])
+        print(f"{module:<16} {result['ms']:>8.1f} {delta:>8}  {deps}")
+        forbidden += [f"{module} imports {name}" for name in result["forbidden"]]
+
+    apps, slow_apps = {}, []
+    if not args.no_apps:
+        print(f"\n{'first run':<16} {'ms':>8} {'vs base':>8} {'imports':>8}  heaviest imports (ms)")
+        for app in APPS:
+            apps[app] = result = measure_app(app, args.repeat, args.top)
+            delta = compare(app, result, baseline.get("apps", {}), args, slow_apps)
+            deps = ", ".join(f"{name} {ms:.0f}" for name, ms in result["heaviest"])
+            print(f"{app + '.py':<16} {result['ms']:>8.1f} {delta:>8} {result['import_ms']:>8.1f}  {deps}")
+
+    if args.update_baseline:
+        def strip(entries):
+            return {key: {"ms": value["ms"]} for key, value in entries.items()}
+
+        with open(BASELINE, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "modules": {**baseline.get("modules", {}), **strip(results)},
+                "apps": {**baseline.get("apps", {}), **strip(apps)},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {os.path.relpath(BASELINE, ROOT)}")
+    if forbidden:
+        print("\nforbidden imports:\n  " + "\n  ".join(forbidden))
+    if regressions and not args.update_baseline:
+        print("\nslower than baseline:\n  " + "\n  ".join(regressions))
+    if slow_apps and not args.update_baseline:
+        print("\nfirst runs slower than baseline (advisory):\n  " + "\n  ".join(slow_apps))
+    if forbidden or (regressions and not args.update_baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
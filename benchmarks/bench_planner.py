@@ -0,0 +1,68 @@
+"""Build, cold-solve and re-solve time of planner.ProductionPlanner.
+
+    python benchmarks/bench_planner.py [--skus 20 200] [--sites 5] [--periods 26]
+
+Each row builds the sparse LP once, solves it cold, re-solves after a small
+demand change ("warm") and calls solve() again with unchanged inputs ("skip").
+"highspy" keeps one HiGHS model and restarts from its basis; "linprog" rebuilds
+the solver state every time, as scipy.optimize.linprog offers no warm start.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import planner  # noqa: E402
+from planner import ProductionPlanner  # noqa: E402
+
+
+def problem(K, S, T, seed):
+    rng = np.random.default_rng(seed)
+    structure = dict(
+        production_lead=rng.integers(0, 3, K),
+        procurement_lead=rng.integers(1, 4, K),
+        capacity_usage=rng.uniform(0.5, 2.0, K),
+    )
+    inputs = dict(
+        demand=rng.uniform(0, 50, (K, S, T)),
+        initial_inventory=20,
+        production_cost=rng.uniform(5, 10, (K, 1, 1)),
+        procurement_cost=rng.uniform(7, 14, (K, S, 1)),
+        holding_cost=0.5,
+        shortage_cost=100,
+        production_capacity=7.5 * K,
+        storage_capacity=40 * K,
+    )
+    return structure, inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skus", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--sites", type=int, default=5)
+    parser.add_argument("--periods", type=int, default=26)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backends = [("highspy", True), ("linprog", False)] if planner.highspy else [("linprog", False)]
+    print(f"{'skus':>5} {'vars':>8} {'backend':<8} {'build ms':>9} {'cold ms':>9} {'warm ms':>9} {'skip ms':>8} {'objective':>14}")
+    for K in args.skus:
+        structure, inputs = problem(K, args.sites, args.periods, args.seed)
+        changed = dict(inputs, demand=inputs["demand"] * 1.03)
+        for name, warm_start in backends:
+            model = ProductionPlanner(K, args.sites, args.periods, warm_start=warm_start, **structure)
+            cold = model.solve(**inputs)
+            warm = model.solve(**changed)
+            start = time.perf_counter()
+            model.solve(**changed)
+            skip_ms = (time.perf_counter() - start) * 1000
+            print(f"{K:>5} {model.n_vars:>8} {name:<8} {model.build_s * 1000:>9.1f} {cold.runtime_s * 1000:>9.1f} "
+                  f"{warm.runtime_s * 1000:>9.1f} {skip_ms:>8.2f} {warm.objective:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
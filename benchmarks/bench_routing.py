@@ -0,0 +1,53 @@
+"""Solution quality vs runtime of routing.solve_cvrp.
+
+    python benchmarks/bench_routing.py [--sizes 1000 5000] [--limits 0 0.5 1 3 5]
+
+For every size and scenario (single-truck tour, capacitated fleet, capacitated
+fleet with time windows) the solver runs once per time limit; a limit of 0 is
+the nearest-neighbour construction alone. "vs NN" is the distance saved by
+2-opt / Or-opt relative to that construction.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import solve_cvrp  # noqa: E402
+
+DEPOT = (40.7128, -74.0060)
+
+
+def scenarios(n, seed):
+    rng = np.random.default_rng(seed)
+    lat = DEPOT[0] + rng.uniform(-3, 3, n)
+    lon = DEPOT[1] + rng.uniform(-3, 3, n)
+    demand = rng.integers(1, 10, n)
+    ready = rng.uniform(0, 8, n)
+    yield "tour", dict(lat=lat, lon=lon)
+    yield "cvrp", dict(lat=lat, lon=lon, demand=demand, capacity=100)
+    yield "vrptw", dict(lat=lat, lon=lon, demand=demand, capacity=100,
+                        ready=ready, due=ready + rng.uniform(2, 6, n), service=0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--limits", type=float, nargs="+", default=[0, 0.5, 1, 3, 5])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'stops':>6} {'scenario':<8} {'limit s':>8} {'runtime s':>10} {'trucks':>7} {'km':>10} {'vs NN':>7} {'unserved':>9}")
+    for n in args.sizes:
+        for name, problem in scenarios(n, args.seed):
+            for limit in args.limits:
+                plan = solve_cvrp(DEPOT, time_limit=limit, **problem)
+                saved = 1 - plan.distance_km / plan.construction_km if plan.construction_km else 0.0
+                print(f"{n:>6} {name:<8} {limit:>8.1f} {plan.runtime_s:>10.2f} {len(plan.routes):>7} "
+                      f"{plan.distance_km:>10.0f} {saved:>7.1%} {len(plan.unassigned):>9}")
+
+
+if __name__ == "__main__":
+    main()
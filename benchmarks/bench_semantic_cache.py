@@ -0,0 +1,144 @@
+"""Hit rate, wrong-answer rate and lookup latency of the chatbot semantic cache.
+
+    python benchmarks/bench_semantic_cache.py [--questions 5000] [--destinations 50] [--model-latency 2.5]
+
+Replays a stream of chatbot questions: each picks a destination and an intent
+(both skewed towards a few popular ones) and asks it in one of several
+phrasings. Misses are "answered" by the model and stored; hits are checked
+against the intent that produced the cached answer, so a hit for a different
+intent counts as a wrong answer. Model time saved assumes --model-latency
+seconds per avoided call. The sweep shows the trade-off behind
+LLM_SEMANTIC_THRESHOLD, together with how many NEAR_MISSES pairs (questions
+that look alike but need different answers) would share an answer, with the
+compatibility guard and on embedding similarity alone. Lookup latency is
+measured against one scope holding --entries cached questions.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache, compatible, embed, signature  # noqa: E402
+
+# Intent -> phrasings users actually type; the first phrasing is the canonical one
+INTENTS = {
+    "when": ["best time to visit {d}?", "when should I go to {d}", "What's the ideal season to travel to {d}?",
+             "when is the best time of year for {d}"],
+    "pack": ["what should I pack for {d}?", "What to pack for a trip to {d}", "packing list for {d}"],
+    "visa": ["Do I need a visa for {d}?", "do I need a visa to enter {d}", "visa requirements for {d}"],
+    "food": ["What food should I try in {d}?", "which dishes should I try in {d}", "best restaurants in {d}",
+             "what to eat in {d}"],
+    "hotels": ["cheap hotels in {d}", "affordable accommodation in {d}", "budget hotels in {d}?"],
+    "safety": ["Is {d} safe at night?", "is it safe walking at night in {d}", "Is {d} dangerous at night?"],
+    "transport": ["How do I get around {d}?", "getting around {d} by public transport", "is public transport in {d} good"],
+    "airport": ["How do I get from the airport to the center of {d}?", "airport to {d} city center",
+                "best way from the airport into {d}"],
+    "budget": ["How much money do I need per day in {d}?", "daily budget for {d}", "how expensive is {d}"],
+    "museums": ["What are the must-see museums in {d}?", "which museums in {d} are must see", "best museums in {d}"],
+    "kids": ["Is {d} good for kids?", "family friendly things to do in {d}", "what to do in {d} with children"],
+    "tipping": ["Should I tip in {d}?", "tipping customs in {d}", "how much to tip in {d}"],
+}
+# Pairs that must never share an answer: swapped subject, reversed direction, negation
+NEAR_MISSES = [
+    ("How should I format the education section of my resume?", "How should I format the experience section of my resume?"),
+    ("How long should the summary section be?", "How long should the skills section be?"),
+    ("train or bus from Tokyo to Kyoto", "train or bus from Kyoto to Tokyo"),
+    ("How do I get from the airport to the city?", "How do I get from the city to the airport?"),
+    ("airport to the city", "city to the airport"),
+    ("Should I include a photo on a resume?", "Should I not include a photo on a resume?"),
+    ("Is tap water safe to drink?", "Is tap water not safe to drink?"),
+    ("best time to visit Rome in spring", "best time to visit Nice in spring"),
+    ("cheap hotels near the station", "cheap hostels near the station"),
+    ("Should a cover letter mention salary?", "Should a resume mention salary?"),
+]
+DESTINATIONS = ["Tokyo", "Paris", "Lisbon", "New York", "Rome", "Bangkok", "Barcelona", "Istanbul", "London", "Sydney"]
+
+
+def workload(n, destinations, seed=0):
+    """(destination, intent, question) tuples, popular destinations and intents first."""
+    rng = np.random.default_rng(seed)
+    names = [DESTINATIONS[i % len(DESTINATIONS)] + ("" if i < len(DESTINATIONS) else f" {i}") for i in range(destinations)]
+    intents = list(INTENTS)
+    dest_p = 1 / np.arange(1, len(names) + 1)
+    intent_p = 1 / np.arange(1, len(intents) + 1)
+    dests = rng.choice(len(names), n, p=dest_p / dest_p.sum())
+    kinds = rng.choice(len(intents), n, p=intent_p / intent_p.sum())
+    questions = []
+    for d, k in zip(dests, kinds):
+        phrasings = INTENTS[intents[k]]
+        questions.append((names[d], intents[k], phrasings[rng.integers(len(phrasings))].format(d=names[d])))
+    return questions
+
+
+def replay(questions, threshold, model_latency):
+    cache = SemanticCache(threshold=threshold, max_entries=len(questions), ttl=float("inf"))
+    answers = {}  # cached reply -> intent it answers
+    wrong = 0
+    lookups = []
+    for i, (destination, intent, question) in enumerate(questions):
+        start = time.perf_counter()
+        hit = cache.lookup(question, scope=destination)
+        lookups.append(time.perf_counter() - start)
+        if hit is None:
+            reply = f"answer {i}"
+            answers[reply] = intent
+            cache.store(question, reply, scope=destination, latency_s=model_latency)
+        elif answers[hit.reply] != intent:
+            wrong += 1
+    return cache.stats(), wrong, np.array(lookups)
+
+
+def near_misses(threshold):
+    """(pairs matched by similarity alone, pairs matched despite the compatibility guard)."""
+    similar = guarded = 0
+    for a, b in NEAR_MISSES:
+        if float(embed(a) @ embed(b)) >= threshold:
+            similar += 1
+            guarded += compatible(signature(a), signature(b))
+    return similar, guarded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--destinations", type=int, default=50)
+    parser.add_argument("--model-latency", type=float, default=2.5, help="seconds per model call avoided")
+    parser.add_argument("--entries", type=int, default=2000, help="cached questions in one scope for the latency test")
+    args = parser.parse_args()
+
+    questions = workload(args.questions, args.destinations)
+    # Upper bound: every repeat of a (destination, intent) pair answered from cache
+    ideal = 1 - len({(d, k) for d, k, _ in questions}) / len(questions)
+    exact = 1 - len({(d, q) for d, _, q in questions}) / len(questions)
+    print(f"{args.questions} questions over {args.destinations} destinations; "
+          f"exact-match hit rate {exact:.1%}, ideal semantic hit rate {ideal:.1%}\n")
+
+    print(f"{'threshold':>9} {'hit rate':>9} {'wrong':>7} {'model calls':>12} {'saved s':>9} {'lookup p50 us':>14} {'p99 us':>8} "
+          f"{'near misses':>12} {'unguarded':>10}")
+    for threshold in (0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95):
+        stats, wrong, lookups = replay(questions, threshold, args.model_latency)
+        similar, guarded = near_misses(threshold)
+        marker = "  <- default" if threshold == SemanticCache().threshold else ""
+        print(f"{threshold:>9.2f} {stats['hit_rate']:>9.1%} {wrong / len(questions):>7.2%} {stats['misses']:>12,} "
+              f"{stats['saved_s']:>9,.0f} {np.percentile(lookups, 50) * 1e6:>14.0f} {np.percentile(lookups, 99) * 1e6:>8.0f} "
+              f"{guarded:>5}/{len(NEAR_MISSES):<6} {similar:>4}/{len(NEAR_MISSES):<5}{marker}")
+
+    # Lookup cost against a large scope: one matrix-vector product over every cached question
+    cache = SemanticCache(max_entries=args.entries)
+    filler = workload(args.entries, 1, seed=1)
+    for i, (_, _, question) in enumerate(filler):
+        cache.store(f"{question} #{i}", "reply", scope="big")
+    probes = [q for _, _, q in workload(1000, 1, seed=2)]
+    start = time.perf_counter()
+    for question in probes:
+        cache.lookup(question, scope="big")
+    per_lookup = (time.perf_counter() - start) / len(probes)
+    print(f"\nlookup with {args.entries:,} entries in scope: {per_lookup * 1e6:.0f} us mean")
+
+
+if __name__ == "__main__":
+    main()
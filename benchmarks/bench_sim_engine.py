@@ -0,0 +1,52 @@
+"""Tick cost, snapshot cost and memory of sim_engine.SimulationEngine over a long run.
+
+    python benchmarks/bench_sim_engine.py [--ticks 604800] [--capacity 86400]
+
+Ticks are driven directly (no sleeping), so the default replays one week of
+1-second ticks. "buffers MB" is the ring-buffer storage, fixed at construction;
+"peak RSS MB" is the process high-water mark, which stops growing once the
+buffers are full.
+"""
+import argparse
+import os
+import sys
+import resource
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sim_engine import SimulationEngine  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=7 * 24 * 3600)
+    parser.add_argument("--capacity", type=int, default=86_400)
+    parser.add_argument("--window", type=int, default=300)
+    parser.add_argument("--checkpoints", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = SimulationEngine(capacity=args.capacity, window=args.window, seed=0)
+    step = max(args.ticks // args.checkpoints, 1)
+
+    buffers = sum(b._data.nbytes for b in [engine.time, *engine.buffers.values()]) / 2 ** 20
+    print(f"{'ticks':>9} {'us/tick':>8} {'snapshot us':>12} {'buffers MB':>11} {'peak RSS MB':>12}")
+    done = 0
+    while done < args.ticks:
+        batch = min(step, args.ticks - done)
+        start = time.perf_counter()
+        for i in range(batch):
+            engine.tick(now=done + i)
+        tick_us = (time.perf_counter() - start) / batch * 1e6
+        done += batch
+
+        start = time.perf_counter()
+        for _ in range(100):
+            engine.snapshot()
+        snapshot_us = (time.perf_counter() - start) / 100 * 1e6
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+        print(f"{done:>9} {tick_us:>8.1f} {snapshot_us:>12.1f} {buffers:>11.2f} {rss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Build, update and query cost of spatial_index.GridIndex against a brute-force scan.
+
+    python benchmarks/bench_spatial.py [--trucks 100000] [--queries 1000] [--cell-km 5]
+
+Trucks are spread over roughly 220 x 170 km around New York, as in the
+dashboard, and moved with Fleet.advance() for one 5-second refresh at the
+dashboard's 1 simulated minute per second. "brute" computes the haversine
+distance to every truck and partially sorts it, which is what a dispatch
+without an index has to do.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet import Fleet  # noqa: E402
+from routing import haversine  # noqa: E402
+from spatial_index import GridIndex, assign_nearest  # noqa: E402
+
+BOSTON = (42.3601, -71.0589)
+NEW_YORK = (40.7128, -74.0060)
+
+
+def timed(fn, queries):
+    """Mean and p99 milliseconds of fn(lat, lon) over the query points."""
+    samples = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        fn(lat, lon)
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1000
+    return samples.mean(), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trucks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--cell-km", type=float, default=5.0)
+    parser.add_argument("--radius", type=float, default=50.0, help="km, for the radius queries")
+    args = parser.parse_args()
+
+    fleet = Fleet.random(args.trucks, center=NEW_YORK, spread=1.0, seed=0)
+    rng = np.random.default_rng(1)
+    queries = np.column_stack([NEW_YORK[0] + rng.uniform(-1, 1, args.queries),
+                               NEW_YORK[1] + rng.uniform(-1, 1, args.queries)])
+
+    start = time.perf_counter()
+    index = GridIndex(fleet.lat, fleet.lon, cell_km=args.cell_km)
+    print(f"build: {(time.perf_counter() - start) * 1000:.1f} ms for {args.trucks:,} trucks")
+
+    fleet.advance(hours=5 / 60)
+    start = time.perf_counter()
+    index.update(fleet.lat, fleet.lon)
+    update_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    GridIndex(fleet.lat, fleet.lon, cell_km=args.cell_km)
+    rebuild_ms = (time.perf_counter() - start) * 1000
+    print(f"update: {update_ms:.1f} ms ({index.moved:,} trucks changed cell), rebuild: {rebuild_ms:.1f} ms")
+
+    print(f"\n{'query':<22} {'mean ms':>8} {'p99 ms':>8}")
+    for k in (1, 5, 10):
+        print(f"{f'knn k={k}':<22} {'%8.3f %8.3f' % timed(lambda lat, lon: index.knn(lat, lon, k), queries)}")
+    available = rng.random(args.trucks) < 0.1
+    print(f"{'knn k=1, 10% avail.':<22} "
+          f"{'%8.3f %8.3f' % timed(lambda lat, lon: index.knn(lat, lon, 1, mask=available), queries)}")
+    print(f"{f'within {args.radius:g} km':<22} "
+          f"{'%8.3f %8.3f' % timed(lambda lat, lon: index.within(lat, lon, args.radius), queries)}")
+    print(f"{'brute knn k=1':<22} "
+          f"{'%8.3f %8.3f' % timed(lambda lat, lon: np.argmin(haversine(lat, lon, fleet.lat, fleet.lon)), queries[:100])}")
+
+    # Agreement with brute force: nearest distances, which are what dispatch depends on
+    errors = []
+    for lat, lon in queries[:200]:
+        _, km = index.knn(lat, lon, 5)
+        errors.append(np.abs(km - np.sort(haversine(lat, lon, fleet.lat, fleet.lon))[:5]).max())
+    print(f"\nmax |knn - brute| over 5 nearest: {max(errors) * 1000:.1f} m")
+
+    for name, (lat, lon) in (("New York", NEW_YORK), ("Boston", BOSTON)):
+        ids, _ = index.within(lat, lon, args.radius)
+        brute = int((haversine(lat, lon, fleet.lat, fleet.lon) <= args.radius).sum())
+        print(f"trucks within {args.radius:g} km of {name}: {len(ids):,} (brute force {brute:,})")
+
+    available = np.ones(args.trucks, dtype=bool)
+    start = time.perf_counter()
+    ids, _ = assign_nearest(index, available, queries[:, 0], queries[:, 1])
+    print(f"dispatch {len(queries):,} deliveries: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{(ids >= 0).sum():,} assigned")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import llm_gateway
+
+SUMMARY_SYSTEM = "You summarize conversations faithfully and concisely."
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and an assistant.
+Keep names, places, dates, preferences, constraints and decisions; drop small talk.
+Reply with the updated summary only, in at most {words} words.
+
+Current summary:
+{summary}
+
+Turns to fold in:
+{turns}
+"""
+
+# Summaries are folded off the request path; one small pool serves every session
+_summarizer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text; avoids a tokenizer dependency
+    return max(1, len(text) // 4)
+
+
+def summarize_with_deepseek(prompt):
+    return llm_gateway.complete(prompt, system=SUMMARY_SYSTEM, temperature=0.2, top_p=0.9, max_tokens=300, use_cache=False,
+                                agent="chat_memory", prompt_type="summary")
+
+
+def _format_turns(turns):
+    return "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant in turns)
+
+
+# --- Conversation memory: recent turns verbatim, older turns in a rolling summary ---
+class ConversationMemory:
+    def __init__(self, summarize=summarize_with_deepseek, token_budget=1200, summary_words=150):
+        self.summarize = summarize
+        self.token_budget = token_budget  # verbatim history kept in each prompt
+        self.summary_words = summary_words
+        self.summary = ""
+        self.turns = []  # (user, assistant) pairs kept verbatim
+        self.prompt_tokens = []  # estimated prompt size of every turn
+        self._pending = []  # evicted turns not yet folded into the summary, oldest first
+        self._folding = False
+        self._lock = threading.Lock()
+
+    def build_prompt(self, question, instructions=""):
+        """Prompt for the next turn: cached summary + recent turns + the new question.
+
+        Evicted turns stay verbatim in the prompt until the summary covering them is ready.
+        """
+        with self._lock:
+            summary, turns = self.summary, self._pending + self.turns
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation:\n{summary}")
+        if turns:
+            parts.append(f"Recent conversation:\n{_format_turns(turns)}")
+        parts.append(f"{instructions} User asks: {question}".strip())
+        prompt = "\n\n".join(parts)
+
+        with self._lock:
+            self.prompt_tokens.append(estimate_tokens(prompt))
+        return prompt
+
+    def has_context(self):
+        """True once the conversation has turns, verbatim or summarized, that shape the next answer."""
+        with self._lock:
+            return bool(self.summary or self.turns or self._pending)
+
+    def add_turn(self, user, assistant):
+        with self._lock:
+            self.turns.append((user, assistant))
+            # Always keep the latest turn, even if it alone exceeds the budget
+            while len(self.turns) > 1 and estimate_tokens(_format_turns(self.turns)) > self.token_budget:
+                self._pending.append(self.turns.pop(0))
+            start = bool(self._pending) and not self._folding
+            if start:
+                self._folding = True
+        if start:
+            _summarizer.submit(self._fold)
+
+    def _fold(self):
+        # Runs in the background; turns evicted meanwhile are picked up by the loop
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._folding = False
+                    return
+                # The batch stays in _pending, and so in the prompt, until its summary is ready
+                batch = list(self._pending)
+                summary = self.summary
+
+            prompt = SUMMARY_PROMPT.format(
+                words=self.summary_words,
+                summary=summary or "(empty)",
+                turns=_format_turns(batch),
+            )
+            try:
+                updated = self.summarize(prompt).strip()
+            except Exception:
+                updated = ""
+
+            with self._lock:
+                if not updated:
+                    # Keep the turns and retry when the next turn is added
+                    self._folding = False
+                    return
+                self.summary = updated
+                del self._pending[:len(batch)]
+
+    def stats(self):
+        with self._lock:
+            sizes = self.prompt_tokens
+            return {
+                "turns": len(self.turns),
+                "pending_summary_turns": len(self._pending),
+                "summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+                "last_prompt_tokens": sizes[-1] if sizes else 0,
+                "avg_prompt_tokens": round(sum(sizes) / len(sizes)) if sizes else 0,
+                "max_prompt_tokens": max(sizes) if sizes else 0,
+            }
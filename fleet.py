@@ -0,0 +1,126 @@
+import numpy as np
+
+KM_PER_DEG_LAT = 111.32
+WAREHOUSE = (40.7128, -74.0060)  # New York warehouse
+
+# Columns shown in the dashboard table, same names as the original DataFrame
+TABLE_COLUMNS = ["Truck ID", "Latitude", "Longitude", "Speed (km/h)"]
+
+
+# --- Fleet state as parallel NumPy arrays (one row per truck) ---
+class Fleet:
+    def __init__(self, ids, lat, lon, speed, heading, seed=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.speed = np.asarray(speed, dtype=np.float64)  # km/h
+        self.heading = np.asarray(heading, dtype=np.float64)  # radians, 0 = north
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def random(cls, n, center=WAREHOUSE, spread=1.0, speed_range=(40, 100), seed=None):
+        rng = np.random.default_rng(seed)
+        return cls(
+            ids=np.arange(1, n + 1),
+            lat=center[0] + rng.uniform(-spread, spread, n),
+            lon=center[1] + rng.uniform(-spread, spread, n),
+            speed=rng.integers(speed_range[0], speed_range[1] + 1, n),
+            heading=rng.uniform(0, 2 * np.pi, n),
+            seed=rng.integers(2 ** 32),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def advance(self, hours, turn_sigma=0.3, speed_sigma=5.0, speed_bounds=(20, 110)):
+        """Heading-based motion: every truck turns a little, adjusts speed and drives on."""
+        n = len(self)
+        self.heading += self._rng.normal(0.0, turn_sigma, n)
+        np.clip(self.speed + self._rng.normal(0.0, speed_sigma, n), *speed_bounds, out=self.speed)
+        distance = self.speed * hours  # km
+        self.lat += distance * np.cos(self.heading) / KM_PER_DEG_LAT
+        self.lon += distance * np.sin(self.heading) / (KM_PER_DEG_LAT * np.cos(np.radians(self.lat)))
+
+    def random_walk(self, max_step_deg):
+        """The original simulation: independent uniform jitter in degrees per refresh."""
+        n = len(self)
+        self.lat += self._rng.uniform(-max_step_deg, max_step_deg, n)
+        self.lon += self._rng.uniform(-max_step_deg, max_step_deg, n)
+
+    def to_frame(self, limit=None):
+        import pandas as pd
+
+        rows = slice(None, limit)
+        return pd.DataFrame({
+            "Truck ID": [f"T-{i}" for i in self.ids[rows]],
+            "Latitude": self.lat[rows],
+            "Longitude": self.lon[rows],
+            "Speed (km/h)": self.speed[rows].round().astype(int),
+        })
+
+
+# --- Rendering: one WebGL layer or one clustered layer instead of a Marker per truck ---
+def _aggregate(fleet, cell_deg):
+    """Bin trucks into lat/lon cells: one point per occupied cell at the trucks' mean position."""
+    cells = np.floor(np.column_stack([fleet.lat, fleet.lon]) / cell_deg).astype(np.int64)
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    return (
+        np.bincount(inverse, weights=fleet.lat) / counts,
+        np.bincount(inverse, weights=fleet.lon) / counts,
+        counts,
+    )
+
+
+def deck(fleet, center=WAREHOUSE, zoom=6, max_points=5_000, cell_deg=0.05):
+    """pydeck ScatterplotLayer of the fleet.
+
+    Up to `max_points` trucks are drawn individually with tooltips; larger fleets
+    are binned server-side so the JSON sent to the browser stays bounded.
+    """
+    import pandas as pd
+    import pydeck as pdk
+
+    if len(fleet) <= max_points:
+        data = pd.DataFrame({
+            "id": fleet.ids,
+            "lat": fleet.lat.round(5),
+            "lon": fleet.lon.round(5),
+            "speed": fleet.speed.round().astype(int),
+        })
+        radius = 800
+        tooltip = {"text": "🚛 T-{id} - {speed} km/h"}
+    else:
+        lat, lon, counts = _aggregate(fleet, cell_deg)
+        data = pd.DataFrame({
+            "lat": lat.round(4),
+            "lon": lon.round(4),
+            "count": counts,
+            "radius": (400 * np.sqrt(counts)).round(),
+        })
+        radius = "radius"
+        tooltip = {"text": "🚛 {count} trucks"}
+
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=data,
+        get_position=["lon", "lat"],
+        get_fill_color=[255, 140, 0, 200],
+        get_radius=radius,
+        radius_min_pixels=2,
+        radius_max_pixels=30,
+        pickable=True,
+    )
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=center[0], longitude=center[1], zoom=zoom),
+        tooltip=tooltip,
+        map_style=None,
+    )
+
+
+def marker_cluster(fleet, folium_map):
+    from folium.plugins import FastMarkerCluster
+
+    FastMarkerCluster(data=np.column_stack([fleet.lat, fleet.lon]).round(5).tolist()).add_to(folium_map)
+    return folium_map
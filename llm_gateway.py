@@ -0,0 +1,406 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from dotenv import load_dotenv
+
+import llm_scheduler
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+# --- Load GitHub Token ---
+load_dotenv()
+
+# --- DeepSeek endpoint shared by every app ---
+# LLM_ENDPOINT can point at a local mock_inference server; LLM_BACKEND=mock uses its in-process fake instead
+ENDPOINT = os.getenv("LLM_ENDPOINT", "https://models.github.ai/inference")
+MODEL = "deepseek/DeepSeek-V3-0324"
+BACKEND = os.getenv("LLM_BACKEND", "azure")
+
+# --- Cache settings (override through the environment) ---
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_cache.sqlite3"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 24 * 3600))  # seconds
+CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 512))  # in-memory entries
+CACHE_ENABLED = os.getenv("LLM_CACHE", "on") != "off"  # off: every call reaches the model, e.g. for benchmarks
+
+# --- Telemetry settings: one JSONL shared by every app process, "" to keep records in memory only ---
+TELEMETRY_PATH = os.getenv("LLM_TELEMETRY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_telemetry.jsonl"))
+TELEMETRY_MAX_MB = float(os.getenv("LLM_TELEMETRY_MAX_MB", 10))  # rotated beyond this, 3 backups kept
+METRICS_PORT = os.getenv("LLM_METRICS_PORT")  # serve Prometheus text on :port/metrics when set
+METRICS_HOST = os.getenv("LLM_METRICS_HOST", "127.0.0.1")  # "0.0.0.0" exposes it beyond this machine
+
+
+# --- One pooled client per process ---
+# Streamlit re-executes the app script on every interaction but keeps imported
+# modules, so the client (and its HTTP connection pool) lives here, not in the app.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None and BACKEND == "mock":
+                import mock_inference
+
+                _client = mock_inference.from_env()
+            elif _client is None:
+                # The SDK is imported here so apps and tools that never call the model don't pay for it
+                from azure.ai.inference import ChatCompletionsClient
+                from azure.core.credentials import AzureKeyCredential
+
+                # Retries are owned by the scheduler below, not the SDK's retry policy
+                _client = ChatCompletionsClient(
+                    endpoint=ENDPOINT,
+                    credential=AzureKeyCredential(os.getenv("GITHUB_TOKEN")),
+                    retry_total=0,
+                )
+    return _client
+
+
+# --- Two-tier response cache: LRU in memory, SQLite on disk ---
+class ResponseCache:
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL, path=CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created_at, text)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model, system, prompt, temperature, top_p, max_tokens):
+        raw = json.dumps([model, system, prompt, temperature, top_p, max_tokens])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _fresh(self, created_at):
+        return time.time() - created_at < self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT created_at, text FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if self._fresh(row[0]):
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[1]
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key, text):
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, text, created_at) VALUES (?, ?, ?)",
+                    (key, text, created_at),
+                )
+                self._db.commit()
+
+    def _remember(self, key, created_at, text):
+        self._entries[key] = (created_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+            }
+
+
+cache = ResponseCache()
+
+
+def _cache_put(key, text):
+    # The SQLite file is shared by every app process; a failed write (e.g. "database is locked") only costs a later hit
+    try:
+        cache.put(key, text)
+    except Exception as e:
+        logger.warning("response cache write failed: %s", e)
+
+
+# --- Single-flight: identical in-flight requests share one DeepSeek call ---
+RELEASED = object()  # result handed to waiters when the leader gave up without an answer
+
+
+class SingleFlight:
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls = {}  # key -> Future of the call currently in flight
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Return (future, is_leader); only the leader should issue the call.
+
+        A waiter whose future resolves to RELEASED calls begin() again; the first
+        to do so leads the retry.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def finish(self, key, result=None, error=None):
+        with self._lock:
+            future = self._calls.pop(key)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def release(self, key):
+        """The leader stopped without a result or an error; waiters retry instead of failing."""
+        self.finish(key, result=RELEASED)
+
+    def do(self, key, fn):
+        future, leader = self.begin(key)
+        while not leader:
+            result = future.result()
+            if result is not RELEASED:
+                return result
+            future, leader = self.begin(key)
+        try:
+            result = fn()
+        except Exception as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result=result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+flights = SingleFlight()
+
+# Rate limiting, retries with backoff and adaptive concurrency for every call
+scheduler = llm_scheduler.from_env()
+
+
+def _messages(system, prompt):
+    from azure.ai.inference.models import SystemMessage, UserMessage
+
+    return [SystemMessage(system), UserMessage(prompt)]
+
+
+# --- Per-call telemetry: agent, prompt type, timings, tokens and outcome of every call ---
+calls = telemetry.Telemetry(TELEMETRY_PATH or None, max_bytes=int(TELEMETRY_MAX_MB * 2 ** 20))
+
+
+def record_hit(agent, prompt_type, outcome="semantic_hit"):
+    """Telemetry for a reply served without calling complete() or stream(), e.g. from an app's semantic cache or store."""
+    calls.start(agent, prompt_type, MODEL).finish(outcome)
+
+
+def metrics_text():
+    """Prometheus text: per-call metrics plus cache, single-flight and scheduler gauges of this process."""
+    lines = [calls.prometheus().rstrip("\n")]
+    for prefix, stats in (("llm_cache", cache.stats()), ("llm_singleflight", flights.stats()), ("llm_scheduler", scheduler.stats())):
+        for name, value in stats.items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+if METRICS_PORT:
+    try:
+        telemetry.serve(metrics_text, int(METRICS_PORT), METRICS_HOST)
+    except OSError as e:
+        # Several app processes share the setting; the first one to bind serves its own metrics
+        telemetry.logger.warning("metrics endpoint not started on port %s: %s", METRICS_PORT, e)
+
+
+# --- Cached completion; raises on API errors so callers decide how to report them ---
+def complete(prompt, system, temperature, top_p, max_tokens, model=MODEL, use_cache=True, agent=None, prompt_type=None):
+    call = calls.start(agent, prompt_type, model)
+    key = ResponseCache.make_key(model, system, prompt, temperature, top_p, max_tokens)
+    use_cache = use_cache and CACHE_ENABLED
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            call.finish("cache_hit")
+            return cached
+
+    def request():
+        call.attempt()
+        return get_client().complete(
+            messages=_messages(system, prompt),
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            model=model,
+        )
+
+    def leader():
+        response = scheduler.run(request)
+        call.first_token()
+        call.usage(getattr(response, "usage", None))
+        text = response.choices[0].message.content
+        # Fill the cache before the flight lands so no caller slips between the two
+        if use_cache and text:
+            _cache_put(key, text)
+        call.finish("ok", system + prompt, text or "")
+        return text
+
+    try:
+        text = flights.do(key, leader)
+    except Exception as e:
+        call.finish(telemetry.outcome_of(e))
+        raise
+    # No-op for the leader, which has already recorded its call
+    call.finish("coalesced")
+    return text
+
+
+# --- Streaming completion; cache hits and coalesced calls arrive as one chunk ---
+def stream(prompt, system, temperature, top_p, max_tokens, model=MODEL, use_cache=True, agent=None, prompt_type=None):
+    call = calls.start(agent, prompt_type, model, stream=True)
+    key = ResponseCache.make_key(model, system, prompt, temperature, top_p, max_tokens)
+    use_cache = use_cache and CACHE_ENABLED
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            call.finish("cache_hit")
+            yield cached
+            return
+
+    future, leader = flights.begin(key)
+    while not leader:
+        try:
+            text = future.result()
+        except Exception as e:
+            call.finish(telemetry.outcome_of(e))
+            raise
+        if text is not RELEASED:
+            call.finish("coalesced")
+            yield text
+            return
+        future, leader = flights.begin(key)
+
+    def request():
+        call.attempt()
+        return get_client().complete(
+            stream=True,
+            messages=_messages(system, prompt),
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            model=model,
+        )
+
+    parts = []
+    try:
+        # Only opening the stream is retried; hedging would leave a second stream unread
+        response = scheduler.run(request, hedge=False)
+        for update in response:
+            call.usage(getattr(update, "usage", None))
+            if update.choices and update.choices[0].delta.content:
+                call.first_token()
+                parts.append(update.choices[0].delta.content)
+                yield parts[-1]
+    except GeneratorExit:
+        # The consumer stopped reading; waiting callers retry rather than get a partial answer
+        flights.release(key)
+        call.finish("abandoned", system + prompt, "".join(parts))
+        raise
+    except Exception as e:
+        flights.finish(key, error=e)
+        call.finish(telemetry.outcome_of(e), system + prompt, "".join(parts))
+        raise
+
+    text = "".join(parts)
+    try:
+        if use_cache and text:
+            _cache_put(key, text)
+    finally:
+        # Waiters must never be stranded on the flight, whatever happens to the cache write
+        flights.finish(key, result=text)
+    call.finish("ok", system + prompt, text)
+
+
+def invalidate(prompt, system, temperature, top_p, max_tokens, model=MODEL):
+    cache.invalidate(ResponseCache.make_key(model, system, prompt, temperature, top_p, max_tokens))
+
+
+# --- Agent-facing calls: each agent binds its own GENERATION settings, e.g. functools.partial(ask, GENERATION) ---
+def ask(generation, prompt, prompt_type=None):
+    """Raises on API errors; used where failures must be retried, e.g. batch runs."""
+    return complete(prompt, prompt_type=prompt_type, **generation).strip()
+
+
+def ask_or_error(generation, prompt, prompt_type=None, status=None):
+    """Returns the error text instead of raising; pass `status` to get the exception in status["error"]."""
+    try:
+        return ask(generation, prompt, prompt_type)
+    except Exception as e:
+        if status is not None:
+            status["error"] = e
+        return f"Error: {e}"
+
+
+def ask_stream(generation, prompt, prompt_type=None, status=None):
+    """Yields the error text after any partial reply; `status["error"]` marks the reply as failed."""
+    try:
+        yield from stream(prompt, prompt_type=prompt_type, **generation)
+    except Exception as e:
+        if status is not None:
+            status["error"] = e
+        yield f"Error: {e}"
@@ -0,0 +1,250 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
+# HTTP statuses worth another attempt; everything else is surfaced immediately
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# azure-core transport errors that carry no status code
+RETRYABLE_ERRORS = {"ServiceRequestError", "ServiceResponseError", "ServiceRequestTimeoutError", "ServiceResponseTimeoutError"}
+
+
+# --- Error classification ---
+def status_code(exc):
+    # azure-core HttpResponseError exposes status_code, urllib's HTTPError exposes code
+    for attr in ("status_code", "code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def retry_after(exc):
+    """Seconds the server asked us to wait, or None."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(exc, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc):
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return isinstance(exc, (TimeoutError, ConnectionError)) or type(exc).__name__ in RETRYABLE_ERRORS
+
+
+# --- Token bucket, shared across threads and optionally across processes ---
+class TokenBucket:
+    def __init__(self, rate, capacity=None, path=None, name="deepseek"):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.name = name
+        self.path = path  # SQLite file whose write lock serialises every process using it
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        if path:
+            db = sqlite3.connect(path, timeout=30)
+            db.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            db.commit()
+            db.close()
+
+    def acquire(self, tokens=1.0):
+        """Block until `tokens` are available; returns the seconds spent waiting."""
+        start = time.monotonic()
+        while True:
+            shortfall = self._take_shared(tokens) if self.path else self._take_local(tokens)
+            if shortfall <= 0:
+                return time.monotonic() - start
+            time.sleep(shortfall)
+
+    def _refill(self, tokens_now, elapsed):
+        return min(self.capacity, tokens_now + elapsed * self.rate)
+
+    def _take_local(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = self._refill(self._tokens, now - self._updated)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def _take_shared(self, tokens):
+        # Wall-clock time here, since monotonic clocks are not comparable across processes
+        with self._lock:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                row = db.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                now = time.time()
+                available = self.capacity if row is None else self._refill(row[0], max(now - row[1], 0.0))
+                shortfall = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    shortfall = (tokens - available) / self.rate
+                db.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (self.name, available, now),
+                )
+                db.execute("COMMIT")
+                return shortfall
+            finally:
+                db.close()
+
+
+# --- Additive-increase / multiplicative-decrease concurrency limit ---
+class AIMDLimiter:
+    def __init__(self, initial=6, minimum=1, maximum=16, increase=1.0, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= max(int(self.limit), 1):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            else:
+                # Roughly +increase per full window of successful calls
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+
+# --- Scheduler: rate limit, adaptive concurrency, retries and optional hedging ---
+class Scheduler:
+    def __init__(self, bucket=None, limiter=None, max_retries=4, base_delay=0.5, max_delay=30.0, hedge_after=None):
+        self.bucket = bucket
+        self.limiter = limiter or AIMDLimiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after  # seconds before a duplicate request is fired, None disables
+        self.retries = 0
+        self.throttled = 0
+        self.hedges = 0
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def run(self, fn, hedge=True):
+        """Call fn() under the rate and concurrency limits, retrying transient failures.
+
+        Pass hedge=False for calls whose result must be consumed exactly once,
+        such as opening a stream.
+        """
+        attempt = 0
+        while True:
+            try:
+                if hedge and self.hedge_after is not None:
+                    return self._hedged(fn)
+                return self._call(fn)
+            except Exception as e:
+                server_delay = retry_after(e)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                # A Retry-After past max_delay (e.g. an exhausted daily quota) would park the caller for hours
+                if server_delay is not None and server_delay > self.max_delay:
+                    raise
+                self.retries += 1
+                time.sleep(self.backoff(attempt, server_delay))
+                attempt += 1
+
+    def backoff(self, attempt, server_delay=None):
+        # Full jitter, but never earlier than the server's Retry-After
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+        return delay
+
+    def _call(self, fn):
+        if self.bucket is not None:
+            self.bucket.acquire()
+        self.limiter.acquire()
+        throttled = False
+        try:
+            return fn()
+        except Exception as e:
+            throttled = status_code(e) == 429
+            if throttled:
+                self.throttled += 1
+            raise
+        finally:
+            self.limiter.release(throttled)
+
+    def _hedged(self, fn):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.limiter.maximum * 2, thread_name_prefix="hedge")
+        primary = self._pool.submit(self._call, fn)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        pending = {primary, self._pool.submit(self._call, fn)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The slower request keeps running; its result is dropped
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self):
+        return {
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "hedges": self.hedges,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+        }
+
+
+def from_env():
+    """Scheduler configured from LLM_* environment variables."""
+    rate_per_min = float(os.getenv("LLM_RATE_PER_MIN", 15))
+    hedge_after = os.getenv("LLM_HEDGE_AFTER")
+    return Scheduler(
+        bucket=TokenBucket(
+            rate=rate_per_min / 60.0,
+            capacity=float(os.getenv("LLM_RATE_BURST", 6)),
+            path=os.getenv("LLM_RATE_LOCK") or None,
+        ),
+        limiter=AIMDLimiter(
+            initial=int(os.getenv("LLM_CONCURRENCY", 6)),
+            maximum=int(os.getenv("LLM_MAX_CONCURRENCY", 16)),
+        ),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 4)),
+        hedge_after=float(hedge_after) if hedge_after else None,
+    )
+
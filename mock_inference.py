@@ -0,0 +1,270 @@
+"""Offline stand-in for the DeepSeek chat-completions endpoint.
+
+Two ways to run the apps without GITHUB_TOKEN or network access:
+
+    LLM_BACKEND=mock streamlit run trip.py
+        llm_gateway.get_client() returns MockChatCompletionsClient, an in-process
+        fake with the same complete() / complete(stream=True) surface.
+
+    python mock_inference.py --port 8000
+    LLM_ENDPOINT=http://127.0.0.1:8000 GITHUB_TOKEN=unused streamlit run trip.py
+        The real ChatCompletionsClient talks to a local HTTP server that speaks
+        the same JSON and server-sent-events protocol.
+
+Both draw time-to-first-token from a lognormal distribution, emit tokens at a
+fixed rate, and fail a configurable share of calls with 429 (with Retry-After)
+or a timeout. Settings come from LLM_MOCK_* variables (see from_env) or the
+command line. Replies are deterministic per prompt, so caches behave as they
+would against the real model.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+WORDS = (
+    "plan day visit local museum market route hotel budget travel safety tip morning evening walk food tour "
+    "experience skills project team impact results resume data stock supplier delivery demand cost week city"
+).split()
+
+TOKENS_PER_CHUNK = 4  # words per streamed update
+
+
+# --- Latency, length and failure model shared by the fake client and the server ---
+class MockBehaviour:
+    def __init__(self, ttft=0.2, ttft_sigma=0.5, tokens_per_s=200.0, reply_tokens=120, error_rate=0.0,
+                 timeout_rate=0.0, timeout_s=1.0, retry_after=0.5, seed=None):
+        self.ttft = ttft  # median seconds before the first token
+        self.ttft_sigma = ttft_sigma  # lognormal shape; 0 makes every call take exactly ttft
+        self.tokens_per_s = tokens_per_s
+        self.reply_tokens = reply_tokens  # mean reply length, capped by max_tokens
+        self.error_rate = error_rate  # share of calls answered with 429
+        self.timeout_rate = timeout_rate  # share of calls that hang for timeout_s, then fail
+        self.timeout_s = timeout_s
+        self.retry_after = retry_after  # seconds, sent with every 429
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.timeouts = 0
+
+    def draw(self, max_tokens=None):
+        """Outcome of one call: ("ok" | "429" | "timeout", seconds to first token, reply tokens)."""
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            ttft = self.ttft * self._rng.lognormvariate(0.0, self.ttft_sigma) if self.ttft_sigma else self.ttft
+            tokens = max(1, int(self._rng.gauss(self.reply_tokens, self.reply_tokens / 4)))
+            if roll < self.error_rate:
+                self.throttled += 1
+                return "429", 0.0, 0
+            if roll < self.error_rate + self.timeout_rate:
+                self.timeouts += 1
+                return "timeout", self.timeout_s, 0
+        return "ok", ttft, min(tokens, max_tokens) if max_tokens else tokens
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "throttled": self.throttled, "timeouts": self.timeouts}
+
+
+def reply_words(prompt, n):
+    """n words chosen deterministically from the prompt."""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    return [rng.choice(WORDS) for _ in range(n)]
+
+
+def chunks(words):
+    for i in range(0, len(words), TOKENS_PER_CHUNK):
+        yield ("" if i == 0 else " ") + " ".join(words[i:i + TOKENS_PER_CHUNK])
+
+
+def usage(prompt, completion_tokens):
+    prompt_tokens = max(1, len(prompt) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+# --- In-process fake client ---
+class MockError(Exception):
+    """Shaped like an HTTP error for llm_scheduler: status_code plus Retry-After header."""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"({status_code}) {message}")
+        self.status_code = status_code
+        self.headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+
+
+class MockChatCompletionsClient:
+    """Drop-in for azure.ai.inference.ChatCompletionsClient as used by llm_gateway."""
+
+    def __init__(self, behaviour=None):
+        self.behaviour = behaviour or MockBehaviour()
+
+    def complete(self, messages, stream=False, model=None, max_tokens=None, **kwargs):
+        prompt = "\n".join(str(getattr(m, "content", m)) for m in messages)
+        outcome, ttft, n_tokens = self.behaviour.draw(max_tokens)
+        if outcome == "429":
+            raise MockError(429, "Too Many Requests", self.behaviour.retry_after)
+        time.sleep(ttft)
+        if outcome == "timeout":
+            raise TimeoutError(f"mock request timed out after {ttft:.1f}s")
+
+        words = reply_words(prompt, n_tokens)
+        if stream:
+            return self._stream(words, usage(prompt, n_tokens))
+        time.sleep(n_tokens / self.behaviour.tokens_per_s)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                     message=SimpleNamespace(role="assistant", content=" ".join(words)))],
+            usage=SimpleNamespace(**usage(prompt, n_tokens)),
+        )
+
+    def _stream(self, words, final_usage):
+        for text in chunks(words):
+            time.sleep(TOKENS_PER_CHUNK / self.behaviour.tokens_per_s)
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=text))], usage=None)
+        # Like the service, the last update carries token usage and no choices
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(**final_usage))
+
+    def close(self):
+        pass
+
+
+# --- HTTP server speaking the inference endpoint's protocol ---
+class _Handler(BaseHTTPRequestHandler):
+    behaviour = None  # set per server in MockInferenceServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self._json(404, {"error": {"code": "NotFound", "message": self.path}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        outcome, ttft, n_tokens = self.behaviour.draw(body.get("max_tokens"))
+
+        if outcome == "429":
+            self._json(429, {"error": {"code": "RateLimitReached", "message": "Too Many Requests"}},
+                       {"Retry-After": str(self.behaviour.retry_after)})
+            return
+        time.sleep(ttft)
+        if outcome == "timeout":
+            # Drop the connection without answering, as a gateway timeout looks to the client
+            self.close_connection = True
+            return
+
+        words = reply_words(prompt, n_tokens)
+        model = body.get("model", "mock")
+        if not body.get("stream"):
+            time.sleep(n_tokens / self.behaviour.tokens_per_s)
+            self._json(200, {
+                "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage(prompt, n_tokens),
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        update = {"id": "mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for text in chunks(words):
+            time.sleep(TOKENS_PER_CHUNK / self.behaviour.tokens_per_s)
+            self._event({**update, "choices": [{"index": 0, "delta": {"role": "assistant", "content": text}}]})
+        self._event({**update, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                     "usage": usage(prompt, n_tokens)})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _event(self, payload):
+        self.wfile.write(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class MockInferenceServer:
+    """Threaded HTTP server on `port` (0 picks a free one); use as LLM_ENDPOINT=server.url."""
+
+    def __init__(self, behaviour=None, host="127.0.0.1", port=0):
+        self.behaviour = behaviour or MockBehaviour()
+        handler = type("Handler", (_Handler,), {"behaviour": self.behaviour})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def behaviour_from_env():
+    """MockBehaviour configured from LLM_MOCK_* environment variables."""
+    seed = os.getenv("LLM_MOCK_SEED")
+    return MockBehaviour(
+        ttft=float(os.getenv("LLM_MOCK_TTFT", 0.2)),
+        ttft_sigma=float(os.getenv("LLM_MOCK_TTFT_SIGMA", 0.5)),
+        tokens_per_s=float(os.getenv("LLM_MOCK_TOKENS_PER_S", 200)),
+        reply_tokens=int(os.getenv("LLM_MOCK_REPLY_TOKENS", 120)),
+        error_rate=float(os.getenv("LLM_MOCK_ERROR_RATE", 0)),
+        timeout_rate=float(os.getenv("LLM_MOCK_TIMEOUT_RATE", 0)),
+        timeout_s=float(os.getenv("LLM_MOCK_TIMEOUT_S", 1.0)),
+        seed=int(seed) if seed else None,
+    )
+
+
+def from_env():
+    return MockChatCompletionsClient(behaviour_from_env())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--ttft", type=float, help="median seconds to first token")
+    parser.add_argument("--tokens-per-s", type=float)
+    parser.add_argument("--error-rate", type=float, help="share of calls answered with 429")
+    parser.add_argument("--timeout-rate", type=float, help="share of calls that hang, then drop")
+    args = parser.parse_args()
+
+    behaviour = behaviour_from_env()
+    for name in ("ttft", "tokens_per_s", "error_rate", "timeout_rate"):
+        if getattr(args, name) is not None:
+            setattr(behaviour, name, getattr(args, name))
+    server = MockInferenceServer(behaviour, args.host, args.port).start()
+    print(f"Mock inference endpoint at {server.url} (set LLM_ENDPOINT={server.url} and any GITHUB_TOKEN)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,59 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+import llm_gateway
+import telemetry
+
+# --- Streamlit Configuration ---
+st.set_page_config(page_title="📊 LLM Telemetry", page_icon="📊", layout="wide")
+
+st.title("📊 LLM Telemetry")
+st.write("Latency, token spend and outcomes of every DeepSeek call made by the trip, resume and supply agents.")
+
+# --- Source: the JSONL every app process appends to, or this process's memory when it is disabled ---
+hours = st.sidebar.slider("Window (hours)", min_value=1, max_value=168, value=24)
+since = time.time() - hours * 3600
+if llm_gateway.TELEMETRY_PATH:
+    records = telemetry.load_jsonl(llm_gateway.TELEMETRY_PATH, since=since)
+    st.sidebar.caption(f"Reading {llm_gateway.TELEMETRY_PATH}")
+else:
+    records = [r for r in llm_gateway.calls.recent if r["ts"] >= since]
+    st.sidebar.caption("LLM_TELEMETRY_PATH is empty: showing this process's recent calls only")
+st.sidebar.button("🔄 Refresh")
+
+if not records:
+    st.info("No model calls recorded in this window yet.")
+    st.stop()
+
+frame = pd.DataFrame(records)
+billed = frame[~frame["outcome"].isin(telemetry.FREE_OUTCOMES)]
+
+# --- Headline numbers ---
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Calls", f"{len(frame):,}")
+col2.metric("Cache hits", f"{frame['outcome'].isin(telemetry.CACHE_OUTCOMES).mean():.0%}")
+col3.metric("p95 latency", f"{billed['latency_s'].quantile(0.95):.2f} s" if len(billed) else "–")
+col4.metric("Tokens", f"{int(frame['prompt_tokens'].sum() + frame['completion_tokens'].sum()):,}")
+
+# --- Percentiles and spend per agent ---
+st.header("⏱️ Per agent and prompt type")
+st.dataframe(pd.DataFrame(telemetry.summarize(records)), hide_index=True)
+
+st.header("🪙 Token spend per agent")
+spend = frame.groupby("agent")[["prompt_tokens", "completion_tokens"]].sum()
+st.bar_chart(spend)
+if frame["tokens_estimated"].any():
+    st.caption(f"{int(frame['tokens_estimated'].sum())} calls returned no usage; their tokens are estimated from text length.")
+
+st.header("🚦 Outcomes")
+st.dataframe(frame.pivot_table(index="agent", columns="outcome", values="ts", aggfunc="count", fill_value=0))
+
+# --- Latest calls and raw export ---
+with st.expander("Recent calls"):
+    st.dataframe(frame.sort_values("ts", ascending=False).head(200), hide_index=True)
+
+with st.expander("Prometheus metrics (this process)"):
+    st.code(llm_gateway.metrics_text(), language="text")
+    st.caption("Set LLM_METRICS_PORT to serve the same text at http://127.0.0.1:<port>/metrics (LLM_METRICS_HOST to bind another address).")
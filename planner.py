@@ -0,0 +1,176 @@
+import hashlib
+import time
+
+import numpy as np
+from scipy import sparse
+
+try:
+    import highspy
+except ImportError:  # optional: enables warm starts between solves
+    highspy = None
+
+# Variable blocks, each of shape (sku, site, period)
+VARIABLES = ("produce", "procure", "inventory", "unmet")
+
+# HiGHS treats bounds at or above this as infinite; linprog rejects real infinities
+INF = 1e20
+
+
+class ProductionPlan:
+    def __init__(self, success, status, objective, values, runtime_s, warm_start):
+        self.success = success
+        self.status = status
+        self.objective = objective
+        self.runtime_s = runtime_s
+        self.warm_start = warm_start  # re-solved from the previous basis
+        for name in VARIABLES:
+            setattr(self, name, values[name] if values else None)
+
+    def __repr__(self):
+        return (f"ProductionPlan(success={self.success}, objective={self.objective:.2f}, "
+                f"runtime_s={self.runtime_s:.3f}, warm_start={self.warm_start})")
+
+
+# --- Multi-period, multi-site, multi-SKU production / procurement LP ---
+class ProductionPlanner:
+    """Sparse LP over SKU x site x period, built once and re-solved as inputs change.
+
+    For every (sku, site, period):
+        inventory[t] = inventory[t-1] + produce[t - production_lead] + procure[t - procurement_lead]
+                       - demand[t] + unmet[t]
+    subject to shared production capacity per site and period (weighted by
+    capacity_usage per SKU) and storage capacity per site. Minimises
+    production, procurement, holding and shortage cost.
+
+    The constraint matrix depends only on the dimensions, lead times and
+    capacity usage, so it is assembled once; solve() only swaps costs and
+    right-hand sides, returns the previous plan when nothing changed, and
+    warm-starts HiGHS from the previous basis when highspy is installed.
+    """
+
+    def __init__(self, n_skus, n_sites, n_periods, production_lead=0, procurement_lead=0, capacity_usage=1.0,
+                 warm_start=True):
+        self.shape = (n_skus, n_sites, n_periods)
+        self.production_lead = np.broadcast_to(np.asarray(production_lead, dtype=np.int64), (n_skus,))
+        self.procurement_lead = np.broadcast_to(np.asarray(procurement_lead, dtype=np.int64), (n_skus,))
+        self.capacity_usage = np.broadcast_to(np.asarray(capacity_usage, dtype=np.float64), (n_skus,))
+        self.warm_start = warm_start and highspy is not None
+        self.solves = 0
+        self.skipped = 0
+        self._highs = None
+        self._last_key = None
+        self._last_plan = None
+
+        start = time.perf_counter()
+        self._A_eq, self._A_ub = self._assemble()
+        self.build_s = time.perf_counter() - start
+
+    @property
+    def n_vars(self):
+        return len(VARIABLES) * int(np.prod(self.shape))
+
+    def _assemble(self):
+        K, S, T = self.shape
+        N = K * S * T
+        k, s, t = (axis.ravel() for axis in np.indices(self.shape))
+        cell = np.arange(N)  # (k, s, t) flattened, also the balance row
+        produce, procure, inventory, unmet = (i * N for i in range(len(VARIABLES)))
+
+        # Inventory balance: -I[t] + I[t-1] + arrivals[t] + unmet[t] = demand[t] (- I0 when t == 0)
+        rows, cols, vals = [cell, cell], [inventory + cell, unmet + cell], [-np.ones(N), np.ones(N)]
+        carry = t > 0
+        rows.append(cell[carry]); cols.append(inventory + cell[carry] - 1); vals.append(np.ones(carry.sum()))
+        for block, lead in ((produce, self.production_lead), (procure, self.procurement_lead)):
+            arrives = t + lead[k] < T
+            rows.append(cell[arrives] + lead[k][arrives])
+            cols.append(block + cell[arrives])
+            vals.append(np.ones(arrives.sum()))
+        A_eq = sparse.csr_matrix(
+            (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(N, len(VARIABLES) * N)
+        )
+
+        # Production capacity per (site, period), then storage capacity per (site, period)
+        site_period = s * T + t
+        A_ub = sparse.csr_matrix(
+            (
+                np.concatenate([self.capacity_usage[k], np.ones(N)]),
+                (np.concatenate([site_period, S * T + site_period]), np.concatenate([produce + cell, inventory + cell])),
+            ),
+            shape=(2 * S * T, len(VARIABLES) * N),
+        )
+        return A_eq, A_ub
+
+    def solve(self, demand, initial_inventory, production_cost, procurement_cost, holding_cost=0.0,
+              shortage_cost=1000.0, production_capacity=np.inf, storage_capacity=np.inf):
+        """Costs broadcast to (sku, site, period), initial_inventory to (sku, site),
+        capacities to (site, period)."""
+        K, S, T = self.shape
+        demand = np.broadcast_to(np.asarray(demand, dtype=np.float64), self.shape)
+        initial_inventory = np.broadcast_to(np.asarray(initial_inventory, dtype=np.float64), (K, S))
+        costs = [np.broadcast_to(np.asarray(c, dtype=np.float64), self.shape)
+                 for c in (production_cost, procurement_cost, holding_cost, shortage_cost)]
+        capacities = [np.broadcast_to(np.asarray(c, dtype=np.float64), (S, T)) for c in (production_capacity, storage_capacity)]
+
+        key = hashlib.sha1(b"".join(np.ascontiguousarray(a).tobytes()
+                                    for a in [demand, initial_inventory, *costs, *capacities])).digest()
+        if key == self._last_key:
+            self.skipped += 1
+            return self._last_plan
+
+        c = np.concatenate([cost.ravel() for cost in costs])
+        b_eq = demand.copy()
+        b_eq[:, :, 0] -= initial_inventory
+        b_ub = np.minimum(np.concatenate([cap.ravel() for cap in capacities]), INF)
+
+        start = time.perf_counter()
+        if self.warm_start:
+            success, status, objective, x, warm = self._solve_highs(c, b_eq.ravel(), b_ub)
+        else:
+            from scipy.optimize import linprog  # ~0.5 s to import, and only needed without highspy
+
+            result = linprog(c, A_ub=self._A_ub, b_ub=b_ub, A_eq=self._A_eq, b_eq=b_eq.ravel(),
+                             bounds=(0, None), method="highs")
+            success, status, objective, x, warm = result.success, result.message, result.fun, result.x, False
+        runtime = time.perf_counter() - start
+
+        values = None
+        if success:
+            N = K * S * T
+            values = {name: x[i * N:(i + 1) * N].reshape(self.shape) for i, name in enumerate(VARIABLES)}
+        self.solves += 1
+        self._last_key = key
+        self._last_plan = ProductionPlan(success, status, objective if success else float("nan"), values, runtime, warm)
+        return self._last_plan
+
+    def _solve_highs(self, c, b_eq, b_ub):
+        n_eq, n_ub = len(b_eq), len(b_ub)
+        row_lower = np.concatenate([b_eq, np.full(n_ub, -highspy.kHighsInf)])
+        row_upper = np.concatenate([b_eq, b_ub])
+
+        warm = self._highs is not None
+        if not warm:
+            A = sparse.vstack([self._A_eq, self._A_ub]).tocsc()
+            lp = highspy.HighsLp()
+            lp.num_col_, lp.num_row_ = A.shape[1], A.shape[0]
+            lp.col_cost_ = c
+            lp.col_lower_ = np.zeros(A.shape[1])
+            lp.col_upper_ = np.full(A.shape[1], highspy.kHighsInf)
+            lp.row_lower_, lp.row_upper_ = row_lower, row_upper
+            lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+            lp.a_matrix_.start_ = A.indptr
+            lp.a_matrix_.index_ = A.indices
+            lp.a_matrix_.value_ = A.data
+            self._highs = highspy.Highs()
+            self._highs.setOptionValue("output_flag", False)
+            self._highs.passModel(lp)
+        else:
+            # Same structure: swap costs and bounds, HiGHS restarts from the previous basis
+            self._highs.changeColsCost(len(c), np.arange(len(c), dtype=np.int32), c)
+            rows = n_eq + n_ub
+            self._highs.changeRowsBounds(rows, np.arange(rows, dtype=np.int32), row_lower, row_upper)
+
+        self._highs.run()
+        status = self._highs.getModelStatus()
+        success = status == highspy.HighsModelStatus.kOptimal
+        x = np.asarray(self._highs.getSolution().col_value)
+        return success, self._highs.modelStatusToString(status), self._highs.getInfo().objective_function_value, x, warm
@@ -1,39 +1,9 @@
-import os
+import time
 import streamlit as st
-from dotenv import load_dotenv
-from azure.ai.inference import ChatCompletionsClient
-from azure.ai.inference.models import SystemMessage, UserMessage
-from azure.core.credentials import AzureKeyCredential
-
-# --- Load GitHub Token ---
-load_dotenv()
-token = os.getenv("GITHUB_TOKEN")
-
-# --- Setup DeepSeek AI Client ---
-endpoint = "https://models.github.ai/inference"
-model = "deepseek/DeepSeek-V3-0324"
-
-client = ChatCompletionsClient(
-    endpoint=endpoint,
-    credential=AzureKeyCredential(token),
-)
-
-# --- DeepSeek ask function ---
-def ask_deepseek(prompt: str) -> str:
-    try:
-        response = client.complete(
-            messages=[
-                SystemMessage("You are a professional resume reviewer and builder AI."),
-                UserMessage(prompt),
-            ],
-            temperature=0.7,
-            top_p=0.9,
-            max_tokens=1024,
-            model=model,
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Error: {e}"
+from chat_memory import ConversationMemory
+import resume_core
+import semantic_cache
+from resume_core import ask_deepseek, ask_deepseek_stream
 
 # --- Streamlit App Starts ---
 st.set_page_config(page_title="🧠 Smart Resume Checker & Builder", layout="wide")
@@ -41,6 +11,40 @@ st.set_page_config(page_title="🧠 Smart Resume Checker & Builder", layout="wid
 st.title("📝 AI-Powered Resume Checker & Builder")
 st.write("Upload, Review, Improve, and Download your Resume securely with AI Agents! 🚀")
 
+stream_responses = st.sidebar.checkbox("Stream Responses", value=True)
+
+# --- Render a reply, streaming tokens when enabled; returns the full text ---
+# A failed call sets status["error"]; the text shown then ends with the error message
+def show_reply(prompt: str, prompt_type: str, as_text: bool = False, status: dict = None) -> str:
+    if stream_responses:
+        return st.write_stream(ask_deepseek_stream(prompt, prompt_type, status)).strip()
+    reply = ask_deepseek(prompt, prompt_type, status)
+    if as_text:
+        st.text(reply)
+    else:
+        st.write(reply)
+    return reply
+
+# --- Section-by-section review: unchanged sections reuse their earlier findings ---
+if "section_store" not in st.session_state:
+    st.session_state.section_store = resume_core.SectionStore()
+
+def show_section_review(task: str, resume_text: str, as_text: bool = False) -> str:
+    store = st.session_state.section_store
+    sections = resume_core.split_sections(resume_text)
+    slots = [st.empty() for _ in sections]
+    results = [None] * len(sections)
+    reused = 0
+    for index, result, from_store in resume_core.review_sections(sections, task, ask_deepseek, store):
+        results[index] = result
+        reused += from_store
+        if as_text:
+            slots[index].text(result)
+        else:
+            slots[index].markdown(f"### {sections[index].label}\n{result}")
+    st.caption(f"♻️ {reused} of {len(sections)} sections unchanged since the last review; {len(sections) - reused} sent to the AI")
+    return resume_core.merge_sections(task, sections, results)
+
 # --- Upload Section ---
 st.header("📤 Upload Your Resume (TXT format)")
 
@@ -62,44 +66,44 @@ if "uploaded_resume" in st.session_state:
 
     col1, col2, col3 = st.columns(3)
 
+    # Long or structured resumes are improved per section; short unstructured text streams in one prompt
+    use_sections = (
+        resume_core.is_long(st.session_state['uploaded_resume'])
+        or len(resume_core.split_sections(st.session_state['uploaded_resume'])) > 1
+    )
+    # The fraud check compares claims across sections, so it is split only when the resume exceeds one prompt
+    fraud_sections = resume_core.is_long(st.session_state['uploaded_resume'])
+
     # --- Fraud Detection ---
     with col1:
         if st.button("🚨 Check for Fraud / Fake Claims"):
             with st.spinner("Analyzing for potential fraud..."):
-                fraud_prompt = f"""
-                Carefully review the following resume for any fraudulent claims, inconsistencies, unrealistic achievements, or exaggerations. 
-                Mark them clearly and suggest corrections. Resume:\n\n{st.session_state['uploaded_resume']}
-                """
-                fraud_report = ask_deepseek(fraud_prompt)
                 st.subheader("🚨 Fraud Detection Report:")
-                st.write(fraud_report)
+                if fraud_sections:
+                    # Analyse changed sections in parallel and merge with the cached findings
+                    fraud_report = show_section_review("fraud", st.session_state['uploaded_resume'])
+                else:
+                    fraud_report = show_reply(resume_core.FRAUD_PROMPT.format(resume=st.session_state['uploaded_resume']), "fraud")
                 st.session_state["fraud_report"] = fraud_report
 
     # --- Resume Improvement ---
     with col2:
         if st.button("✨ Improve My Resume"):
             with st.spinner("Polishing and optimizing your resume..."):
-                improve_prompt = f"""
-                Rewrite and professionally improve this resume.
-                Focus on clarity, impact, formatting, and keywords (ATS friendly).
-                Make it truthful, concise, and appealing for recruiters.\n\nResume:\n\n{st.session_state['uploaded_resume']}
-                """
-                improved_resume = ask_deepseek(improve_prompt)
                 st.subheader("✨ Improved Resume:")
-                st.text(improved_resume)
+                if use_sections:
+                    # Rewrite changed sections in parallel and stitch them back in order
+                    improved_resume = show_section_review("improve", st.session_state['uploaded_resume'], as_text=True)
+                else:
+                    improved_resume = show_reply(resume_core.IMPROVE_PROMPT.format(resume=st.session_state['uploaded_resume']), "improve", as_text=True)
                 st.session_state["improved_resume"] = improved_resume
 
     # --- Create New Resume from Scratch ---
     with col3:
         if st.button("🛠️ Create New Resume (AI)"):
             with st.spinner("Building a fresh professional resume..."):
-                create_prompt = """
-                Create a modern, professional resume template suitable for data science, tech, or business roles.
-                Leave placeholders for name, experience, education, and skills.
-                """
-                new_resume = ask_deepseek(create_prompt)
                 st.subheader("🛠️ New AI-Generated Resume Template:")
-                st.text(new_resume)
+                new_resume = show_reply(resume_core.CREATE_PROMPT, "create", as_text=True)
                 st.session_state["new_resume"] = new_resume
 
 # --- Download Section ---
@@ -130,13 +134,35 @@ st.write("Ask anything about resumes, job applications, or interviews!")
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 
+# Recent turns verbatim plus a rolling summary, so follow-up questions keep their context
+if "chat_memory" not in st.session_state:
+    st.session_state.chat_memory = ConversationMemory(token_budget=1200)
+
 user_query = st.text_input("Your question about resumes or job hunting...")
 
 if st.button("Ask Advisor"):
     if user_query:
         with st.spinner("Thinking..."):
-            chat_prompt = f"You are a career and resume advisor AI. User asks: {user_query}"
-            bot_reply = ask_deepseek(chat_prompt)
+            # A paraphrase of an earlier question is answered without a model call,
+            # unless earlier turns give this one a context the cached answer didn't have
+            cacheable = not st.session_state.chat_memory.has_context()
+            hit = resume_core.chat_lookup(user_query) if cacheable else None
+            status = {}
+            if hit is not None:
+                bot_reply = hit.reply
+                st.caption(f"⚡ Answered from the semantic cache (similarity {hit.similarity:.2f})")
+            else:
+                start = time.perf_counter()
+                chat_prompt = st.session_state.chat_memory.build_prompt(user_query, resume_core.CHAT_SYSTEM_PROMPT)
+                # Stream into a temporary slot; the history loop below renders the final reply
+                reply_slot = st.empty()
+                with reply_slot.container():
+                    bot_reply = show_reply(chat_prompt, "chat", status=status)
+                reply_slot.empty()
+                if cacheable and "error" not in status:
+                    resume_core.chat_store(user_query, bot_reply, time.perf_counter() - start)
+            if "error" not in status:
+                st.session_state.chat_memory.add_turn(user_query, bot_reply)
             st.session_state.chat_history.append(("You", user_query))
             st.session_state.chat_history.append(("AI", bot_reply))
 
@@ -145,4 +171,16 @@ for sender, message in st.session_state.chat_history:
     if sender == "You":
         st.markdown(f"**🧑 You:** {message}")
     else:
-        st.markdown(f"**🤖 AI:** {message}")
\ No newline at end of file
+        st.markdown(f"**🤖 AI:** {message}")
+
+if st.session_state.chat_history:
+    memory_stats = st.session_state.chat_memory.stats()
+    st.caption(
+        f"🧠 Prompt tokens this turn: {memory_stats['last_prompt_tokens']} "
+        f"(avg {memory_stats['avg_prompt_tokens']}, max {memory_stats['max_prompt_tokens']}, "
+        f"summary {memory_stats['summary_tokens']})"
+    )
+    if semantic_cache.shared() is not None:
+        cache_stats = semantic_cache.shared().stats()
+        st.caption(f"⚡ Semantic cache: {cache_stats['hits']} hits ({cache_stats['hit_rate']:.0%}), "
+                   f"{cache_stats['saved_s']:.1f} s of model time saved")
@@ -0,0 +1,119 @@
+"""Headless batch screening of TXT resumes.
+
+    python resume_batch.py resumes/ --output results.jsonl --workers 8
+    python resume_batch.py resumes.jsonl --tasks fraud
+
+INPUT is a directory (every *.txt below it) or a JSONL file with one
+{"id": ..., "text": ...} object per line. Results are appended to the output
+JSONL as they finish; it doubles as the checkpoint, so a re-run only runs the
+requested tasks that have no result yet for a resume's content hash.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import batch_runner
+import resume_core
+
+TASKS = {
+    "fraud": ("fraud_report", resume_core.check_fraud),
+    "improve": ("improved_resume", resume_core.improve_resume),
+}
+
+
+def content_hash(text):
+    normalized = text.replace("\r\n", "\n").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# --- Input: stream resumes lazily so huge directories never sit in memory ---
+def iter_resumes(source):
+    path = Path(source)
+    if path.is_dir():
+        for file in sorted(path.rglob("*.txt")):
+            yield str(file.relative_to(path)), file.read_text(encoding="utf-8", errors="replace")
+    else:
+        with open(path, encoding="utf-8") as lines:
+            for number, line in enumerate(lines, 1):
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.get("id", number)), record.get("text") or record.get("resume") or ""
+
+
+# --- Checkpoint: result fields already in the output, per content hash ---
+def load_done(output):
+    done = {}
+    if os.path.exists(output):
+        with open(output, encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line torn by an interrupted write
+                # A failed record still carries the fields of the tasks that finished before the error
+                done.setdefault(record["sha256"], set()).update(field for field, _ in TASKS.values() if field in record)
+    return done
+
+
+def screen(resume_id, text, digest, tasks):
+    start = time.time()
+    record = {"id": resume_id, "sha256": digest}
+    try:
+        for task in tasks:
+            field, run = TASKS[task]
+            # ask_model raises, so failures are recorded and retried on the next run
+            record[field] = run(text, ask=resume_core.ask_model)
+    except Exception as e:
+        record["error"] = str(e)
+    record["elapsed_s"] = round(time.time() - start, 2)
+    return record
+
+
+def run_batch(source, output, tasks, workers, report_every=25):
+    done = load_done(output)
+    progress = batch_runner.Progress("resumes", report_every)
+
+    def jobs():
+        seen = set()
+        for resume_id, text in iter_resumes(source):
+            digest = content_hash(text)
+            todo = [task for task in tasks if TASKS[task][0] not in done.get(digest, ())]
+            if not text.strip() or not todo or digest in seen:
+                progress.skipped += 1
+                continue
+            seen.add(digest)
+            yield resume_id, text, digest, todo
+
+    with open(output, "a", encoding="utf-8") as out:
+        def write(job, record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            return "error" in record
+
+        return batch_runner.run_bounded(jobs(), screen, write, workers, progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the resume fraud check and improvement prompts over many resumes.")
+    parser.add_argument("source", help="directory of .txt resumes or a JSONL file of {id, text} records")
+    parser.add_argument("--output", default="resume_results.jsonl", help="results JSONL, also used as the checkpoint")
+    parser.add_argument("--tasks", default="fraud,improve", help="comma-separated subset of: " + ", ".join(TASKS))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--report-every", type=int, default=25, help="print throughput after this many resumes")
+    args = parser.parse_args(argv)
+
+    tasks = [task.strip() for task in args.tasks.split(",") if task.strip()]
+    unknown = [task for task in tasks if task not in TASKS]
+    if unknown:
+        parser.error(f"unknown task(s): {', '.join(unknown)}")
+
+    _, _, failed = run_batch(args.source, args.output, tasks, args.workers, args.report_every)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+import llm_gateway
+
+# --- DeepSeek settings for the resume agent (client and cache live in llm_gateway) ---
+SYSTEM_PROMPT = "You are a professional resume reviewer and builder AI."
+GENERATION = dict(system=SYSTEM_PROMPT, temperature=0.7, top_p=0.9, max_tokens=1024, agent="resume")
+CHAT_SYSTEM_PROMPT = "You are a career and resume advisor AI."
+
+# Resumes longer than this are analysed section by section instead of in one prompt
+CHUNK_THRESHOLD = 6000  # characters
+SECTION_MAX_CHARS = 4000
+MAX_PARALLEL_SECTIONS = 6
+
+# Heading vocabulary; qualifiers are ignored so "Professional Experience" matches "experience"
+SECTION_NAMES = {
+    "summary", "profile", "objective", "about", "contact", "experience", "experiences", "employment",
+    "employment history", "history", "education", "skills", "skill", "projects", "project", "publications",
+    "certifications", "certificates", "licenses", "awards", "honors", "honours", "achievements", "languages",
+    "volunteering", "volunteer", "research", "teaching", "interests", "references", "activities", "training",
+    "presentations", "talks", "conferences", "grants", "patents", "memberships", "affiliations", "courses",
+    "coursework", "leadership",
+}
+QUALIFIERS = {
+    "professional", "work", "relevant", "technical", "academic", "selected", "key", "core", "career",
+    "other", "additional", "recent", "personal", "of", "the", "my",
+}
+
+FRAUD_PROMPT = """
+                Carefully review the following resume for any fraudulent claims, inconsistencies, unrealistic achievements, or exaggerations. 
+                Mark them clearly and suggest corrections. Resume:\n\n{resume}
+                """
+
+IMPROVE_PROMPT = """
+                Rewrite and professionally improve this resume.
+                Focus on clarity, impact, formatting, and keywords (ATS friendly).
+                Make it truthful, concise, and appealing for recruiters.\n\nResume:\n\n{resume}
+                """
+
+CREATE_PROMPT = """
+                Create a modern, professional resume template suitable for data science, tech, or business roles.
+                Leave placeholders for name, experience, education, and skills.
+                """
+
+FRAUD_SECTION_PROMPT = """
+Carefully review the "{title}" section of a resume for any fraudulent claims, inconsistencies, unrealistic achievements, or exaggerations.
+Mark them clearly and suggest corrections. If the section looks credible, say so in one line.
+Other sections of this resume: {outline}.
+
+Section:
+
+{body}
+"""
+
+IMPROVE_SECTION_PROMPT = """
+Rewrite and professionally improve the "{title}" section of a resume.
+Focus on clarity, impact, formatting, and keywords (ATS friendly).
+Make it truthful, concise, and appealing for recruiters.
+Return only the rewritten section, starting with its heading.
+
+Section:
+
+{body}
+"""
+
+IMPROVE_CONTINUATION_PROMPT = """
+Rewrite and professionally improve the following part of the "{title}" section of a resume.
+It continues directly from the previous part of that section.
+Focus on clarity, impact, formatting, and keywords (ATS friendly).
+Make it truthful, concise, and appealing for recruiters.
+Return only the rewritten text, with no heading and no introduction.
+
+Text:
+
+{body}
+"""
+
+
+# --- DeepSeek calls: ask_model raises, the other two return the error text (see llm_gateway.ask*) ---
+ask_model = functools.partial(llm_gateway.ask, GENERATION)
+ask_deepseek = functools.partial(llm_gateway.ask_or_error, GENERATION)
+ask_deepseek_stream = functools.partial(llm_gateway.ask_stream, GENERATION)
+
+
+# --- Section-aware chunking ---
+def _heading_title(line):
+    stripped = line.strip().strip("#*=_-| ").rstrip(":").strip()
+    if not stripped or len(stripped) > 50:
+        return None
+    for part in re.split(r"\s*(?:&|/|,|\band\b)\s*", stripped.lower()):
+        words = [word for word in part.split() if word not in QUALIFIERS]
+        if " ".join(words) not in SECTION_NAMES:
+            return None
+    return stripped
+
+
+class Section(NamedTuple):
+    title: str  # the heading as written in the resume
+    body: str
+    part: int = 0  # 1, 2, ... when an oversized section was split; only part 1 starts with the heading
+
+    @property
+    def label(self):
+        return f"{self.title} (continued)" if self.part > 1 else self.title
+
+
+def _pack(title, body, max_chars):
+    """Split an oversized section on paragraph, then line, boundaries."""
+    if len(body) <= max_chars:
+        return [Section(title, body)]
+
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", body):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(paragraph.splitlines())
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if len(piece) > max_chars and current:
+            # Flush what came before a single enormous line so the order is kept
+            chunks.append(current)
+            current = ""
+        while len(piece) > max_chars:
+            chunks.append(piece[:max_chars])
+            piece = piece[max_chars:]
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return [Section(title, chunk, i) for i, chunk in enumerate(chunks, 1)]
+
+
+def split_sections(text, max_chars=SECTION_MAX_CHARS):
+    """Split resume text into Sections on headings such as Experience or Skills.
+
+    Text before the first heading becomes "Header"; each body keeps its heading line.
+    """
+    sections, title, lines = [], "Header", []
+    for line in text.splitlines():
+        heading = _heading_title(line)
+        if heading:
+            if "\n".join(lines).strip():
+                sections.append((title, "\n".join(lines).strip()))
+            title, lines = heading, [line]
+        else:
+            lines.append(line)
+    if "\n".join(lines).strip():
+        sections.append((title, "\n".join(lines).strip()))
+
+    chunks = []
+    for title, body in sections:
+        chunks.extend(_pack(title, body, max_chars))
+    return chunks
+
+
+# --- Per-section results keyed by content hash, for incremental re-review ---
+def section_hash(body, context=""):
+    """`context` is whatever else the section's prompt carries, e.g. its title and the resume outline."""
+    # Whitespace-only edits should not invalidate a section's findings
+    normalized = "\n".join(" ".join(line.split()) for line in body.strip().splitlines())
+    return hashlib.sha256(f"{context}\n\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class SectionStore:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.reused = 0
+        self.sent = 0
+        self._results = OrderedDict()  # (task, section hash) -> result
+        self._lock = threading.Lock()
+
+    def get(self, task, digest):
+        with self._lock:
+            result = self._results.get((task, digest))
+            if result is not None:
+                self._results.move_to_end((task, digest))
+            return result
+
+    def put(self, task, digest, result):
+        with self._lock:
+            self._results[(task, digest)] = result
+            self._results.move_to_end((task, digest))
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+
+def _outline(sections):
+    return ", ".join(dict.fromkeys(section.title for section in sections))
+
+
+def _section_contexts(task, sections):
+    """Per section, the prompt text besides its body; part of the reuse key."""
+    if task == "fraud":
+        outline = _outline(sections)
+        return [f"{section.label}\n{outline}" for section in sections]
+    return [section.label for section in sections]
+
+
+def _section_prompts(task, sections):
+    if task == "fraud":
+        outline = _outline(sections)
+        return [FRAUD_SECTION_PROMPT.format(title=section.label, outline=outline, body=section.body) for section in sections]
+    # Later parts of a split section continue the previous one, so the model must not invent a heading for them
+    return [
+        (IMPROVE_CONTINUATION_PROMPT if section.part > 1 else IMPROVE_SECTION_PROMPT).format(title=section.title, body=section.body)
+        for section in sections
+    ]
+
+
+# --- Map: one model call per changed section, in parallel ---
+def review_sections(sections, task, ask, store=None, max_workers=MAX_PARALLEL_SECTIONS):
+    """Yield (index, result, reused) for every section as soon as its result is known.
+
+    Sections whose content hash is already in `store` are yielded first without
+    calling the model; only changed sections are sent.
+    """
+    prompts = _section_prompts(task, sections)
+    contexts = _section_contexts(task, sections)
+    digests = [section_hash(section.body, context) for section, context in zip(sections, contexts)]
+
+    missing = []
+    for index, digest in enumerate(digests):
+        cached = store.get(task, digest) if store is not None else None
+        if cached is None:
+            missing.append(index)
+        else:
+            if store is not None:
+                store.reused += 1
+            yield index, cached, True
+    if not missing:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+        futures = {pool.submit(ask, prompts[index], f"{task}_section"): index for index in missing}
+        for future in as_completed(futures):
+            index = futures[future]
+            result = future.result()
+            if store is not None:
+                store.sent += 1
+                if not result.startswith("Error:"):
+                    store.put(task, digests[index], result)
+            yield index, result, False
+
+
+# --- Reduce: stitch section results back into one document, in section order ---
+def merge_sections(task, sections, results):
+    if task == "fraud":
+        return "\n\n".join(f"### {section.label}\n{result.strip()}" for section, result in zip(sections, results))
+    return "\n\n".join(result.strip() for result in results)
+
+
+def run_sections(text, task, ask, store=None):
+    sections = split_sections(text)
+    results = [None] * len(sections)
+    for index, result, _ in review_sections(sections, task, ask, store):
+        results[index] = result
+    return merge_sections(task, sections, results)
+
+
+def check_fraud_chunked(text, ask, store=None):
+    return run_sections(text, "fraud", ask, store)
+
+
+def improve_resume_chunked(text, ask, store=None):
+    return run_sections(text, "improve", ask, store)
+
+
+# --- Entry points shared by the Streamlit app and the batch CLI ---
+def is_long(text):
+    return len(text) > CHUNK_THRESHOLD
+
+
+def check_fraud(text, ask=ask_deepseek, store=None):
+    # A resume that fits one prompt is checked whole, so claims can be cross-checked across sections
+    if is_long(text):
+        return check_fraud_chunked(text, ask, store)
+    return ask(FRAUD_PROMPT.format(resume=text), "fraud")
+
+
+def improve_resume(text, ask=ask_deepseek, store=None):
+    if is_long(text) or store is not None:
+        return improve_resume_chunked(text, ask, store)
+    return ask(IMPROVE_PROMPT.format(resume=text), "improve")
+
+
+# --- Advisor chatbot: resume questions don't depend on the uploaded resume, so one scope serves everyone ---
+# Only first questions of a conversation use the cache: a follow-up's answer depends on the earlier turns
+def chat_lookup(question):
+    """Cached reply to a similar earlier question, or None."""
+    import semantic_cache  # imported on first use, so importing this module doesn't load NumPy
+
+    cache = semantic_cache.shared()
+    if cache is None:
+        return None
+    hit = cache.lookup(question, scope="advisor")
+    if hit is not None:
+        llm_gateway.record_hit(GENERATION["agent"], "chat")
+    return hit
+
+
+def chat_store(question, reply, latency_s):
+    """Call only with complete replies; failed or partial ones must never be served again."""
+    import semantic_cache  # imported on first use, so importing this module doesn't load NumPy
+
+    cache = semantic_cache.shared()
+    if cache is not None:
+        cache.store(question, reply, scope="advisor", latency_s=latency_s)
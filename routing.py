@@ -0,0 +1,251 @@
+import math
+import time
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+IMPROVEMENT_EPS = 1e-6  # km; smaller gains are rounding noise
+
+
+# --- Distances ---
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between broadcastable arrays of coordinates in degrees."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_matrix(lat1, lon1, lat2=None, lon2=None):
+    """Pairwise distance matrix in km: rows are the first point set, columns the second."""
+    if lat2 is None:
+        lat2, lon2 = lat1, lon1
+    return haversine(
+        np.asarray(lat1)[:, None], np.asarray(lon1)[:, None],
+        np.asarray(lat2)[None, :], np.asarray(lon2)[None, :],
+    )
+
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere; for these, a larger dot product means a shorter great-circle distance."""
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def dot_to_km(dot):
+    # Great-circle distance from the cosine of the central angle; the chord form stays accurate at short range
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip((1 - dot) / 2, 0.0, 1.0)))
+
+
+def nearest_neighbors(xyz, k, block=1024):
+    """k nearest other points (ids and km) for every unit vector, nearest first, in row blocks."""
+    n = len(xyz)
+    k = min(k, n - 1)
+    ids = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, block):
+        dot = xyz[start:start + block] @ xyz.T
+        rows = np.arange(dot.shape[0])
+        dot[rows, start + rows] = -np.inf
+        nearest = np.argpartition(-dot, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(dot, nearest, axis=1), axis=1)
+        ids[start:start + block] = np.take_along_axis(nearest, order, axis=1)
+    return ids, dot_to_km(np.einsum("ij,ikj->ik", xyz, xyz[ids]))
+
+
+class RoutePlan:
+    def __init__(self, routes, distance_km, construction_km, unassigned, runtime_s):
+        self.routes = routes  # one array of stop indices per truck, depot excluded
+        self.distance_km = distance_km
+        self.construction_km = construction_km  # before 2-opt / Or-opt
+        self.unassigned = unassigned  # stops no truck could serve within capacity / time windows
+        self.runtime_s = runtime_s
+
+    def __repr__(self):
+        return (f"RoutePlan(trucks={len(self.routes)}, distance_km={self.distance_km:.1f}, "
+                f"unassigned={len(self.unassigned)}, runtime_s={self.runtime_s:.2f})")
+
+
+# --- Construction: nearest feasible neighbour, one truck at a time ---
+def _construct(depot, xyz, demand, capacity, n_trucks, ready, due, service, speed_kmh):
+    unvisited = np.ones(len(xyz), dtype=bool)
+    depot_xyz = unit_vectors([depot[0]], [depot[1]])[0]
+    routes = []
+    while unvisited.any() and (n_trucks is None or len(routes) < n_trucks):
+        route, load, clock = [], 0.0, 0.0
+        here = depot_xyz
+        while True:
+            arrival = clock + dot_to_km(xyz @ here) / speed_kmh
+            feasible = unvisited & (load + demand <= capacity) & (arrival <= due)
+            if not feasible.any():
+                break
+            # Nearest by service start time, so waiting for a window counts as distance
+            start = np.maximum(arrival, ready)
+            stop = int(np.argmin(np.where(feasible, start, np.inf)))
+            route.append(stop)
+            unvisited[stop] = False
+            load += demand[stop]
+            clock = start[stop] + service[stop]
+            here = xyz[stop]
+        if not route:
+            break  # nothing left is reachable from the depot
+        routes.append(np.array(route, dtype=np.int64))
+    return routes, np.flatnonzero(unvisited)
+
+
+# --- Improvement: 2-opt and Or-opt on one route, driven by k-nearest candidate lists ---
+class _RouteImprover:
+    def __init__(self, stops, depot, lat, lon, ready, due, service, speed_kmh, timed, k):
+        m = len(stops)
+        self.m = m
+        # Local ids: 0..m-1 are the stops in construction order, m is the depot
+        self.xyz = unit_vectors(np.append(lat[stops], depot[0]), np.append(lon[stops], depot[1]))
+        self.points = self.xyz.tolist()
+        self.ready = ready[stops].tolist()
+        self.due = due[stops].tolist()
+        self.service = service[stops].tolist()
+        self.speed_kmh = speed_kmh
+        self.timed = timed
+        self.stops = stops
+        self.tour = np.concatenate([[m], np.arange(m), [m]])
+        self.knn, self.knn_km = nearest_neighbors(self.xyz[:m], k) if m >= 4 else (None, None)
+
+    def _dist(self, a, b):
+        # Vectorised over arrays of local ids
+        return dot_to_km(np.einsum("...j,...j->...", self.xyz[a], self.xyz[b]))
+
+    def _leg(self, a, b):
+        p, q = self.points[a], self.points[b]
+        dot = p[0] * q[0] + p[1] * q[1] + p[2] * q[2]
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max((1 - dot) / 2, 0.0), 1.0)))
+
+    def _feasible(self, tour):
+        if not self.timed:
+            return True
+        clock = 0.0
+        for prev, node in zip(tour[:-2], tour[1:-1]):
+            clock += self._leg(prev, node) / self.speed_kmh
+            if clock > self.due[node]:
+                return False
+            clock = max(clock, self.ready[node]) + self.service[node]
+        return True
+
+    def _positions(self):
+        pos = np.empty(self.m + 1, dtype=np.int64)
+        pos[self.tour[1:-1]] = np.arange(1, self.m + 1)
+        return pos
+
+    def two_opt(self, deadline):
+        tour, improved = self.tour, False
+        pos = self._positions()
+        for i in range(1, self.m + 1):
+            if time.monotonic() > deadline:
+                break
+            a, b = tour[i], tour[i + 1]
+            cands = self.knn[a]
+            j = pos[cands]
+            keep = np.abs(j - i) >= 2
+            if not keep.any():
+                continue
+            c, j = cands[keep], j[keep]
+            d = tour[j + 1]
+            gain = self._leg(a, b) + self._dist(c, d) - self.knn_km[a][keep] - self._dist(b, d)
+            for best in np.argsort(-gain)[:3]:
+                if gain[best] <= IMPROVEMENT_EPS:
+                    break
+                lo, hi = sorted((i, int(j[best])))
+                candidate = tour.copy()
+                candidate[lo + 1:hi + 1] = candidate[lo + 1:hi + 1][::-1]
+                if self._feasible(candidate):
+                    tour[:] = candidate
+                    pos[tour[lo + 1:hi + 1]] = np.arange(lo + 1, hi + 1)
+                    improved = True
+                    break
+        return improved
+
+    def or_opt(self, deadline):
+        improved = False
+        pos = self._positions()
+        for length in (1, 2, 3):
+            i = 1
+            while i + length - 1 <= self.m:
+                if time.monotonic() > deadline:
+                    return improved
+                tour = self.tour
+                s, e = tour[i], tour[i + length - 1]
+                p, n = tour[i - 1], tour[i + length]
+                removal = self._leg(p, s) + self._leg(e, n) - self._leg(p, n)
+
+                # Re-insert the segment after one of s's nearest neighbours u (u -> segment -> v)
+                u = self.knn[s]
+                j = pos[u]
+                keep = (j < i - 1) | (j >= i + length)
+                if keep.any():
+                    u, j = u[keep], j[keep]
+                    v = tour[j + 1]
+                    base = self._dist(u, v)
+                    forward = self.knn_km[s][keep] + self._dist(e, v) - base
+                    backward = self._dist(u, e) + self._dist(s, v) - base
+                    gain = removal - np.minimum(forward, backward)
+                    best = int(np.argmax(gain))
+                    if gain[best] > IMPROVEMENT_EPS:
+                        segment = tour[i:i + length]
+                        if backward[best] < forward[best]:
+                            segment = segment[::-1]
+                        rest = np.delete(tour, np.arange(i, i + length))
+                        after = j[best] if j[best] < i else j[best] - length
+                        candidate = np.insert(rest, after + 1, segment)
+                        if self._feasible(candidate):
+                            self.tour = candidate
+                            pos = self._positions()
+                            improved = True
+                i += 1
+        return improved
+
+    def improve(self, deadline):
+        if self.m < 4:
+            return
+        while time.monotonic() < deadline:
+            if not (self.two_opt(deadline) | self.or_opt(deadline)):
+                break
+
+    def route(self):
+        return self.stops[self.tour[1:-1]]
+
+
+def route_length(depot, lat, lon, route):
+    path_lat = np.concatenate([[depot[0]], lat[route], [depot[0]]])
+    path_lon = np.concatenate([[depot[1]], lon[route], [depot[1]]])
+    return float(haversine(path_lat[:-1], path_lon[:-1], path_lat[1:], path_lon[1:]).sum())
+
+
+# --- Capacitated VRP with time windows ---
+def solve_cvrp(depot, lat, lon, demand=None, capacity=np.inf, n_trucks=None, ready=None, due=None,
+               service=0.0, speed_kmh=60.0, time_limit=3.0, neighbors=10):
+    """Multi-truck routes from `depot` through every stop (lat/lon in degrees).
+
+    demand, ready, due (hours from departure) and service (hours) are per stop;
+    capacity applies to every truck and n_trucks=None means as many as needed.
+    Routes are built nearest-neighbour first, then improved with 2-opt and
+    Or-opt until `time_limit` seconds have passed or no move helps.
+    """
+    started = time.monotonic()
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    n = len(lat)
+    timed = ready is not None or due is not None
+    demand = np.ones(n) if demand is None else np.asarray(demand, dtype=np.float64)
+    ready = np.zeros(n) if ready is None else np.asarray(ready, dtype=np.float64)
+    due = np.full(n, np.inf) if due is None else np.asarray(due, dtype=np.float64)
+    service = np.broadcast_to(np.asarray(service, dtype=np.float64), (n,))
+
+    routes, unassigned = _construct(depot, unit_vectors(lat, lon), demand, capacity, n_trucks, ready, due, service, speed_kmh)
+    construction_km = sum(route_length(depot, lat, lon, route) for route in routes)
+
+    deadline = started + time_limit
+    improved = []
+    for route in routes:
+        improver = _RouteImprover(route, depot, lat, lon, ready, due, service, speed_kmh, timed, neighbors)
+        improver.improve(deadline)
+        improved.append(improver.route())
+
+    distance_km = sum(route_length(depot, lat, lon, route) for route in improved)
+    return RoutePlan(improved, distance_km, construction_km, unassigned, time.monotonic() - started)
@@ -0,0 +1,290 @@
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+# --- Local embeddings: signed feature hashing, no model and no network ---
+DIM = 1024
+
+# Words that carry no meaning for matching questions
+STOPWORDS = {
+    "a", "an", "the", "to", "of", "in", "on", "for", "at", "by", "with", "and", "or", "is", "are", "was", "be",
+    "i", "me", "my", "we", "our", "you", "your", "it", "its", "this", "that", "there", "do", "does", "did",
+    "can", "could", "should", "would", "will", "shall", "may", "might", "must", "please", "tell", "about",
+    "any", "some", "what", "which", "how", "much", "many", "really", "good", "get", "have", "has", "know",
+}
+
+# Hashed features have no notion of meaning, so common paraphrases in the
+# trip and resume chats are mapped onto one token before hashing
+SYNONYMS = {
+    "when": "time", "period": "time", "season": "time", "month": "time",
+    "go": "visit", "going": "visit", "travel": "visit", "trip": "visit", "visiting": "visit", "head": "visit",
+    "best": "ideal", "recommended": "ideal", "top": "ideal", "greatest": "ideal",
+    "cheap": "budget", "affordable": "budget", "inexpensive": "budget",
+    "hotel": "stay", "hotels": "stay", "accommodation": "stay", "lodging": "stay", "hostel": "stay",
+    "eat": "food", "restaurant": "food", "restaurants": "food", "dishes": "food", "cuisine": "food",
+    "safe": "safety", "dangerous": "safety", "scams": "safety", "scam": "safety",
+    "cv": "resume", "résumé": "resume",
+    "long": "length", "lengthy": "length", "pages": "length", "page": "length",
+    "job": "role", "position": "role", "jobs": "role",
+}
+
+WORD = re.compile(r"[^\W_]+")
+NEGATION = re.compile(r"\b(?:not|no|never|without|cannot|nor)\b|n['’]t\b")
+DIRECTION = {"to", "into", "towards", "toward"}  # "A to B" is a different question from "B to A"
+
+# A question that talks about the asker is answered for them alone and is never shared
+PERSONAL = re.compile(
+    r"\b(?:my|mine|myself|our|ours|ourselves|i['’]?m|i am|i['’]?ve|i have|i was|i had|we['’]?re|we are|we have)\b"
+    r"|\d|@",
+    re.IGNORECASE,
+)
+
+
+def _stem(word):
+    # Crude suffix stripping so "walking", "walks" and "walk" share a token
+    for suffix in ("ing", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            return word[:-len(suffix)]
+    return word
+
+
+def _tokens(text):
+    words = [_stem(SYNONYMS.get(word, word)) for word in WORD.findall(text.lower())]
+    return [word for word in words if word not in STOPWORDS] or words
+
+
+def personal(text):
+    """True when the question carries details about the asker (first-person statements, numbers, addresses)."""
+    return bool(PERSONAL.search(text))
+
+
+class Signature(NamedTuple):
+    terms: frozenset  # content words after synonyms and stemming
+    negated: bool
+    directions: frozenset  # (from, to) pairs around "to"/"into"
+
+
+def signature(text):
+    lowered = text.lower()
+    words = [_stem(SYNONYMS.get(word, word)) for word in WORD.findall(lowered)]
+    content = [(i, word) for i, word in enumerate(words) if word not in STOPWORDS and word not in DIRECTION]
+    directions = set()
+    for i, word in enumerate(words):
+        if word in DIRECTION:
+            before = [w for j, w in content if j < i]
+            after = [w for j, w in content if j > i]
+            if before and after:
+                directions.add((before[-1], after[0]))
+    negated = len(NEGATION.findall(lowered)) % 2 == 1
+    return Signature(frozenset(word for _, word in content), negated, frozenset(directions))
+
+
+def compatible(a, b):
+    """Whether two questions close in embedding space can share an answer.
+
+    The embedding is a bag of features, blind to word order, negation and a
+    single swapped topic word ("education" vs "experience" section, "Rome" vs
+    "Nice"). So the negation must agree, no "A to B" may be reversed, and one
+    question's content words must all appear in the other's: a paraphrase adds
+    or drops filler, it doesn't replace the subject.
+    """
+    if a.negated != b.negated:
+        return False
+    if any((to, frm) in b.directions for frm, to in a.directions):
+        return False
+    return a.terms <= b.terms or b.terms <= a.terms
+
+
+def _features(tokens):
+    """(feature, weight): words, adjacent word pairs and character trigrams, which catch plurals and typos."""
+    for token in tokens:
+        yield token, 1.0
+        padded = f"<{token}>"
+        grams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for gram in grams:
+            yield "#" + gram, 0.5 / len(grams) ** 0.5
+    for pair in zip(tokens, tokens[1:]):
+        yield " ".join(pair), 0.5
+
+
+def embed(text, dim=DIM):
+    """Unit-length float32 vector; texts sharing words and word fragments have high cosine similarity."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in _features(_tokens(text)):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += weight if h & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# --- One vector index per scope: a dense matrix searched with a single matrix-vector product ---
+class _Index:
+    def __init__(self, dim):
+        self.vectors = np.empty((16, dim), dtype=np.float32)
+        self.keys = []
+
+    def add(self, key, vector):
+        if len(self.keys) == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.empty_like(self.vectors)])
+        self.vectors[len(self.keys)] = vector
+        self.keys.append(key)
+
+    def remove(self, key):
+        # Move the last row into the freed slot so the live rows stay contiguous
+        row = self.keys.index(key)
+        last = len(self.keys) - 1
+        self.vectors[row] = self.vectors[last]
+        self.keys[row] = self.keys[last]
+        self.keys.pop()
+
+    def nearest(self, vector, k=5):
+        """Up to k (key, similarity) pairs, most similar first."""
+        if not self.keys:
+            return []
+        scores = self.vectors[:len(self.keys)] @ vector
+        rows = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+        rows = rows[np.argsort(-scores[rows])]
+        return [(self.keys[row], float(scores[row])) for row in rows]
+
+
+class Hit(NamedTuple):
+    reply: str
+    question: str  # the cached question this one matched
+    similarity: float
+    saved_s: float  # latency of the model call that produced the reply
+
+
+class SemanticCache:
+    """Replies keyed by question meaning rather than exact text, within a scope (e.g. a destination).
+
+    lookup() returns the reply cached for the most similar earlier question in
+    the same scope when the cosine similarity reaches `threshold` and the two
+    questions are compatible() (same negation, direction and subject). One cache
+    serves every user of a process, so personal() questions are neither stored
+    nor looked up. Entries expire after `ttl` seconds; beyond `max_entries` the
+    least recently used is dropped.
+    """
+
+    def __init__(self, threshold=0.8, max_entries=2048, ttl=6 * 3600, dim=DIM):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dim = dim
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0  # lookups whose nearest questions were similar enough but not compatible()
+        self.personal = 0  # lookups skipped because the question is about the asker
+        self.saved_s = 0.0
+        self._entries = OrderedDict()  # key -> (scope, question, reply, created_at, latency_s, signature), oldest use first
+        self._indexes = {}  # scope -> _Index
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scope(scope):
+        return " ".join(str(scope or "").lower().split())
+
+    def lookup(self, question, scope=None):
+        if personal(question):
+            with self._lock:
+                self.personal += 1
+            return None
+        scope = self._scope(scope)
+        vector = embed(question, self.dim)
+        wanted = signature(question)
+        with self._lock:
+            index = self._indexes.get(scope)
+            rejected = False
+            for key, similarity in index.nearest(vector) if index else []:
+                if similarity < self.threshold:
+                    break
+                _, cached_question, reply, created_at, latency_s, cached = self._entries[key]
+                if time.time() - created_at > self.ttl:
+                    self._drop(key)
+                    continue
+                if not compatible(wanted, cached):
+                    rejected = True
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_s += latency_s
+                return Hit(reply, cached_question, similarity, latency_s)
+            self.misses += 1
+            self.rejected += rejected
+            return None
+
+    def store(self, question, reply, scope=None, latency_s=0.0):
+        if personal(question):
+            return
+        scope = self._scope(scope)
+        vector = embed(question, self.dim)
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = (scope, question, reply, time.time(), latency_s, signature(question))
+            self._indexes.setdefault(scope, _Index(self.dim)).add(key, vector)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        scope = self._entries.pop(key)[0]
+        index = self._indexes[scope]
+        index.remove(key)
+        if not index.keys:
+            del self._indexes[scope]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "scopes": len(self._indexes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "personal": self.personal,
+                "saved_s": round(self.saved_s, 2),
+            }
+
+
+def from_env():
+    """Cache configured from LLM_SEMANTIC_* environment variables; None when LLM_SEMANTIC_CACHE=off."""
+    if os.getenv("LLM_SEMANTIC_CACHE", "on") == "off":
+        return None
+    return SemanticCache(
+        threshold=float(os.getenv("LLM_SEMANTIC_THRESHOLD", 0.8)),
+        max_entries=int(os.getenv("LLM_SEMANTIC_SIZE", 2048)),
+        ttl=float(os.getenv("LLM_SEMANTIC_TTL", 6 * 3600)),
+    )
+
+
+# Created on first use and shared by every agent in the process; scopes keep their entries apart
+_shared = None
+_shared_ready = False
+_shared_lock = threading.Lock()
+
+
+def shared():
+    """The process-wide semantic cache, or None when LLM_SEMANTIC_CACHE=off."""
+    global _shared, _shared_ready
+    if not _shared_ready:
+        with _shared_lock:
+            if not _shared_ready:
+                _shared = from_env()
+                _shared_ready = True
+    return _shared
@@ -0,0 +1,204 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+METRICS = ("demand", "inventory", "production_cost", "supplier_cost", "delivery_time")
+
+
+# --- Fixed-size time series ---
+class RingBuffer:
+    """Last `capacity` values of one series in a preallocated float64 array.
+
+    Every value is written twice, at i and i + capacity, so the newest n values
+    are always one contiguous slice: reads are views, appends are O(1), and
+    memory stays at 2 * capacity floats however long the simulation runs.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._next] = self._data[self._next + self.capacity] = value
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def ago(self, k):
+        """Value appended k appends before the newest one (0 = newest)."""
+        return float(self._data[self._next + self.capacity - 1 - k])
+
+    def last(self, n=None):
+        """View of the newest n values, oldest first."""
+        n = self._count if n is None else min(n, self._count)
+        end = self._next + self.capacity
+        return self._data[end - n:end]
+
+
+# --- O(1) statistics, updated once per tick ---
+class RollingStats:
+    """EWMA plus mean / variance over the last `window` values (sliding Welford update)."""
+
+    def __init__(self, window, alpha=0.1):
+        self.window = window
+        self.alpha = alpha
+        self.ewma = math.nan
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._n = 0
+
+    def update(self, value, dropped=None):
+        """Add `value`; once the window is full, `dropped` is the value leaving it."""
+        self.ewma = value if math.isnan(self.ewma) else self.ewma + self.alpha * (value - self.ewma)
+        if self._n < self.window:
+            self._n += 1
+            delta = value - self.mean
+            self.mean += delta / self._n
+            self._m2 += delta * (value - self.mean)
+        else:
+            mean = self.mean + (value - dropped) / self.window
+            self._m2 += (value - dropped) * (value - mean + dropped - self.mean)
+            self.mean = mean
+
+    @property
+    def variance(self):
+        return max(self._m2, 0.0) / (self._n - 1) if self._n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class HoltForecast:
+    """Holt's linear trend (level + slope) smoothing; forecast(h) extrapolates h ticks ahead."""
+
+    def __init__(self, alpha=0.2, beta=0.05):
+        self.alpha = alpha
+        self.beta = beta
+        self.level = math.nan
+        self.trend = 0.0
+
+    def update(self, value):
+        if math.isnan(self.level):
+            self.level = value
+            return
+        level = self.alpha * value + (1 - self.alpha) * (self.level + self.trend)
+        self.trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+        self.level = level
+
+    def forecast(self, horizon):
+        return self.level + horizon * self.trend
+
+
+class Snapshot:
+    def __init__(self, tick, time, series, latest, stats, forecast):
+        self.tick = tick
+        self.time = time  # unix seconds per point, oldest first
+        self.series = series  # metric -> array over the requested window
+        self.latest = latest  # metric -> newest value
+        self.stats = stats  # metric -> dict(ewma, mean, std) over the rolling window
+        self.forecast = forecast  # delivery-time forecast, hours, at the requested horizon
+
+
+# --- Simulation ---
+class SimulationEngine:
+    """Supply-chain metrics simulated on a background thread, one tick every `interval` seconds.
+
+    Metrics evolve from their previous values (mean-reverting demand, inventory
+    drawn down by demand and replenished after a lead time, drifting costs,
+    delivery times that rise with demand) instead of fresh random draws, and
+    are kept in one RingBuffer each with RollingStats over `window` ticks.
+    """
+
+    def __init__(self, interval=1.0, capacity=86_400, window=300, alpha=0.1, seed=None):
+        self.interval = interval
+        self.window = min(window, capacity)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ticks = 0
+
+        self.time = RingBuffer(capacity)
+        self.buffers = {name: RingBuffer(capacity) for name in METRICS}
+        self.stats = {name: RollingStats(self.window, alpha) for name in METRICS}
+        self.delay_model = HoltForecast()
+
+        self._state = dict(demand=200.0, inventory=100.0, production_cost=20.0, supplier_cost=30.0, delivery_time=5.0)
+        self._arrivals = []  # (tick, units) of replenishment orders in transit
+
+    def _step(self):
+        rng, s = self._rng, self._state
+        s["demand"] = float(np.clip(s["demand"] + 0.1 * (200 - s["demand"]) + rng.normal(0, 15), 100, 300))
+
+        # Consume a slice of demand every tick; reorder below 60 units, delivered 15 ticks later
+        s["inventory"] = max(s["inventory"] - s["demand"] / 80 * rng.uniform(0.5, 1.5), 0.0)
+        s["inventory"] += sum(units for due, units in self._arrivals if due <= self.ticks)
+        self._arrivals = [(due, units) for due, units in self._arrivals if due > self.ticks]
+        if s["inventory"] < 60 and not self._arrivals:
+            self._arrivals.append((self.ticks + 15, 100.0))
+        s["inventory"] = min(s["inventory"], 150.0)
+
+        s["production_cost"] = float(np.clip(s["production_cost"] + rng.normal(0, 0.5), 10, 30))
+        s["supplier_cost"] = float(np.clip(s["supplier_cost"] + rng.normal(0, 0.8), 15, 50))
+
+        # Busier periods mean slower deliveries
+        congestion = 2 + 6 * (s["demand"] - 100) / 200
+        s["delivery_time"] = float(np.clip(s["delivery_time"] + 0.2 * (congestion - s["delivery_time"]) + rng.normal(0, 0.4), 2, 10))
+        return s
+
+    def tick(self, now=None):
+        """Advance one step and record it; O(1) in the length of the history."""
+        with self._lock:
+            state = self._step()
+            self.time.append(time.time() if now is None else now)
+            for name, value in state.items():
+                buffer = self.buffers[name]
+                dropped = buffer.ago(self.window - 1) if len(buffer) >= self.window else None
+                buffer.append(value)
+                self.stats[name].update(value, dropped)
+            self.delay_model.update(state["delivery_time"])
+            self.ticks += 1
+
+    def snapshot(self, window=None, horizon=30):
+        """Copy of the newest `window` ticks (not the whole history) plus current statistics."""
+        window = self.window if window is None else window
+        with self._lock:
+            return Snapshot(
+                tick=self.ticks,
+                time=self.time.last(window).copy(),
+                series={name: buffer.last(window).copy() for name, buffer in self.buffers.items()},
+                latest={name: buffer.ago(0) if len(buffer) else math.nan for name, buffer in self.buffers.items()},
+                stats={name: dict(ewma=s.ewma, mean=s.mean, std=s.std) for name, s in self.stats.items()},
+                forecast=self.delay_model.forecast(horizon),
+            )
+
+    # --- Background thread ---
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self.tick()
+            next_tick += self.interval
+            self._stop.wait(max(next_tick - time.monotonic(), 0.0))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="supply-simulation", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
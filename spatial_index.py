@@ -0,0 +1,128 @@
+import numpy as np
+
+from routing import EARTH_RADIUS_KM, haversine
+
+# Cell coordinates are packed into one int64 key: rows of constant x are contiguous
+_OFFSET = 1 << 20
+_SPAN = 1 << 21
+
+
+def _key(cx, cy):
+    return (cx + _OFFSET) * _SPAN + (cy + _OFFSET)
+
+
+# --- Uniform grid over locally projected coordinates ---
+class GridIndex:
+    """Points (trucks) bucketed into square cells of `cell_km` for k-nearest and radius queries.
+
+    Coordinates are projected equirectangularly around `ref_lat` (the mean
+    latitude by default), which keeps distances within a few percent over a
+    regional fleet; returned distances are great-circle km.
+
+    Points are kept as one array of ids sorted by cell key, so a block of
+    cells is a handful of contiguous slices found by binary search. update()
+    re-sorts from the previous order with a stable (adaptive) sort, so its
+    cost follows how many points changed cell rather than the fleet size.
+    """
+
+    def __init__(self, lat, lon, cell_km=5.0, ref_lat=None):
+        lat = np.asarray(lat, dtype=np.float64)
+        self.cell_km = cell_km
+        if ref_lat is None:
+            ref_lat = float(lat.mean()) if len(lat) else 0.0
+        self.ref_lat = ref_lat
+        self._kx = EARTH_RADIUS_KM * np.cos(np.radians(ref_lat)) * np.pi / 180  # km per degree of longitude
+        self._ky = EARTH_RADIUS_KM * np.pi / 180  # km per degree of latitude
+        self._order = None
+        self.moved = 0  # points that changed cell in the last update()
+        self.update(lat, lon)
+
+    def __len__(self):
+        return len(self._x)
+
+    def _project(self, lat, lon):
+        return np.asarray(lon, dtype=np.float64) * self._kx, np.asarray(lat, dtype=np.float64) * self._ky
+
+    def _cell(self, x, y):
+        return np.floor(x / self.cell_km).astype(np.int64), np.floor(y / self.cell_km).astype(np.int64)
+
+    def update(self, lat, lon):
+        """Move every point to its new position (arrays of the same length as the index)."""
+        self._x, self._y = self._project(lat, lon)
+        cx, cy = self._cell(self._x, self._y)
+        keys = _key(cx, cy)
+        if self._order is None or len(self._order) != len(keys):
+            self._order = np.argsort(keys, kind="stable")
+            self.moved = len(keys)
+        else:
+            self.moved = int(np.count_nonzero(keys != self._keys))
+            if self.moved:
+                # Nearly sorted when few points changed cell, which the stable sort exploits
+                self._order = self._order[np.argsort(keys[self._order], kind="stable")]
+        self._keys = keys
+        self._sorted_keys = keys[self._order]
+        self._bounds = (cx.min(), cx.max(), cy.min(), cy.max()) if len(keys) else (0, 0, 0, 0)
+
+    def _block(self, cx, cy, r):
+        """Ids in the (2r + 1) x (2r + 1) cells centred on cell (cx, cy): one slice per column."""
+        columns = np.arange(cx - r, cx + r + 1)
+        start = np.searchsorted(self._sorted_keys, _key(columns, cy - r), "left")
+        stop = np.searchsorted(self._sorted_keys, _key(columns, cy + r), "right")
+        slices = [self._order[a:b] for a, b in zip(start.tolist(), stop.tolist()) if b > a]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def knn(self, lat, lon, k=1, mask=None):
+        """The k points nearest to (lat, lon), nearest first, as (ids, great-circle km).
+
+        `mask` is an optional boolean array; only points where it is True qualify.
+        """
+        qx, qy = self._project(lat, lon)
+        cx, cy = (int(c) for c in self._cell(qx, qy))
+        x0, x1, y0, y1 = self._bounds
+        max_r = max(cx - x0, x1 - cx, cy - y0, y1 - cy, 1)
+        r = 1
+        while True:
+            ids = self._block(cx, cy, r)
+            if mask is not None:
+                ids = ids[mask[ids]]
+            dist = np.hypot(self._x[ids] - qx, self._y[ids] - qy)
+            # Everything within r cells of the query's cell has been seen, i.e. all points closer than r * cell_km
+            if len(ids) >= k and np.partition(dist, k - 1)[k - 1] <= r * self.cell_km or r >= max_r:
+                break
+            r = min(2 * r, max_r)
+        order = np.argsort(dist)[:k]
+        ids = ids[order]
+        return ids, self._km(lat, lon, ids)
+
+    def within(self, lat, lon, radius_km, mask=None):
+        """All points within `radius_km` of (lat, lon), nearest first, as (ids, great-circle km)."""
+        qx, qy = self._project(lat, lon)
+        cx, cy = (int(c) for c in self._cell(qx, qy))
+        # Projected distances drift from great-circle ones away from ref_lat; pad the search box
+        ids = self._block(cx, cy, int(np.ceil(radius_km * 1.1 / self.cell_km)) + 1)
+        if mask is not None:
+            ids = ids[mask[ids]]
+        km = self._km(lat, lon, ids)
+        keep = np.flatnonzero(km <= radius_km)
+        keep = keep[np.argsort(km[keep])]
+        return ids[keep], km[keep]
+
+    def _km(self, lat, lon, ids):
+        return haversine(lat, lon, self._y[ids] / self._ky, self._x[ids] / self._kx)
+
+
+# --- Dispatch ---
+def assign_nearest(index, available, dest_lat, dest_lon):
+    """Greedily give each delivery, in order, the nearest still-available point of `index`.
+
+    `available` is a boolean array and is updated in place. Returns (ids, km)
+    per delivery; id is -1 when no point is available.
+    """
+    ids = np.full(len(dest_lat), -1, dtype=np.int64)
+    km = np.full(len(dest_lat), np.nan)
+    for j, (lat, lon) in enumerate(zip(dest_lat, dest_lon)):
+        nearest, dist = index.knn(lat, lon, k=1, mask=available)
+        if len(nearest):
+            ids[j], km[j] = nearest[0], dist[0]
+            available[nearest[0]] = False
+    return ids, km
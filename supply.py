@@ -1,40 +1,15 @@
-import os
-import random
+import threading
 import time
-import folium
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from streamlit_folium import st_folium
-from azure.ai.inference import ChatCompletionsClient
-from azure.ai.inference.models import SystemMessage, UserMessage
-from azure.core.credentials import AzureKeyCredential
-from streamlit_autorefresh import st_autorefresh
 import streamlit as st
-from scipy.optimize import linprog
-
-# Set up your GitHub token for API access
-token = os.getenv("GITHUB_TOKEN")
-
-# Define the Azure DeepSeek API endpoint and model
-endpoint = "https://models.github.ai/inference"
-model = "deepseek/DeepSeek-V3-0324"
-
-# Set up the Azure DeepSeek API client
-client = ChatCompletionsClient(
-    endpoint=endpoint,
-    credential=AzureKeyCredential(token),
-)
-
-def generate_completion(user_prompt):
-    response = client.complete(
-        messages=[SystemMessage("You are a helpful AI assistant."), UserMessage(user_prompt)],
-        temperature=0.7,
-        top_p=0.9,
-        max_tokens=2048,
-        model=model,
-    )
-    return response.choices[0].message.content
+import supply_core
+from fleet import Fleet, deck as fleet_deck
+from planner import ProductionPlanner
+from sim_engine import SimulationEngine
+from spatial_index import GridIndex, assign_nearest
+from supply_core import CITY_COORDS, WAREHOUSE_COORDS
+
+# Business logic and the DeepSeek helpers live in supply_core, importable without Streamlit
 
 # --- Streamlit Configuration ---
 st.set_page_config(page_title="🚛 Supply Chain Optimization Dashboard", page_icon="🚛", layout="wide")
@@ -48,146 +23,170 @@ st.markdown("""
 - Predictive analytics for delays ⏳
 """)
 
-# --- Real-Time Refresh every 5 seconds ---
-count = st_autorefresh(interval=5 * 1000, key="auto_refresh")
+# --- Refresh cadence ---
+# Each live section is a fragment that reruns on its own timer, so a tick only
+# re-executes (and re-sends) that section instead of the whole dashboard.
+# Static parts (agents, routes, delivery map) run on the first load and on user
+# interaction, and are cached as resources across reruns and sessions.
+METRICS_REFRESH = 5  # seconds
+SUPPLIER_REFRESH = 30  # seconds
+
+# Delivery times above this many hours count as delayed
+DELAY_THRESHOLD = 7
+# Forecast horizon for delivery times, in simulation ticks (one per second)
+DELAY_HORIZON = 30
 
 # --- Simulate Real-Time Data ---
-def simulate_real_time_data():
-    demand = random.randint(100, 300)
-    inventory = random.randint(20, 150)
-    production_cost = random.randint(10, 30)
-    supplier_cost = random.randint(15, 50)
-    delivery_time = random.randint(2, 10)
-    return demand, inventory, production_cost, supplier_cost, delivery_time
+# One simulation per server process, ticking on its own thread regardless of reruns and
+# keeping a bounded history (ring buffers) that every session reads snapshots from
+@st.cache_resource
+def simulation():
+    return SimulationEngine(interval=1.0).start()
 
-demand, inventory, production_cost, supplier_cost, delivery_time = simulate_real_time_data()
+def simulate_real_time_data():
+    return supply_core.latest_metrics(simulation())
 
 # --- Live Metrics ---
 st.header("📈 Live Metrics")
 
-col1, col2, col3, col4 = st.columns(4)
-col1.metric("Current Demand", f"{demand} units")
-col2.metric("Inventory Level", f"{inventory} units", delta=f"{inventory - 100} units")
-col3.metric("Production Cost", f"${production_cost}")
-col4.metric("Supplier Cost", f"${supplier_cost}")
-
-# 🚨 ALERT
-if inventory < 50:
-    st.error("⚠️ Inventory low! Act fast!")
-
-# --- Define Multi-Agent System ---
-
-class InventoryAgent:
-    def __init__(self, inventory):
-        self.inventory = inventory
-    
-    def check_inventory(self, demand):
-        # If demand exceeds inventory, notify procurement agent
-        if demand > self.inventory:
-            return True
-        return False
-
-class ProcurementAgent:
-    def __init__(self, supply_cost):
-        self.supply_cost = supply_cost
-
-    def order_materials(self, order_quantity):
-        print(f"Procurement Agent: Ordering {order_quantity} units of material.")
-        return order_quantity * self.supply_cost
-
-class RouteOptimizationAgent:
-    def __init__(self, delivery_time):
-        self.delivery_time = delivery_time
-
-    def optimize_route(self, destinations):
-        print("Route Optimization Agent: Optimizing delivery routes...")
-        return sorted(destinations, key=lambda x: x['distance'])
-
-class SupplyChainCoordinator:
-    def __init__(self, inventory_agent, procurement_agent, route_agent):
-        self.inventory_agent = inventory_agent
-        self.procurement_agent = procurement_agent
-        self.route_agent = route_agent
-
-    def coordinate(self, demand, destinations):
-        # Check inventory and order materials if necessary
-        if self.inventory_agent.check_inventory(demand):
-            print("Inventory Agent: Inventory is low, notifying Procurement Agent.")
-            self.procurement_agent.order_materials(demand)
-
-        # Optimize delivery routes
-        optimized_routes = self.route_agent.optimize_route(destinations)
-        print("Supply Chain Coordinator: Coordinating agents...")
-        return optimized_routes
-
-
-# Example usage of Multi-Agent System
-inventory_agent = InventoryAgent(inventory=100)
-procurement_agent = ProcurementAgent(supply_cost=50)
-route_agent = RouteOptimizationAgent(delivery_time=5)
-coordinator = SupplyChainCoordinator(inventory_agent, procurement_agent, route_agent)
-
-demand = 150
-destinations = [{'city': 'Boston', 'distance': 200}, {'city': 'Philadelphia', 'distance': 150}]
-
-# Coordinate the agents
-optimized_routes = coordinator.coordinate(demand, destinations)
-st.write(f"Optimized Routes: {optimized_routes}")
+@st.fragment(run_every=METRICS_REFRESH)
+def live_metrics():
+    demand, inventory, production_cost, supplier_cost, delivery_time = simulate_real_time_data()
+    # Shared with the Optimal Strategy fragment
+    st.session_state.live_metrics = dict(
+        demand=demand, inventory=inventory, production_cost=production_cost, supplier_cost=supplier_cost
+    )
 
-# --- Optimization ---
-st.header("⚙️ Optimal Strategy")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Current Demand", f"{demand} units")
+    col2.metric("Inventory Level", f"{inventory} units", delta=f"{inventory - 100} units")
+    col3.metric("Production Cost", f"${production_cost}")
+    col4.metric("Supplier Cost", f"${supplier_cost}")
 
-c = [production_cost, supplier_cost]
-A = [[1, 1]]
-b = [max(demand - inventory, 0)]
+    # 🚨 ALERT
+    if inventory < 50:
+        st.error("⚠️ Inventory low! Act fast!")
 
-result = linprog(c, A_ub=A, b_ub=b, bounds=[(0, None), (0, None)], method="highs")
+live_metrics()
 
-if result.success:
-    production_units = int(result.x[0])
-    supplier_units = int(result.x[1])
-    total_cost = result.fun
+@st.cache_resource
+def delivery_plan():
+    """Agents and their routes depend only on the static example data, so they are built once."""
+    return supply_core.delivery_plan()
 
-    st.success(f"Optimal Plan Ready")
-    col5, col6 = st.columns(2)
-    col5.metric("Produce", production_units)
-    col6.metric("Procure", supplier_units)
+coordinator, optimized_routes = delivery_plan()
+for truck, route in enumerate(optimized_routes, 1):
+    stops = " → ".join(d['city'] for d in route)
+    st.write(f"Optimized Route, Truck {truck}: Warehouse → {stops} → Warehouse")
+if coordinator.unassigned:
+    cities = ", ".join(d['city'] for d in coordinator.unassigned)
+    st.warning(f"No truck can serve {cities} within capacity and time windows; these deliveries need another plan.")
 
-    st.info(f"💵 Estimated Total Cost: ${total_cost:.2f}")
+# --- Optimization ---
+st.header("⚙️ Optimal Strategy")
+
+@st.fragment(run_every=METRICS_REFRESH)
+def optimal_strategy():
+    demand, inventory, production_cost, supplier_cost = st.session_state.live_metrics.values()
+
+    # The plant can make this many units per period; the rest of the shortfall is bought in
+    plant_capacity = 100
+
+    # Planners keep their sparse model between refreshes: unchanged inputs skip the solve,
+    # changed ones re-solve from the previous basis
+    if "planner" not in st.session_state:
+        st.session_state.planner = ProductionPlanner(1, 1, 1)
+    result = st.session_state.planner.solve(
+        demand=demand,
+        initial_inventory=inventory,
+        production_cost=production_cost,
+        procurement_cost=supplier_cost,
+        production_capacity=plant_capacity,
+    )
+
+    if result.success:
+        production_units = int(result.produce.sum())
+        supplier_units = int(result.procure.sum())
+        total_cost = result.objective
+
+        st.success(f"Optimal Plan Ready")
+        col5, col6 = st.columns(2)
+        col5.metric("Produce", production_units)
+        col6.metric("Procure", supplier_units)
+
+        st.info(f"💵 Estimated Total Cost: ${total_cost:.2f}")
+
+    with st.expander("📦 Network plan (SKUs × warehouses × weeks)"):
+        n_skus = st.slider("SKUs", 1, 200, 20)
+        n_sites = st.slider("Warehouses", 1, 10, 3)
+        n_periods = st.slider("Weeks", 1, 52, 12)
+
+        # Fixed per-SKU profile, scaled by the live demand so each refresh changes the inputs
+        lead_times, base_demand, sku_cost = supply_core.network_inputs(n_skus, n_sites, n_periods)
+
+        key = (n_skus, n_sites, n_periods)
+        if st.session_state.get("network_planner_key") != key:
+            st.session_state.network_planner_key = key
+            st.session_state.network_planner = ProductionPlanner(
+                n_skus, n_sites, n_periods, production_lead=lead_times[0], procurement_lead=lead_times[1]
+            )
+        network = st.session_state.network_planner
+        plan = network.solve(
+            demand=base_demand * demand / 200,
+            initial_inventory=inventory / n_sites,
+            production_cost=production_cost * sku_cost,
+            procurement_cost=supplier_cost * sku_cost,
+            holding_cost=0.5,
+            shortage_cost=100,
+            production_capacity=plant_capacity * n_skus / 4,
+        )
+        if plan.success:
+            col7, col8, col9 = st.columns(3)
+            col7.metric("Produce", f"{plan.produce.sum():,.0f}")
+            col8.metric("Procure", f"{plan.procure.sum():,.0f}")
+            col9.metric("Unmet", f"{plan.unmet.sum():,.0f}")
+            st.caption(
+                f"{network.n_vars:,} variables · solved in {plan.runtime_s * 1000:.0f} ms"
+                f"{' (warm start)' if plan.warm_start else ''} · {network.solves} solves, {network.skipped} skipped"
+            )
+        else:
+            st.error(f"Network plan failed: {plan.status}")
+
+optimal_strategy()
 
 # --- MAP SECTION 🚚🗺️ ---
 st.header("🗺️ Warehouse to City Delivery Map")
 
-# Warehouse and city coordinates (simulate)
-warehouse_coords = (40.7128, -74.0060)  # New York warehouse
-city_coords = {
-    "Boston": (42.3601, -71.0589),
-    "Philadelphia": (39.9526, -75.1652),
-    "Washington D.C.": (38.9072, -77.0369)
-}
-
-m = folium.Map(location=warehouse_coords, zoom_start=6)
+@st.cache_resource
+def delivery_map():
+    return supply_core.delivery_map(optimized_routes)
 
-# Add warehouse marker
-folium.Marker(warehouse_coords, popup="🏭 Warehouse", icon=folium.Icon(color="blue")).add_to(m)
+# Rendering a folium map mutates it, so sessions sharing the cached map take turns
+@st.cache_resource
+def delivery_map_lock():
+    return threading.Lock()
 
-# Add city markers
-for city, coord in city_coords.items():
-    folium.Marker(coord, popup=f"🚚 {city}", icon=folium.Icon(color="green")).add_to(m)
-    folium.PolyLine([warehouse_coords, coord], color="red", weight=2.5, opacity=1).add_to(m)
+# Imported here, not at the top, so the sections above are on screen before its ~1 s import
+from streamlit_folium import st_folium  # noqa: E402
 
-st_folium(m, width=725)
+# Static map: don't send pan/zoom events back, they would rerun the whole script
+with delivery_map_lock():
+    st_folium(delivery_map(), width=725, returned_objects=[])
 
 # --- Supplier Health Monitoring 🏥 ---
 st.header("🏥 Supplier Health Monitoring (Simulated)")
 
-supplier_health = random.choice(["✅ Good", "⚠️ Warning", "❌ Bad"])
-st.metric("Supplier Health Status", supplier_health)
+@st.fragment(run_every=SUPPLIER_REFRESH)
+def supplier_health_status():
+    supplier_health = supply_core.supplier_health()
+    st.metric("Supplier Health Status", supplier_health)
 
-if supplier_health == "⚠️ Warning":
-    st.warning("Supplier performance degrading. Monitor closely!")
-elif supplier_health == "❌ Bad":
-    st.error("Supplier critical! Need alternative supplier!")
+    if supplier_health == "⚠️ Warning":
+        st.warning("Supplier performance degrading. Monitor closely!")
+    elif supplier_health == "❌ Bad":
+        st.error("Supplier critical! Need alternative supplier!")
+
+supplier_health_status()
 
 # --- Truck Tracking 🚛 ---
 st.header("🚛 Live Truck Tracking (Slower Simulation)")
@@ -195,48 +194,101 @@ st.header("🚛 Live Truck Tracking (Slower Simulation)")
 # Set the refresh interval (e.g., 5 seconds for updating truck data)
 refresh_interval = 5  # seconds
 
-# Set a limit for the simulation's movement speed (slower update)
-truck_speed_limit = 0.2  # degrees per refresh, smaller values move trucks slower
+# Simulated minutes that pass per real second, so movement is visible between refreshes
+sim_minutes_per_second = 1.0
 
-# Initialize truck data
-if "truck_data_refresh_time" not in st.session_state:
-    st.session_state.truck_data_refresh_time = time.time()
-    st.session_state.truck_locations = pd.DataFrame({
-        "Truck ID": [f"T-{i}" for i in range(1, 6)],
-        "Latitude": [40.7128 + random.uniform(-1, 1) for _ in range(5)],
-        "Longitude": [-74.0060 + random.uniform(-1, 1) for _ in range(5)],
-        "Speed (km/h)": [random.randint(40, 100) for _ in range(5)]
-    })
+# Fleet size is configurable; state is NumPy arrays, so 100k trucks update in milliseconds
+fleet_size = st.sidebar.number_input("Trucks to simulate", min_value=1, max_value=200_000, value=5, step=100)
+
+@st.fragment(run_every=refresh_interval)
+def truck_tracking(fleet_size):
+    # Initialize truck data
+    if "truck_data_refresh_time" not in st.session_state or len(st.session_state.fleet) != fleet_size:
+        st.session_state.truck_data_refresh_time = time.time()
+        st.session_state.fleet = Fleet.random(fleet_size, center=WAREHOUSE_COORDS, spread=1.0)
+        st.session_state.truck_index = GridIndex(st.session_state.fleet.lat, st.session_state.fleet.lon)
+        st.session_state.truck_busy_until = np.zeros(fleet_size)  # wall-clock time each truck finishes its delivery
 
-# Refresh truck data only after the specified interval
-if time.time() - st.session_state.truck_data_refresh_time > refresh_interval:
-    # Update truck locations gradually by a small amount for slower movement
-    for idx, row in st.session_state.truck_locations.iterrows():
-        # Simulate gradual movement by adjusting latitude and longitude
-        new_lat = row["Latitude"] + random.uniform(-truck_speed_limit, truck_speed_limit)
-        new_lon = row["Longitude"] + random.uniform(-truck_speed_limit, truck_speed_limit)
-        st.session_state.truck_locations.at[idx, "Latitude"] = new_lat
-        st.session_state.truck_locations.at[idx, "Longitude"] = new_lon
+    # Move every truck along its heading by the time since the last tick, in one vectorized step
+    elapsed = time.time() - st.session_state.truck_data_refresh_time
+    st.session_state.fleet.advance(hours=elapsed * sim_minutes_per_second / 60)
+    # Only trucks that crossed a grid cell are re-sorted, not the whole index
+    st.session_state.truck_index.update(st.session_state.fleet.lat, st.session_state.fleet.lon)
 
     # Update the time of last refresh
     st.session_state.truck_data_refresh_time = time.time()
 
-    # Display updated truck data
-    st.dataframe(st.session_state.truck_locations)
-
-    # Truck map
-    truck_map = folium.Map(location=[40.7128, -74.0060], zoom_start=7)
-    for idx, row in st.session_state.truck_locations.iterrows():
-        folium.Marker(
-            location=[row["Latitude"], row["Longitude"]],
-            popup=f"🚛 {row['Truck ID']} - {row['Speed (km/h)']} km/h",
-            icon=folium.Icon(color="orange")
-        ).add_to(truck_map)
-
-    st_folium(truck_map, width=725)
+    # Display updated truck data (first rows only; the map shows the whole fleet)
+    st.dataframe(st.session_state.fleet.to_frame(limit=100))
+
+    # Truck map: a single WebGL scatter layer instead of one folium.Marker per truck
+    st.pydeck_chart(fleet_deck(st.session_state.fleet, zoom=7))
+
+truck_tracking(fleet_size)
+
+# --- Dispatch 📍 ---
+st.header("📍 Nearest-Truck Dispatch")
+
+@st.fragment
+def dispatch():
+    fleet, index = st.session_state.fleet, st.session_state.truck_index
+    available = st.session_state.truck_busy_until <= time.time()
+
+    col1, col2 = st.columns(2)
+    city = col1.selectbox("Destination", list(CITY_COORDS))
+    radius = col2.slider("Search radius (km)", min_value=10, max_value=500, value=50, step=10)
+    lat, lon = CITY_COORDS[city]
+
+    nearby, _ = index.within(lat, lon, radius)
+    idle = int(available[nearby].sum())
+    st.caption(f"{len(nearby):,} trucks within {radius} km of {city} ({idle:,} available) · "
+               f"{int(available.sum()):,} of {len(fleet):,} available overall")
+
+    if st.button(f"Dispatch nearest truck to {city}"):
+        ids, km = assign_nearest(index, available, [lat], [lon])
+        truck = ids[0]
+        if truck < 0:
+            st.warning("No truck available.")
+        else:
+            # Busy for the drive there, in simulated hours, converted to wall-clock seconds
+            hours = km[0] / fleet.speed[truck]
+            st.session_state.truck_busy_until[truck] = time.time() + hours * 60 / sim_minutes_per_second
+            st.success(f"T-{fleet.ids[truck]} dispatched to {city}: {km[0]:.1f} km, ETA {hours * 60:.0f} min")
+
+dispatch()
+
+# --- Predictive Delays ⏳ ---
+st.header("⏳ Predictive Delays")
+
+@st.fragment(run_every=METRICS_REFRESH)
+def predictive_delays():
+    snapshot = simulation().snapshot(horizon=DELAY_HORIZON)
+    delivery = snapshot.stats["delivery_time"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Delivery Time", f"{snapshot.latest['delivery_time']:.1f} h")
+    col2.metric("EWMA", f"{delivery['ewma']:.1f} h")
+    col3.metric("Rolling Mean", f"{delivery['mean']:.1f} h", delta=f"±{delivery['std']:.1f} h", delta_color="off")
+    col4.metric(f"Forecast (+{DELAY_HORIZON} ticks)", f"{snapshot.forecast:.1f} h",
+                delta=f"{snapshot.forecast - snapshot.latest['delivery_time']:+.1f} h", delta_color="inverse")
+
+    if snapshot.forecast > DELAY_THRESHOLD:
+        st.warning(f"Deliveries trending above {DELAY_THRESHOLD} h. Expect delays!")
+
+    # Plain Vega-Lite spec with inline values: far cheaper per tick than building a DataFrame for st.line_chart
+    values = [{"tick": i, "hours": round(h, 2)} for i, h in enumerate(snapshot.series["delivery_time"].tolist())]
+    st.vega_lite_chart({
+        "data": {"values": values},
+        "mark": "line",
+        "encoding": {
+            "x": {"field": "tick", "type": "quantitative", "axis": None},
+            "y": {"field": "hours", "type": "quantitative", "title": "Delivery time (h)", "scale": {"zero": False}},
+        },
+        "height": 200,
+    })
+    st.caption(f"Last {len(snapshot.time)} of {snapshot.tick:,} simulation ticks")
 
-else:
-    st.info("Tracking trucks... Please wait for the next update.")
+predictive_delays()
 
 # --- Future Upgrades ---
 st.markdown("---")
@@ -245,6 +297,5 @@ st.markdown("""
 - Live GPS integration 📡
 - Automatic rescheduling based on traffic 🛣️
 - Truck health monitoring 🛠️
-- Predictive delays 📈
 - Multi-city optimization 🌎
 """)
\ No newline at end of file
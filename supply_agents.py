@@ -0,0 +1,90 @@
+import logging
+
+import numpy as np
+
+from routing import solve_cvrp
+
+logger = logging.getLogger(__name__)
+
+
+# --- Supply-chain agents (used directly by the dashboard, and by agent_runtime) ---
+class InventoryAgent:
+    def __init__(self, inventory):
+        self.inventory = inventory
+
+    def check_inventory(self, demand):
+        # If demand exceeds inventory, notify procurement agent
+        if demand > self.inventory:
+            return True
+        return False
+
+
+class ProcurementAgent:
+    def __init__(self, supply_cost):
+        self.supply_cost = supply_cost
+
+    def order_materials(self, order_quantity):
+        logger.info("Procurement Agent: Ordering %s units of material.", order_quantity)
+        return order_quantity * self.supply_cost
+
+
+class RouteOptimizationAgent:
+    def __init__(self, delivery_time, depot=None, truck_capacity=np.inf, n_trucks=None, time_limit=3.0):
+        self.delivery_time = delivery_time
+        self.depot = depot
+        self.truck_capacity = truck_capacity
+        self.n_trucks = n_trucks
+        self.time_limit = time_limit  # seconds of 2-opt / Or-opt per call
+        self.last_plan = None
+
+    def optimize_route(self, destinations):
+        """One ordered list of destinations per truck; stops no truck can serve are logged and left out."""
+        routes, _ = self.plan_routes(destinations)
+        return routes
+
+    def plan_routes(self, destinations):
+        """(routes, unassigned): one ordered list of destinations per truck, and the destinations no truck can
+        serve within capacity, time windows or the truck limit."""
+        logger.info("Route Optimization Agent: Optimizing delivery routes...")
+        # Without coordinates there is nothing to route; fall back to nearest-first
+        if self.depot is None or any("lat" not in d for d in destinations):
+            return [sorted(destinations, key=lambda x: x['distance'])], []
+
+        timed = any("due" in d for d in destinations)
+        plan = solve_cvrp(
+            self.depot,
+            [d["lat"] for d in destinations],
+            [d["lon"] for d in destinations],
+            demand=[d.get("demand", 1) for d in destinations],
+            capacity=self.truck_capacity,
+            n_trucks=self.n_trucks,
+            ready=[d.get("ready", 0) for d in destinations] if timed else None,
+            due=[d.get("due", np.inf) for d in destinations] if timed else None,
+            time_limit=self.time_limit,
+        )
+        routes = [[destinations[i] for i in route] for route in plan.routes]
+        unassigned = [destinations[i] for i in plan.unassigned]
+        if unassigned:
+            logger.warning("Route Optimization Agent: %d of %d stops could not be assigned to a truck: %s",
+                           len(unassigned), len(destinations), [d.get("city", d) for d in unassigned])
+        self.last_plan = plan
+        return routes, unassigned
+
+
+class SupplyChainCoordinator:
+    def __init__(self, inventory_agent, procurement_agent, route_agent):
+        self.inventory_agent = inventory_agent
+        self.procurement_agent = procurement_agent
+        self.route_agent = route_agent
+        self.unassigned = []  # stops the last coordinate() could not put on a truck
+
+    def coordinate(self, demand, destinations):
+        # Check inventory and order materials if necessary
+        if self.inventory_agent.check_inventory(demand):
+            logger.info("Inventory Agent: Inventory is low, notifying Procurement Agent.")
+            self.procurement_agent.order_materials(demand)
+
+        # Optimize delivery routes
+        optimized_routes, self.unassigned = self.route_agent.plan_routes(destinations)
+        logger.info("Supply Chain Coordinator: Coordinating agents...")
+        return optimized_routes
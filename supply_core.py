@@ -0,0 +1,92 @@
+import functools
+import random
+
+import numpy as np
+
+import llm_gateway
+from routing import haversine
+from supply_agents import InventoryAgent, ProcurementAgent, RouteOptimizationAgent, SupplyChainCoordinator
+
+# DeepSeek settings for this agent (client and cache live in llm_gateway)
+GENERATION = dict(system="You are a helpful AI assistant.", temperature=0.7, top_p=0.9, max_tokens=2048, agent="supply")
+
+# Warehouse and city coordinates (simulate)
+WAREHOUSE_COORDS = (40.7128, -74.0060)  # New York warehouse
+CITY_COORDS = {
+    "Boston": (42.3601, -71.0589),
+    "Philadelphia": (39.9526, -75.1652),
+    "Washington D.C.": (38.9072, -77.0369)
+}
+CITY_DEMAND = {"Boston": 60, "Philadelphia": 50, "Washington D.C.": 70}  # units per delivery
+
+SUPPLIER_STATUSES = ["✅ Good", "⚠️ Warning", "❌ Bad"]
+ROUTE_COLORS = ["red", "purple", "darkblue", "cadetblue", "darkgreen", "orange"]
+
+
+# --- DeepSeek calls: both return the error text instead of raising (see llm_gateway.ask*) ---
+generate_completion = functools.partial(llm_gateway.ask_or_error, GENERATION)
+generate_completion_stream = functools.partial(llm_gateway.ask_stream, GENERATION)
+
+
+# --- Simulated data ---
+def latest_metrics(engine):
+    """(demand, inventory, production_cost, supplier_cost, delivery_time) from the engine's latest tick."""
+    latest = engine.snapshot(window=1).latest
+    return tuple(round(latest[name]) for name in ("demand", "inventory", "production_cost", "supplier_cost", "delivery_time"))
+
+
+def supplier_health():
+    return random.choice(SUPPLIER_STATUSES)
+
+
+def network_inputs(n_skus, n_sites, n_periods, seed=0):
+    """Fixed per-SKU profile: (production lead, procurement lead), base demand and relative cost."""
+    rng = np.random.default_rng(seed)
+    lead_times = rng.integers(0, 3, n_skus), rng.integers(1, 4, n_skus)
+    base_demand = rng.uniform(0, 50, (n_skus, n_sites, n_periods))
+    sku_cost = rng.uniform(0.5, 1.5, (n_skus, 1, 1))
+    return lead_times, base_demand, sku_cost
+
+
+# --- Multi-agent delivery plan ---
+def delivery_plan(demand=150):
+    """The coordinator and its optimized truck routes for the example warehouse and cities."""
+    inventory_agent = InventoryAgent(inventory=100)
+    procurement_agent = ProcurementAgent(supply_cost=50)
+    route_agent = RouteOptimizationAgent(delivery_time=5, depot=WAREHOUSE_COORDS, truck_capacity=120)
+    coordinator = SupplyChainCoordinator(inventory_agent, procurement_agent, route_agent)
+
+    destinations = [
+        {
+            'city': city,
+            'lat': lat,
+            'lon': lon,
+            'distance': round(float(haversine(WAREHOUSE_COORDS[0], WAREHOUSE_COORDS[1], lat, lon))),
+            'demand': CITY_DEMAND[city],
+        }
+        for city, (lat, lon) in CITY_COORDS.items()
+    ]
+
+    # Coordinate the agents
+    return coordinator, coordinator.coordinate(demand, destinations)
+
+
+def delivery_map(routes):
+    """Folium map of the warehouse, the cities and each truck's tour."""
+    import folium  # ~0.9 s to import; only the map section needs it
+
+    m = folium.Map(location=WAREHOUSE_COORDS, zoom_start=6)
+
+    # Add warehouse marker
+    folium.Marker(WAREHOUSE_COORDS, popup="🏭 Warehouse", icon=folium.Icon(color="blue")).add_to(m)
+
+    # Add city markers
+    for city, coord in CITY_COORDS.items():
+        folium.Marker(coord, popup=f"🚚 {city}", icon=folium.Icon(color="green")).add_to(m)
+
+    # Draw each truck's optimized tour: warehouse -> stops -> warehouse
+    for truck, route in enumerate(routes):
+        path = [WAREHOUSE_COORDS] + [(d['lat'], d['lon']) for d in route] + [WAREHOUSE_COORDS]
+        folium.PolyLine(path, color=ROUTE_COLORS[truck % len(ROUTE_COLORS)], weight=2.5, opacity=1,
+                        tooltip=f"Truck {truck + 1}").add_to(m)
+    return m
@@ -0,0 +1,308 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import accumulate
+
+from llm_scheduler import status_code
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Timings kept per call, exported as histograms
+TIMINGS = ("queue_wait_s", "ttft_s", "latency_s")
+
+# Replies served from a cache or store: the response cache, an app's semantic cache, pre-generated content
+CACHE_OUTCOMES = ("cache_hit", "semantic_hit", "store_hit")
+
+# Outcomes that did not reach the model, so they cost no tokens
+FREE_OUTCOMES = {*CACHE_OUTCOMES, "coalesced"}
+
+
+def estimate_tokens(text):
+    # Same ~4 characters per token heuristic as chat_memory, for responses without usage
+    return max(1, len(text) // 4) if text else 0
+
+
+def outcome_of(exc):
+    if status_code(exc) == 429:
+        return "throttled"
+    if isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__:
+        return "timeout"
+    return "error"
+
+
+# --- One model call, timed from the caller's point of view ---
+class Call:
+    """Filled in by llm_gateway as the call progresses; finish() hands it to the sink.
+
+    queue_wait_s: from the call until the scheduler first admitted it (rate and concurrency limits)
+    ttft_s: from the call until the first token (the whole reply when not streaming)
+    latency_s: from the call until the reply was complete or the call failed
+    """
+
+    def __init__(self, sink, agent, prompt_type, model, stream):
+        self.sink = sink
+        self.agent = agent or "unknown"
+        self.prompt_type = prompt_type or "unknown"
+        self.model = model
+        self.stream = stream
+        self.attempts = 0
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self._start = time.perf_counter()
+        self._admitted = None
+        self._first_token = None
+        self._done = False
+
+    def attempt(self):
+        """Called each time the scheduler actually sends the request."""
+        self.attempts += 1
+        if self._admitted is None:
+            self._admitted = time.perf_counter()
+
+    def first_token(self):
+        if self._first_token is None:
+            self._first_token = time.perf_counter()
+
+    def usage(self, usage):
+        if usage is not None:
+            self.prompt_tokens = getattr(usage, "prompt_tokens", None)
+            self.completion_tokens = getattr(usage, "completion_tokens", None)
+
+    def finish(self, outcome, prompt="", reply=""):
+        if self._done:
+            return
+        self._done = True
+        end = time.perf_counter()
+        estimated = False
+        if outcome in FREE_OUTCOMES:
+            self.prompt_tokens = self.completion_tokens = 0
+        elif self.prompt_tokens is None and self.attempts:
+            # The service omits usage on some streams; count what was sent and received
+            self.prompt_tokens, self.completion_tokens = estimate_tokens(prompt), estimate_tokens(reply)
+            estimated = True
+        self.sink.record({
+            "ts": time.time(),
+            "agent": self.agent,
+            "prompt_type": self.prompt_type,
+            "model": self.model,
+            "stream": self.stream,
+            "outcome": outcome,
+            "retries": max(self.attempts - 1, 0),
+            "queue_wait_s": round((self._admitted or end) - self._start, 4),
+            "ttft_s": round(self._first_token - self._start, 4) if self._first_token is not None else None,
+            "latency_s": round(end - self._start, 4),
+            "prompt_tokens": self.prompt_tokens or 0,
+            "completion_tokens": self.completion_tokens or 0,
+            "tokens_estimated": estimated,
+        })
+
+
+# --- Sink: recent calls in memory, rolling JSONL on disk, Prometheus aggregates ---
+class Telemetry:
+    def __init__(self, path=None, max_bytes=10 * 2 ** 20, backups=3, history=5000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recent = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._calls = {}  # (agent, prompt_type, outcome) -> count
+        self._tokens = {}  # (agent, prompt_type, kind) -> count
+        self._histograms = {}  # (timing, agent, prompt_type) -> [bucket counts..., +Inf count, sum]
+        self._file = None
+        self._lock_file = None  # path.lock, held while appending or rotating
+
+    def start(self, agent, prompt_type, model, stream=False):
+        return Call(self, agent, prompt_type, model, stream)
+
+    def record(self, record):
+        labels = (record["agent"], record["prompt_type"])
+        with self._lock:
+            self.recent.append(record)
+            key = (*labels, record["outcome"])
+            self._calls[key] = self._calls.get(key, 0) + 1
+            for kind in ("prompt", "completion"):
+                key = (*labels, kind)
+                self._tokens[key] = self._tokens.get(key, 0) + record[f"{kind}_tokens"]
+            # Cache hits and coalesced calls would drag the percentiles towards zero
+            for timing in TIMINGS if record["outcome"] not in FREE_OUTCOMES else ():
+                value = record[timing]
+                if value is None:
+                    continue
+                counts = self._histograms.setdefault((timing, *labels), [0] * (len(BUCKETS) + 1) + [0.0])
+                counts[bisect.bisect_left(BUCKETS, value)] += 1
+                counts[-1] += value
+            if self.path:
+                self._write(record)
+
+    # Every app process appends to the same file: appends and rotation happen under a lock
+    # file, and a handle whose file another process has rotated away is re-opened first
+    def _write(self, record):
+        try:
+            with self._file_lock():
+                if self._file is not None and self._rotated_away():
+                    self._file.close()
+                    self._file = None
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(json.dumps(record) + "\n")
+                self._file.flush()
+                if os.fstat(self._file.fileno()).st_size > self.max_bytes:
+                    self._rotate()
+        except OSError as e:
+            logger.warning("telemetry: cannot write %s: %s", self.path, e)
+
+    @contextmanager
+    def _file_lock(self):
+        if self._lock_file is None:
+            self._lock_file = open(f"{self.path}.lock", "a+b")
+        fd = self._lock_file.fileno()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            self._lock_file.seek(0)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def _rotated_away(self):
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self._file.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+
+    def _rotate(self):
+        # path -> path.1 -> ... -> path.<backups>, oldest dropped
+        self._file.close()
+        self._file = None
+        for i in range(self.backups, 0, -1):
+            source = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i}")
+
+    def prometheus(self):
+        """Counters and histograms in the Prometheus text exposition format."""
+        lines = [
+            "# HELP llm_calls_total Model calls by agent, prompt type and outcome.",
+            "# TYPE llm_calls_total counter",
+        ]
+        with self._lock:
+            for (agent, prompt_type, outcome), count in sorted(self._calls.items()):
+                lines.append(f'llm_calls_total{{agent="{agent}",prompt_type="{prompt_type}",outcome="{outcome}"}} {count}')
+            lines += ["# HELP llm_tokens_total Prompt and completion tokens.", "# TYPE llm_tokens_total counter"]
+            for (agent, prompt_type, kind), count in sorted(self._tokens.items()):
+                lines.append(f'llm_tokens_total{{agent="{agent}",prompt_type="{prompt_type}",kind="{kind}"}} {count}')
+            for timing in TIMINGS:
+                name = f"llm_{timing[:-2]}_seconds"
+                lines += [f"# HELP {name} {timing[:-2].replace('_', ' ')} per call, seconds.", f"# TYPE {name} histogram"]
+                for (kind, agent, prompt_type), counts in sorted(self._histograms.items()):
+                    if kind != timing:
+                        continue
+                    labels = f'agent="{agent}",prompt_type="{prompt_type}"'
+                    cumulative = list(accumulate(counts[:-1]))
+                    for bound, count in zip((*BUCKETS, "+Inf"), cumulative):
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {int(count)}')
+                    lines.append(f"{name}_sum{{{labels}}} {counts[-1]:.4f}")
+                    lines.append(f"{name}_count{{{labels}}} {int(cumulative[-1])}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+# --- Reading back: every process appends to the same JSONL, so it is the cross-app view ---
+def load_jsonl(path, backups=3, since=None):
+    """Records from path and its rotated backups, oldest first; `since` is a unix time."""
+    records = []
+    for name in [f"{path}.{i}" for i in range(backups, 0, -1)] + [path]:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line being written by another process
+                if since is None or record["ts"] >= since:
+                    records.append(record)
+    return records
+
+
+def summarize(records, by=("agent", "prompt_type")):
+    """Per-group call counts, outcome shares, latency percentiles (ms) and token spend."""
+    import numpy as np
+
+    groups = {}
+    for record in records:
+        groups.setdefault(tuple(record[field] for field in by), []).append(record)
+    rows = []
+    for key, group in sorted(groups.items()):
+        billed = [r for r in group if r["outcome"] not in FREE_OUTCOMES]
+        row = dict(zip(by, key))
+        row["calls"] = len(group)
+        row["errors"] = sum(r["outcome"] in ("error", "throttled", "timeout", "abandoned") for r in group)
+        row["cache_hits"] = sum(r["outcome"] in CACHE_OUTCOMES for r in group)
+        for timing in TIMINGS:
+            values = [r[timing] for r in billed if r[timing] is not None]
+            for q in (50, 95):
+                row[f"{timing[:-2]}_p{q}_ms"] = round(float(np.percentile(values, q)) * 1000, 1) if values else None
+        row["prompt_tokens"] = sum(r["prompt_tokens"] for r in group)
+        row["completion_tokens"] = sum(r["completion_tokens"] for r in group)
+        rows.append(row)
+    return rows
+
+
+# --- Optional /metrics endpoint ---
+def serve(render, port, host="127.0.0.1"):
+    """Serve render() as Prometheus text on http://host:port/metrics from a daemon thread.
+
+    Local only by default; pass host="0.0.0.0" for a scraper on another machine.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="llm-metrics", daemon=True).start()
+    return server
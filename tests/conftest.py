@@ -0,0 +1,16 @@
+import os
+import sys
+
+# Offline and side-effect free: in-process mock model, no cache, telemetry or store files
+os.environ.update({
+    "LLM_BACKEND": "mock",
+    "LLM_CACHE_PATH": "",
+    "LLM_TELEMETRY_PATH": "",
+    "TRIP_STORE_PATH": "",
+    "LLM_MOCK_TTFT": "0.05",
+    "LLM_MOCK_TTFT_SIGMA": "0",
+    "LLM_MOCK_ERROR_RATE": "0",
+    "LLM_MOCK_TIMEOUT_RATE": "0",
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
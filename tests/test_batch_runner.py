@@ -0,0 +1,48 @@
+import threading
+import time
+
+import batch_runner
+import trip_warm
+
+
+def test_window_stays_bounded_and_failures_are_counted():
+    lock = threading.Lock()
+    running = peak = 0
+    pulled, finished = [], []
+
+    def jobs():
+        for number in range(20):
+            pulled.append(number)
+            yield (number,)
+
+    def work(number):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return number
+
+    def finish(job, result):
+        # Jobs are pulled lazily: never more than the window ahead of the finished ones
+        assert len(pulled) <= len(finished) + 2 * 2 + 1
+        finished.append(job)
+        return result % 5 == 0
+
+    progress = batch_runner.Progress("items")
+    assert batch_runner.run_bounded(jobs(), work, finish, 2, progress) == (20, 0, 4)
+    assert peak <= 2
+
+
+def test_warm_run_skips_fresh_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(trip_warm, "generate", lambda destination, section, days, travelers: f"{section} in {destination}")
+    source = tmp_path / "destinations.txt"
+    source.write_text("Paris\n# comment\nLisbon\nParis\n")
+    store = trip_warm.TripStore(str(tmp_path / "store.sqlite3"))
+
+    assert trip_warm.run_warm(str(source), store, ["weather", "events"], workers=2) == (4, 2, 0)
+    assert trip_warm.run_warm(str(source), store, ["weather", "events"], workers=2) == (0, 6, 0)
+    assert store.get(trip_warm.content_key("Lisbon", "events"))[0] == "events in Lisbon"
+    store.close()
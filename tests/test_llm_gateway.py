@@ -0,0 +1,84 @@
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+import llm_gateway
+
+GENERATION = dict(system="You are a test.", temperature=0.0, top_p=1.0, max_tokens=200)
+
+
+def _prompt():
+    return f"test prompt {uuid.uuid4()}"
+
+
+def _in_thread(fn, *args, **kwargs):
+    # A daemon thread, so a caller stranded by a regression fails the test instead of hanging pytest
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _wait_for_waiter(coalesced_before, timeout=5):
+    deadline = time.time() + timeout
+    while llm_gateway.flights.stats()["coalesced"] == coalesced_before:
+        assert time.time() < deadline, "the second caller never joined the flight"
+        time.sleep(0.01)
+
+
+def test_cache_write_failure_does_not_strand_waiters(monkeypatch):
+    def locked(key, text):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(llm_gateway.cache, "put", locked)
+    prompt = _prompt()
+    leader = llm_gateway.stream(prompt, **GENERATION)
+    first = next(leader)
+    coalesced = llm_gateway.flights.stats()["coalesced"]
+    waiter = _in_thread(llm_gateway.complete, prompt, **GENERATION)
+    _wait_for_waiter(coalesced)
+    text = first + "".join(leader)
+    assert waiter.result(timeout=5) == text
+    assert llm_gateway.flights.stats()["in_flight"] == 0
+
+
+def test_abandoned_stream_hands_the_flight_to_a_waiter():
+    prompt = _prompt()
+    leader = llm_gateway.stream(prompt, **GENERATION)
+    next(leader)
+    stats = llm_gateway.flights.stats()
+    waiter = _in_thread(lambda: "".join(llm_gateway.stream(prompt, **GENERATION)))
+    _wait_for_waiter(stats["coalesced"])
+    leader.close()
+    text = waiter.result(timeout=10)
+    assert text
+    # The waiter led the retry rather than receiving an error or the partial reply
+    assert llm_gateway.flights.stats()["leaders"] == stats["leaders"] + 1
+    assert llm_gateway.flights.stats()["in_flight"] == 0
+
+
+def test_agent_calls_report_errors_through_status(monkeypatch):
+    def unavailable(prompt, **kwargs):
+        raise RuntimeError("service unavailable")
+
+    monkeypatch.setattr(llm_gateway, "complete", unavailable)
+    monkeypatch.setattr(llm_gateway, "stream", lambda prompt, **kwargs: (yield from unavailable(prompt)))
+    status = {}
+    assert llm_gateway.ask_or_error(GENERATION, _prompt(), "test", status) == "Error: service unavailable"
+    assert isinstance(status["error"], RuntimeError)
+    status = {}
+    assert list(llm_gateway.ask_stream(GENERATION, _prompt(), "test", status)) == ["Error: service unavailable"]
+    assert isinstance(status["error"], RuntimeError)
+
+
+def test_agent_calls_strip_the_reply():
+    reply = llm_gateway.ask({**GENERATION, "agent": "test"}, _prompt(), "test")
+    assert reply and reply == reply.strip()
@@ -0,0 +1,94 @@
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_scheduler import AIMDLimiter, Scheduler, TokenBucket
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__(f"429, retry after {retry_after}")
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+def test_retry_after_beyond_max_delay_raises_at_once():
+    calls = []
+
+    def quota_exhausted():
+        calls.append(1)
+        raise Throttled(6 * 3600)
+
+    scheduler = Scheduler(limiter=AIMDLimiter(), max_delay=30.0)
+    start = time.monotonic()
+    with pytest.raises(Throttled):
+        scheduler.run(quota_exhausted)
+    assert time.monotonic() - start < 1
+    assert len(calls) == 1
+    assert scheduler.retries == 0
+
+
+def test_short_retry_after_is_honored():
+    calls = []
+
+    def throttled_once():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise Throttled(0.2)
+        return "ok"
+
+    scheduler = Scheduler(limiter=AIMDLimiter(), base_delay=0.01)
+    assert scheduler.run(throttled_once) == "ok"
+    assert calls[1] - calls[0] >= 0.2
+
+
+class ThrottlingStub(BaseHTTPRequestHandler):
+    throttle_first = 6
+    hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with ThrottlingStub.lock:
+            ThrottlingStub.hits += 1
+            throttle = ThrottlingStub.hits <= ThrottlingStub.throttle_first
+        if throttle:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    ThrottlingStub.hits = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_throttling_server_is_retried_to_success(stub_url):
+    def fetch():
+        with urllib.request.urlopen(stub_url, timeout=5) as response:
+            return response.read().decode()
+
+    scheduler = Scheduler(bucket=TokenBucket(rate=20, capacity=5), limiter=AIMDLimiter(initial=4), base_delay=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: scheduler.run(fetch), range(10)))
+
+    assert results == ["ok"] * 10
+    assert ThrottlingStub.hits == 10 + ThrottlingStub.throttle_first
+    assert scheduler.stats()["throttled"] == ThrottlingStub.throttle_first
+    assert scheduler.stats()["retries"] == ThrottlingStub.throttle_first
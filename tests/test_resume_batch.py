@@ -0,0 +1,48 @@
+import json
+
+import resume_batch
+
+
+def _tasks(monkeypatch, calls):
+    def fake(field):
+        def run(text, ask=None):
+            calls.append(field)
+            return f"{field} of {text}"
+        return run
+
+    monkeypatch.setattr(resume_batch, "TASKS", {
+        "fraud": ("fraud_report", fake("fraud_report")),
+        "improve": ("improved_resume", fake("improved_resume")),
+    })
+
+
+def test_rerun_only_runs_missing_tasks(tmp_path, monkeypatch):
+    calls = []
+    _tasks(monkeypatch, calls)
+    source = tmp_path / "resumes"
+    source.mkdir()
+    (source / "a.txt").write_text("Jane Doe\nEngineer")
+    (source / "b.txt").write_text("John Roe\nAnalyst")
+    output = str(tmp_path / "results.jsonl")
+
+    assert resume_batch.run_batch(str(source), output, ["fraud"], workers=2) == (2, 0, 0)
+    assert resume_batch.run_batch(str(source), output, ["improve"], workers=2) == (2, 0, 0)
+    assert resume_batch.run_batch(str(source), output, ["fraud", "improve"], workers=2) == (0, 2, 0)
+    assert sorted(calls) == ["fraud_report"] * 2 + ["improved_resume"] * 2
+
+    done = resume_batch.load_done(output)
+    assert all(fields == {"fraud_report", "improved_resume"} for fields in done.values())
+
+
+def test_failed_tasks_are_retried(tmp_path, monkeypatch):
+    calls = []
+    _tasks(monkeypatch, calls)
+    output = tmp_path / "results.jsonl"
+    digest = resume_batch.content_hash("Jane Doe")
+    # Fraud finished, then improving failed
+    output.write_text(json.dumps({"id": "a", "sha256": digest, "fraud_report": "ok", "error": "429"}) + "\n")
+    source = tmp_path / "resumes.jsonl"
+    source.write_text(json.dumps({"id": "a", "text": "Jane Doe"}) + "\n")
+
+    resume_batch.run_batch(str(source), str(output), ["fraud", "improve"], workers=1)
+    assert calls == ["improved_resume"]
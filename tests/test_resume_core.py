@@ -0,0 +1,66 @@
+import resume_core
+from resume_core import Section, split_sections
+
+
+def _long_resume():
+    experience = "Experience\n" + "\n\n".join(f"Role {i}: " + "shipped features and led projects. " * 12 for i in range(12))
+    return f"Jane Doe\njane@example.com\n\nSummary\nData engineer.\n\n{experience}\n\nSkills\nPython, SQL"
+
+
+def test_oversized_sections_keep_their_real_title():
+    sections = split_sections(_long_resume(), max_chars=1000)
+    parts = [section for section in sections if section.title == "Experience"]
+    assert len(parts) > 1
+    assert [section.part for section in parts] == list(range(1, len(parts) + 1))
+    assert parts[0].body.startswith("Experience")
+    assert parts[1].label == "Experience (continued)"
+    assert [section.title for section in sections][-1] == "Skills"
+
+
+def test_a_line_longer_than_the_chunk_keeps_its_place():
+    body = "Experience\n\nshort paragraph\n\n" + "x" * 250 + "\n\ntail"
+    chunks = [section.body for section in resume_core._pack("Experience", body, 100)]
+    assert chunks[0].startswith("Experience\n\nshort paragraph")
+    assert "".join(chunks).replace("\n", "").endswith("tail")
+    assert "".join(chunks).index("short paragraph") < "".join(chunks).index("xxx")
+
+
+def test_continuation_parts_are_rewritten_without_a_heading():
+    sections = [Section("Experience", "Experience\nRole 1", 1), Section("Experience", "Role 2", 2)]
+    prompts = resume_core._section_prompts("improve", sections)
+    assert "starting with its heading" in prompts[0]
+    assert "no heading" in prompts[1] and "(part" not in prompts[1]
+
+    def rewrite(prompt, prompt_type):
+        return prompt.rsplit("\n\n", 1)[-1].strip().upper()
+
+    merged = resume_core.run_sections("Experience\nRole 1\n\nRole 2", "improve", rewrite)
+    assert "(part" not in merged and "continued" not in merged
+
+def test_fraud_reuse_key_includes_the_outline():
+    calls = []
+
+    def ask(prompt, prompt_type):
+        calls.append(prompt)
+        return "credible"
+
+    store = resume_core.SectionStore()
+    sections = split_sections("Summary\nData engineer.\n\nSkills\nPython")
+    list(resume_core.review_sections(sections, "fraud", ask, store))
+    list(resume_core.review_sections(sections, "fraud", ask, store))
+    assert len(calls) == 2
+    # A new section changes the outline every fraud prompt carries
+    sections = split_sections("Summary\nData engineer.\n\nSkills\nPython\n\nEducation\nBSc")
+    list(resume_core.review_sections(sections, "fraud", ask, store))
+    assert len(calls) == 5
+
+
+def test_short_resumes_get_one_whole_fraud_check():
+    prompt_types = []
+
+    def ask(prompt, prompt_type):
+        prompt_types.append(prompt_type)
+        return "credible"
+
+    resume_core.check_fraud("Summary\nData engineer.\n\nSkills\nPython", ask, resume_core.SectionStore())
+    assert prompt_types == ["fraud"]
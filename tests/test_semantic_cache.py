@@ -0,0 +1,43 @@
+import pytest
+
+from semantic_cache import SemanticCache
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("How should I format the education section of a resume?", "How should I format the experience section of a resume?"),
+    ("train or bus from Tokyo to Kyoto", "train or bus from Kyoto to Tokyo"),
+    ("airport to the city", "city to the airport"),
+    ("Should I include a photo", "Should I not include a photo"),
+    ("best time to visit Rome in spring", "best time to visit Nice in spring"),
+])
+def test_near_misses_are_not_served(cached, asked):
+    cache = SemanticCache(threshold=0.6)
+    cache.store(cached, "reply", scope="s")
+    assert cache.lookup(asked, scope="s") is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("best time to visit Tokyo?", "when should I go to Tokyo"),
+    ("cheap hotels in Lisbon", "affordable accommodation in Lisbon"),
+])
+def test_paraphrases_are_served(cached, asked):
+    cache = SemanticCache()
+    cache.store(cached, "reply", scope="s")
+    hit = cache.lookup(asked, scope="s")
+    assert hit is not None and hit.reply == "reply"
+
+
+def test_personal_questions_are_never_shared():
+    cache = SemanticCache()
+    cache.store("I'm 64 with a bad knee, is Kyoto walkable?", "reply about your knee", scope="s")
+    assert cache.stats()["entries"] == 0
+    cache.store("is Kyoto walkable?", "general reply", scope="s")
+    assert cache.lookup("my knee is bad, is Kyoto walkable?", scope="s") is None
+    assert cache.stats()["personal"] == 1
+
+
+def test_scopes_are_separate():
+    cache = SemanticCache()
+    cache.store("best time to visit?", "reply", scope="Tokyo")
+    assert cache.lookup("best time to visit?", scope="Paris") is None
+    assert cache.lookup("best time to visit?", scope="tokyo") is not None
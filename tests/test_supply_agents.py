@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from agent_runtime import AgentRuntime, Ledger, StockReading, Warehouse, run_readings
+from supply_agents import RouteOptimizationAgent
+
+DEPOT = (40.71, -74.01)
+STOPS = [
+    {"city": "Newark", "lat": 40.74, "lon": -74.17, "distance": 14, "demand": 40},
+    {"city": "Philadelphia", "lat": 39.95, "lon": -75.17, "distance": 130, "demand": 60},
+    {"city": "Boston", "lat": 42.36, "lon": -71.06, "distance": 306, "demand": 500},  # more than a truck holds
+]
+
+
+def test_stops_no_truck_can_serve_are_reported(caplog):
+    agent = RouteOptimizationAgent(delivery_time=5, depot=DEPOT, truck_capacity=120, time_limit=0.05)
+    with caplog.at_level(logging.WARNING, logger="supply_agents"):
+        routes, unassigned = agent.plan_routes(STOPS)
+    assert [d["city"] for d in unassigned] == ["Boston"]
+    assert sorted(d["city"] for route in routes for d in route) == ["Newark", "Philadelphia"]
+    assert "Boston" in caplog.text
+    # optimize_route keeps its old return value
+    assert agent.optimize_route(STOPS) == routes
+
+
+def test_route_plans_carry_unassigned_stops():
+    warehouse = Warehouse("NYC", DEPOT)
+    readings = [StockReading("NYC", sku, 200, 50, tuple(STOPS), 0.0) for sku in range(3)]
+    stats = asyncio.run(asyncio.wait_for(run_readings([warehouse], readings), 30))
+    assert stats["route_plans"] == 3
+    assert stats["unassigned_stops"] == 3
+
+
+def test_ledger_keeps_a_bounded_latency_window(monkeypatch):
+    monkeypatch.setattr(Ledger, "latency_window", 2)
+
+    async def run():
+        runtime = AgentRuntime([Warehouse("NYC", DEPOT)])
+        await runtime.start()
+        try:
+            for sku in range(5):
+                await runtime.publish(StockReading("NYC", sku, 200, 50, tuple(STOPS[:2]), 0.0))
+            await runtime.drain()
+        finally:
+            await runtime.stop()
+        return runtime
+
+    runtime = asyncio.run(asyncio.wait_for(run(), 30))
+    assert runtime.ledger.plans == 5
+    assert len(runtime.ledger.latencies) == 2
+    assert runtime.stats()["latency_p95_ms"] > 0
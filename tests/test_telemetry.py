@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import urllib.request
+
+import telemetry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITER = """
+import sys, telemetry
+sink = telemetry.Telemetry(sys.argv[1], max_bytes=2000)
+for _ in range(int(sys.argv[2])):
+    sink.start(sys.argv[3], "chat", "model").finish("ok", "prompt", "reply")
+sink.close()
+"""
+
+
+def _write(path, records, agent):
+    return subprocess.Popen([sys.executable, "-c", WRITER, str(path), str(records), agent],
+                            cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT})
+
+
+def test_rotation_with_two_writer_processes_keeps_every_backup(tmp_path):
+    single = tmp_path / "single" / "calls.jsonl"
+    single.parent.mkdir()
+    assert _write(single, 400, "a").wait() == 0
+
+    shared = tmp_path / "shared" / "calls.jsonl"
+    shared.parent.mkdir()
+    writers = [_write(shared, 200, agent) for agent in ("a", "b")]
+    assert [writer.wait() for writer in writers] == [0, 0]
+
+    # Two writers keep as much history as one: nothing is appended to a rotated-away handle
+    kept = len(telemetry.load_jsonl(str(shared)))
+    assert abs(kept - len(telemetry.load_jsonl(str(single)))) <= 2
+    for i in (1, 2, 3):
+        assert os.path.getsize(f"{shared}.{i}") <= 2000 + 400
+
+
+def test_metrics_endpoint_binds_localhost_by_default():
+    server = telemetry.serve(lambda: "llm_up 1\n", 0)
+    try:
+        host, port = server.server_address
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.read() == b"llm_up 1\n"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,39 +1,10 @@
-import os
-from dotenv import load_dotenv
+import time
 import streamlit as st
-from azure.ai.inference import ChatCompletionsClient
-from azure.ai.inference.models import SystemMessage, UserMessage
-from azure.core.credentials import AzureKeyCredential
-
-# --- Load GitHub Token securely ---
-load_dotenv()
-token = os.getenv("GITHUB_TOKEN")
-
-# --- Setup DeepSeek client ---
-endpoint = "https://models.github.ai/inference"
-model = "deepseek/DeepSeek-V3-0324"
-
-client = ChatCompletionsClient(
-    endpoint=endpoint,
-    credential=AzureKeyCredential(token),
-)
-
-# --- DeepSeek AI interaction function ---   
-def ask_deepseek(prompt: str) -> str:
-    try:
-        response = client.complete(
-            messages=[
-                SystemMessage("You are a very helpful, creative trip planner AI."),
-                UserMessage(prompt),
-            ],
-            temperature=0.8,
-            top_p=0.1,
-            max_tokens=1024,
-            model=model,
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Error: {e}"
+import semantic_cache
+import trip_core
+import trip_warm
+from chat_memory import ConversationMemory
+from trip_core import ask_deepseek, ask_deepseek_stream
 
 # --- Streamlit App Starts ---
 st.set_page_config(page_title="🌎 AI Trip Planner", layout="wide")
@@ -55,64 +26,112 @@ include_flights = st.sidebar.checkbox("Include Flight Suggestions", value=True)
 include_weather = st.sidebar.checkbox("Include Weather Forecast", value=True)
 include_events = st.sidebar.checkbox("Include Local Events", value=True)
 include_security = st.sidebar.checkbox("Security and Fraud Checks", value=True)
+stream_responses = st.sidebar.checkbox("Stream Responses", value=True)
+
+# --- Render a reply, streaming tokens when enabled; returns the full text ---
+# A failed call sets status["error"]; the text shown then ends with the error message
+def show_reply(prompt: str, prompt_type: str, status: dict = None) -> str:
+    if stream_responses:
+        return st.write_stream(ask_deepseek_stream(prompt, prompt_type, status)).strip()
+    reply = ask_deepseek(prompt, prompt_type, status)
+    st.write(reply)
+    return reply
+
+# --- Pre-generated replies (trip_warm.py) render at once; stale ones are refreshed in the background ---
+def show_stored(stored) -> str:
+    st.write(stored.reply)
+    age = trip_warm.describe_age(time.time() - stored.generated_at)
+    st.caption(f"⚡ Pre-generated {age} ago" + (", refreshing in the background" if stored.stale else ""))
+    return stored.reply
+
+def show_section(key: str) -> str:
+    stored = trip_warm.lookup(destination, key, days, travelers)
+    if stored is None:
+        return show_reply(prompts[key], key)
+    return show_stored(stored)
+
+# --- Sub-agent prompts ---
+prompts = trip_core.build_prompts(destination, days, travelers, interests)
+
+# Sections "Plan Everything" produces, from the sidebar options
+enabled = {
+    "trip": True,
+    "hotels": include_hotels,
+    "flights": include_flights,
+    "weather": include_weather,
+    "events": include_events,
+    "security": include_security,
+}
+headings = dict(trip_core.SECTIONS)
 
 # --- Plan Trip Button ---
 if st.sidebar.button("✨ Plan My Trip"):
     with st.spinner("Planning your amazing trip..."):
-        trip_prompt = f"""
-        Plan a secure, exciting {days}-day trip to {destination} for {travelers} people.
-        Focus on these interests: {interests}.
-        Include detailed daily itineraries, activities, and safety recommendations.
-        """
-        trip_plan = ask_deepseek(trip_prompt)
         st.subheader("📋 Your Trip Plan:")
-        st.write(trip_plan)
+        trip_plan = show_reply(prompts["trip"], "trip")
 
         # Store trip for download
         st.session_state.trip_plan = trip_plan
 
+# --- Plan Everything Button (concurrent fan-out) ---
+if st.sidebar.button("🚀 Plan Everything"):
+    selected = {key: prompts[key] for key, _ in trip_core.SECTIONS if enabled[key]}
+
+    # One placeholder per section, in display order, so replies can land out of order
+    placeholders = {}
+    for key in selected:
+        placeholders[key] = st.empty()
+        placeholders[key].info(f"{headings[key]} waiting for reply...")
+
+    # Pre-generated sections render at once; only the rest go to the model
+    for key in list(selected):
+        stored = trip_warm.lookup(destination, key, days, travelers)
+        if stored is not None:
+            with placeholders[key].container():
+                st.subheader(headings[key])
+                show_stored(stored)
+            del selected[key]
+
+    # Only the network calls run in worker threads; rendering stays on the script thread
+    for key, reply in trip_core.plan_sections(selected):
+        with placeholders[key].container():
+            st.subheader(headings[key])
+            st.write(reply)
+        if key == "trip":
+            st.session_state.trip_plan = reply
+
 # --- Other Buttons ---
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     if st.button("🏨 Get Hotel Recommendations"):
         with st.spinner("Finding best hotels..."):
-            hotel_prompt = f"Suggest top hotels in {destination} for {travelers} people, considering safety and affordability."
-            hotel_suggestions = ask_deepseek(hotel_prompt)
             st.subheader("🏨 Hotel Recommendations:")
-            st.write(hotel_suggestions)
+            show_section("hotels")
 
 with col2:
     if st.button("✈️ Find Flight Options"):
         with st.spinner("Searching flights..."):
-            flight_prompt = f"Find best flight options to {destination} for {travelers} people."
-            flight_suggestions = ask_deepseek(flight_prompt)
             st.subheader("✈️ Flight Booking Suggestions:")
-            st.write(flight_suggestions)
+            show_section("flights")
 
 with col3:
     if st.button("☁️ Weather Forecast"):
         with st.spinner("Checking weather..."):
-            weather_prompt = f"Give me the 5-day weather forecast for {destination}."
-            weather_report = ask_deepseek(weather_prompt)
             st.subheader("☁️ Weather Forecast:")
-            st.write(weather_report)
+            show_section("weather")
 
 with col4:
     if st.button("🎭 Find Local Events"):
         with st.spinner("Finding cool events..."):
-            events_prompt = f"List popular events happening in {destination} during the next {days} days."
-            events_info = ask_deepseek(events_prompt)
             st.subheader("🎭 Local Event Finder:")
-            st.write(events_info)
+            show_section("events")
 
 with col5:
     if st.button("🛡️ Security and Fraud Check"):
         with st.spinner("Checking security tips..."):
-            security_prompt = f"Give me travel safety tips and common frauds to avoid in {destination}."
-            security_info = ask_deepseek(security_prompt)
             st.subheader("🛡️ Security Tips and Fraud Protection:")
-            st.write(security_info)
+            show_section("security")
 
 # --- Download Trip Plan Button ---
 if "trip_plan" in st.session_state:
@@ -131,12 +150,35 @@ st.write("Ask any custom questions about your trip!")
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 
+# Recent turns verbatim plus a rolling summary, so follow-up questions keep their context
+if "chat_memory" not in st.session_state:
+    st.session_state.chat_memory = ConversationMemory(token_budget=1200)
+
 user_query = st.text_input("Type your question here...")
 
 if st.button("Ask"):
     if user_query:
         with st.spinner("AI is replying..."):
-            bot_reply = ask_deepseek(f"You are an expert travel assistant. User asks: {user_query}")
+            # A paraphrase of an earlier question about this destination is answered without a model call,
+            # unless earlier turns give this one a context the cached answer didn't have
+            cacheable = not st.session_state.chat_memory.has_context()
+            hit = trip_core.chat_lookup(user_query, destination) if cacheable else None
+            status = {}
+            if hit is not None:
+                bot_reply = hit.reply
+                st.caption(f"⚡ Answered from the semantic cache (similarity {hit.similarity:.2f})")
+            else:
+                # Stream into a temporary slot; the history loop below renders the final reply
+                start = time.perf_counter()
+                reply_slot = st.empty()
+                with reply_slot.container():
+                    chat_prompt = st.session_state.chat_memory.build_prompt(user_query, trip_core.CHAT_SYSTEM_PROMPT)
+                    bot_reply = show_reply(chat_prompt, "chat", status)
+                reply_slot.empty()
+                if cacheable and "error" not in status:
+                    trip_core.chat_store(user_query, bot_reply, destination, time.perf_counter() - start)
+            if "error" not in status:
+                st.session_state.chat_memory.add_turn(user_query, bot_reply)
             st.session_state.chat_history.append(("You", user_query))
             st.session_state.chat_history.append(("AI", bot_reply))
 
@@ -146,3 +188,15 @@ for sender, message in st.session_state.chat_history:
         st.markdown(f"**🧑 You:** {message}")
     else:
         st.markdown(f"**🤖 AI:** {message}")
+
+if st.session_state.chat_history:
+    memory_stats = st.session_state.chat_memory.stats()
+    st.caption(
+        f"🧠 Prompt tokens this turn: {memory_stats['last_prompt_tokens']} "
+        f"(avg {memory_stats['avg_prompt_tokens']}, max {memory_stats['max_prompt_tokens']}, "
+        f"summary {memory_stats['summary_tokens']})"
+    )
+    if semantic_cache.shared() is not None:
+        cache_stats = semantic_cache.shared().stats()
+        st.caption(f"⚡ Semantic cache: {cache_stats['hits']} hits ({cache_stats['hit_rate']:.0%}), "
+                   f"{cache_stats['saved_s']:.1f} s of model time saved")
@@ -0,0 +1,80 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import llm_gateway
+
+# --- DeepSeek settings for the trip agent (client and cache live in llm_gateway) ---
+SYSTEM_PROMPT = "You are a very helpful, creative trip planner AI."
+GENERATION = dict(system=SYSTEM_PROMPT, temperature=0.8, top_p=0.1, max_tokens=1024, agent="trip")
+CHAT_SYSTEM_PROMPT = "You are an expert travel assistant."
+
+# Upper bound on concurrent DeepSeek calls for "Plan Everything"
+MAX_PARALLEL_AGENTS = 6
+
+# (key, heading) for every section a trip plan can have, in display order
+SECTIONS = [
+    ("trip", "📋 Your Trip Plan:"),
+    ("hotels", "🏨 Hotel Recommendations:"),
+    ("flights", "✈️ Flight Booking Suggestions:"),
+    ("weather", "☁️ Weather Forecast:"),
+    ("events", "🎭 Local Event Finder:"),
+    ("security", "🛡️ Security Tips and Fraud Protection:"),
+]
+
+
+# --- Sub-agent prompts ---
+def build_prompts(destination, days, travelers, interests):
+    """Prompt per section key for one trip."""
+    return {
+        "trip": f"""
+        Plan a secure, exciting {days}-day trip to {destination} for {travelers} people.
+        Focus on these interests: {interests}.
+        Include detailed daily itineraries, activities, and safety recommendations.
+        """,
+        "hotels": f"Suggest top hotels in {destination} for {travelers} people, considering safety and affordability.",
+        "flights": f"Find best flight options to {destination} for {travelers} people.",
+        "weather": f"Give me the 5-day weather forecast for {destination}.",
+        "events": f"List popular events happening in {destination} during the next {days} days.",
+        "security": f"Give me travel safety tips and common frauds to avoid in {destination}.",
+    }
+
+
+# --- DeepSeek calls: ask_model raises, the other two return the error text (see llm_gateway.ask*) ---
+ask_model = functools.partial(llm_gateway.ask, GENERATION)
+ask_deepseek = functools.partial(llm_gateway.ask_or_error, GENERATION)
+ask_deepseek_stream = functools.partial(llm_gateway.ask_stream, GENERATION)
+
+
+# --- Concurrent fan-out for "Plan Everything" ---
+def plan_sections(prompts, ask=ask_deepseek):
+    """Yields (key, reply) for every prompt as replies arrive, not in order."""
+    if not prompts:
+        return
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_AGENTS, len(prompts))) as pool:
+        futures = {pool.submit(ask, prompt, key): key for key, prompt in prompts.items()}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+# --- Chatbot: paraphrases of an earlier question about the same destination reuse its answer ---
+# Only first questions of a conversation use the cache: a follow-up's answer depends on the earlier turns
+def chat_lookup(question, destination):
+    """Cached reply to a similar question about this destination, or None."""
+    import semantic_cache  # imported on first use, so importing this module doesn't load NumPy
+
+    cache = semantic_cache.shared()
+    if cache is None:
+        return None
+    hit = cache.lookup(question, scope=destination)
+    if hit is not None:
+        llm_gateway.record_hit(GENERATION["agent"], "chat")
+    return hit
+
+
+def chat_store(question, reply, destination, latency_s):
+    """Call only with complete replies; failed or partial ones must never be served again."""
+    import semantic_cache  # imported on first use, so importing this module doesn't load NumPy
+
+    cache = semantic_cache.shared()
+    if cache is not None:
+        cache.store(question, reply, scope=destination, latency_s=latency_s)
@@ -0,0 +1,257 @@
+"""Batch pre-generation of the trip sub-agent replies for popular destinations.
+
+    python trip_warm.py destinations.txt --workers 4
+    python trip_warm.py destinations.jsonl --sections weather,events --days 7
+
+DESTINATIONS is a text file with one destination per line (blank lines and
+# comments ignored) or a JSONL file of {"destination": ...} records. Each
+(destination, section) reply is written to the SQLite store (TRIP_STORE_PATH,
+default .trip_store.sqlite3) as soon as it finishes, stamped with the time it
+was generated. Re-running the same command skips entries that are still
+fresh, so an interrupted run resumes where it stopped and a scheduled run only
+regenerates what has gone stale. trip.py serves stored replies instantly and
+refreshes stale ones in the background.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import batch_runner
+import llm_gateway
+import trip_core
+
+logger = logging.getLogger(__name__)
+
+STORE_PATH = os.getenv("TRIP_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".trip_store.sqlite3"))
+
+# Sections whose prompts depend only on destination, days and travelers; the itinerary also depends on free-text interests
+SECTIONS = ("hotels", "flights", "weather", "events", "security")
+
+# How long a stored reply counts as fresh, per section
+MAX_AGE = {
+    "hotels": 7 * 86400,
+    "flights": 3 * 86400,
+    "weather": 86400,
+    "events": 86400,
+    "security": 30 * 86400,
+}
+
+# The sidebar defaults in trip.py; warm other combinations with --days/--travelers
+DAYS = 5
+TRAVELERS = 1
+
+
+def content_key(destination, section, days=DAYS, travelers=TRAVELERS):
+    """Hash of the prompt the app would send, with the destination case- and whitespace-normalized."""
+    canonical = " ".join(destination.split()).casefold()
+    prompt = trip_core.build_prompts(canonical, days, travelers, "")[section]
+    return hashlib.sha256(f"{section}\n{prompt}".encode("utf-8")).hexdigest()[:32]
+
+
+def generate(destination, section, days=DAYS, travelers=TRAVELERS):
+    """Raises on API errors. Bypasses the response cache: a refresh must reach the model."""
+    prompt = trip_core.build_prompts(destination, days, travelers, "")[section]
+    generation = {**trip_core.GENERATION, "agent": "trip_warm"}
+    return llm_gateway.complete(prompt, prompt_type=section, use_cache=False, **generation).strip()
+
+
+# --- Store: one row per (prompt key), primary-key lookups, safe to read while a job writes ---
+class TripStore:
+    def __init__(self, path=STORE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS content (key TEXT PRIMARY KEY, destination TEXT NOT NULL, section TEXT NOT NULL, "
+            "reply TEXT NOT NULL, generated_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS content_generated_at ON content (generated_at)")
+        self._db.commit()
+
+    def get(self, key):
+        """(reply, generated_at) or None."""
+        with self._lock:
+            return self._db.execute("SELECT reply, generated_at FROM content WHERE key = ?", (key,)).fetchone()
+
+    def generated_at(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT generated_at FROM content WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, destination, section, reply, generated_at=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO content (key, destination, section, reply, generated_at) VALUES (?, ?, ?, ?, ?)",
+                (key, destination, section, reply, time.time() if generated_at is None else generated_at),
+            )
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, destinations, oldest = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT destination), MIN(generated_at) FROM content"
+            ).fetchone()
+        return {"entries": entries, "destinations": destinations, "oldest": oldest}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# --- Serving side, used by trip.py ---
+class Stored(NamedTuple):
+    reply: str
+    generated_at: float
+    stale: bool
+
+
+_store = None
+_store_lock = threading.Lock()
+_refresher = None
+_refreshing = set()  # keys with a background refresh queued or running
+
+
+def get_store():
+    """The process-wide store, or None until a job has created it (or when TRIP_STORE_PATH is empty)."""
+    global _store
+    if _store is None and STORE_PATH and os.path.exists(STORE_PATH):
+        with _store_lock:
+            if _store is None:
+                _store = TripStore(STORE_PATH)
+    return _store
+
+
+def lookup(destination, section, days=DAYS, travelers=TRAVELERS):
+    """The stored reply for this section of the trip, or None; a stale one is returned and refreshed in the background."""
+    store = get_store()
+    if store is None or section not in SECTIONS or not destination.strip():
+        return None
+    key = content_key(destination, section, days, travelers)
+    found = store.get(key)
+    if found is None:
+        return None
+    reply, generated_at = found
+    llm_gateway.record_hit(trip_core.GENERATION["agent"], section, "store_hit")
+    stale = time.time() - generated_at > MAX_AGE[section]
+    if stale:
+        refresh_in_background(key, destination, section, days, travelers)
+    return Stored(reply, generated_at, stale)
+
+
+def refresh_in_background(key, destination, section, days=DAYS, travelers=TRAVELERS):
+    global _refresher
+    with _store_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresher is None:
+            _refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="trip-refresh")
+
+    def refresh():
+        try:
+            get_store().put(key, destination, section, generate(destination, section, days, travelers))
+        except Exception as e:
+            logger.warning("trip_warm: refreshing %s/%s failed: %s", destination, section, e)
+        finally:
+            with _store_lock:
+                _refreshing.discard(key)
+
+    _refresher.submit(refresh)
+
+
+def describe_age(seconds):
+    if seconds < 3600:
+        return f"{max(1, int(seconds // 60))} min"
+    if seconds < 2 * 86400:
+        return f"{int(seconds // 3600)} h"
+    return f"{int(seconds // 86400)} days"
+
+
+# --- Input: one destination per line, or JSONL records ---
+def iter_destinations(source):
+    with open(source, encoding="utf-8") as lines:
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                line = json.loads(line).get("destination", "")
+            if line.strip():
+                yield " ".join(line.split())
+
+
+# --- Job ---
+def run_warm(source, store, sections, workers, days=DAYS, travelers=TRAVELERS, force=False, report_every=25):
+    progress = batch_runner.Progress("items", report_every)
+
+    def jobs():
+        seen = set()
+        now = time.time()
+        for destination in iter_destinations(source):
+            for section in sections:
+                key = content_key(destination, section, days, travelers)
+                generated_at = store.generated_at(key)
+                fresh = generated_at is not None and now - generated_at <= MAX_AGE[section]
+                if key in seen or (fresh and not force):
+                    progress.skipped += 1
+                    continue
+                seen.add(key)
+                yield key, destination, section
+
+    def work(key, destination, section):
+        # Runs on a worker; the store is written from the submitting thread
+        try:
+            return generate(destination, section, days, travelers), None
+        except Exception as e:
+            return None, str(e)
+
+    def save(job, result):
+        key, destination, section = job
+        reply, error = result
+        if error is None:
+            store.put(key, destination, section, reply)
+        else:
+            print(f"{destination}/{section}: {error}", file=sys.stderr)
+        return error is not None
+
+    return batch_runner.run_bounded(jobs(), work, save, workers, progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate trip planner replies for a list of destinations.")
+    parser.add_argument("source", help="text file with one destination per line, or JSONL of {destination} records")
+    parser.add_argument("--store", default=STORE_PATH, help="SQLite store the app reads (TRIP_STORE_PATH)")
+    parser.add_argument("--sections", default=",".join(SECTIONS), help="comma-separated subset of: " + ", ".join(SECTIONS))
+    parser.add_argument("--days", type=int, default=DAYS, help="trip length the prompts are built for")
+    parser.add_argument("--travelers", type=int, default=TRAVELERS, help="party size the prompts are built for")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent model calls")
+    parser.add_argument("--force", action="store_true", help="regenerate entries that are still fresh")
+    parser.add_argument("--report-every", type=int, default=25, help="print throughput after this many items")
+    args = parser.parse_args(argv)
+
+    sections = [section.strip() for section in args.sections.split(",") if section.strip()]
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+
+    store = TripStore(args.store)
+    try:
+        _, _, failed = run_warm(args.source, store, sections, args.workers, args.days, args.travelers,
+                                args.force, args.report_every)
+        stats = store.stats()
+        print(f"store: {stats['entries']} entries for {stats['destinations']} destinations in {args.store}", file=sys.stderr)
+    finally:
+        store.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())